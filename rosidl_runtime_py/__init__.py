@@ -12,31 +12,101 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from .convert import get_message_slot_types
-from .convert import message_to_csv
-from .convert import message_to_ordereddict
-from .convert import message_to_yaml
+import importlib
+
 from .get_interfaces import get_action_interfaces
+from .get_interfaces import get_interface_catalog
 from .get_interfaces import get_interface_packages
 from .get_interfaces import get_interface_path
 from .get_interfaces import get_interfaces
 from .get_interfaces import get_message_interfaces
 from .get_interfaces import get_service_interfaces
-from .import_message import import_message_from_namespaced_type
-from .set_message import set_message_fields
+from .get_interfaces import InterfaceCatalog
 
 
 __all__ = [
+    'clear_import_cache',
+    'copy_message',
+    'create_messages',
+    'diff_messages',
+    'disable_instrumentation',
+    'enable_instrumentation',
     'get_action_interfaces',
+    'get_import_cache_info',
+    'get_instrumentation_data',
+    'get_interface_catalog',
     'get_interface_packages',
+    'get_message_dtype',
     'get_message_interfaces',
     'get_service_interfaces',
     'get_interface_path',
     'get_interfaces',
     'get_message_slot_types',
+    'hash_message',
     'import_message_from_namespaced_type',
+    'InterfaceCatalog',
+    'is_instrumentation_enabled',
     'message_to_csv',
     'message_to_ordereddict',
     'message_to_yaml',
+    'MessageCsvWriter',
+    'MessageDeltaEncoder',
+    'MessageLogReader',
+    'MessageLogWriter',
+    'MessageProjection',
+    'messages_equal',
+    'messages_to_columns',
+    'messages_to_structured_array',
+    'MessageView',
+    'preload_interfaces',
+    'reset_instrumentation_data',
+    'set_import_cache_size',
     'set_message_fields',
 ]
+
+# The modules of these attributes import numpy, yaml or rosidl_parser, so they are only
+# imported once one of their attributes is used
+_LAZY_ATTRIBUTES = {
+    'clear_import_cache': 'import_message',
+    'copy_message': 'copying',
+    'create_messages': 'set_message',
+    'diff_messages': 'diff',
+    'disable_instrumentation': 'instrumentation',
+    'enable_instrumentation': 'instrumentation',
+    'get_import_cache_info': 'import_message',
+    'get_instrumentation_data': 'instrumentation',
+    'get_message_dtype': 'convert',
+    'get_message_slot_types': 'convert',
+    'hash_message': 'hashing',
+    'import_message_from_namespaced_type': 'import_message',
+    'is_instrumentation_enabled': 'instrumentation',
+    'message_to_csv': 'convert',
+    'message_to_ordereddict': 'convert',
+    'message_to_yaml': 'convert',
+    'MessageCsvWriter': 'convert',
+    'MessageDeltaEncoder': 'diff',
+    'MessageLogReader': 'message_log',
+    'MessageLogWriter': 'message_log',
+    'MessageProjection': 'convert',
+    'messages_equal': 'diff',
+    'messages_to_columns': 'convert',
+    'messages_to_structured_array': 'convert',
+    'MessageView': 'convert',
+    'preload_interfaces': 'preload',
+    'reset_instrumentation_data': 'instrumentation',
+    'set_import_cache_size': 'import_message',
+    'set_message_fields': 'set_message',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module('.' + module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
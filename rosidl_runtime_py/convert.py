@@ -13,16 +13,54 @@
 # limitations under the License.
 
 import array
+import base64
 from collections import OrderedDict
+import csv
+import functools
+import math
+import operator
+import re
 import sys
 from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
 
 import numpy
 import rosidl_parser.definition
+from rosidl_runtime_py import instrumentation
+from rosidl_runtime_py.import_message import import_message_from_namespaced_type
 import yaml
 
 
-__yaml_representer_registered = False
+# NumPy dtypes of the values of each basic type
+_NUMPY_DTYPES = {
+    'boolean': numpy.bool_,
+    'octet': numpy.uint8,
+    'char': numpy.uint8,
+    'wchar': numpy.uint16,
+    'float': numpy.float32,
+    'double': numpy.float64,
+    'long double': numpy.longdouble,
+    'short': numpy.int16,
+    'unsigned short': numpy.uint16,
+    'long': numpy.int32,
+    'unsigned long': numpy.uint32,
+    'long long': numpy.int64,
+    'unsigned long long': numpy.uint64,
+    'int8': numpy.int8,
+    'uint8': numpy.uint8,
+    'int16': numpy.int16,
+    'uint16': numpy.uint16,
+    'int32': numpy.int32,
+    'uint32': numpy.uint32,
+    'int64': numpy.int64,
+    'uint64': numpy.uint64,
+}
 
 
 def __get_type_name(value_type):
@@ -63,13 +101,59 @@ def __represent_ordereddict(dumper, data):
     return yaml.nodes.MappingNode(u'tag:yaml.org,2002:map', items)
 
 
+# Use the emitter of libyaml when PyYAML was built with it, since it is much faster.
+# The width of lines given to libyaml must fit in a C int.
+try:
+    from yaml import CDumper as _BaseDumper
+    _YAML_WIDTH = 2 ** 31 - 1
+except ImportError:
+    from yaml import Dumper as _BaseDumper
+    _YAML_WIDTH = sys.maxsize
+
+
+class _MessageDumper(_BaseDumper):
+    """YAML dumper for converted messages, which leaves the representers of PyYAML untouched."""
+
+
+class _PythonMessageDumper(yaml.Dumper):
+    """Pure-Python YAML dumper for converted messages with strings libyaml writes differently."""
+
+
+_MessageDumper.add_representer(OrderedDict, __represent_ordereddict)
+_PythonMessageDumper.add_representer(OrderedDict, __represent_ordereddict)
+
+# libyaml escapes characters outside of the Basic Multilingual Plane (e.g. emoji) and writes
+# next line characters as '\N', while the pure-Python emitter of PyYAML writes them as they are
+__LIBYAML_ESCAPED_CHARACTER = re.compile('[\x85\U00010000-\U0010ffff]')
+
+
+def _dump_yaml(data: Any, *, flow_style: bool) -> str:
+    # Dump converted values with libyaml, unless it would write one of their strings
+    # differently from the pure-Python emitter
+    dumper = _PythonMessageDumper if __has_libyaml_escaped_string(data) else _MessageDumper
+    return yaml.dump(
+        data, Dumper=dumper, allow_unicode=True, width=_YAML_WIDTH,
+        default_flow_style=flow_style)
+
+
+def __has_libyaml_escaped_string(value):
+    if isinstance(value, str):
+        return __LIBYAML_ESCAPED_CHARACTER.search(value) is not None
+    if isinstance(value, dict):
+        return any(__has_libyaml_escaped_string(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(__has_libyaml_escaped_string(v) for v in value)
+    return False
+
+
 def message_to_yaml(
     msg: Any,
     *,
     truncate_length: int = None,
     no_arr: bool = False,
     no_str: bool = False,
-    flow_style: bool = False
+    flow_style: bool = False,
+    binary_encoding: str = None
 ) -> str:
     """
     Convert a ROS message to a YAML string.
@@ -80,20 +164,307 @@ def message_to_yaml(
     :param no_arr: Exclude array fields of the message.
     :param no_str: Exclude string fields of the message.
     :param flow_style: Whether to use block style or flow style; defaults to block style.
+    :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single string,
+        either 'base64' or 'hex'; by default they are converted item by item.
     :returns: A YAML string representation of the input ROS message.
+    :raises ValueError: If the binary encoding is not supported.
     """
-    global __yaml_representer_registered
+    try:
+        emitter = _get_yaml_emitter(
+            type(msg), truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+            flow_style=flow_style, binary_encoding=binary_encoding)
+        return emitter(msg)
+    except _UnsupportedYamlValue:
+        pass
+    return _dump_yaml(
+        message_to_ordereddict(
+            msg, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+            binary_encoding=binary_encoding),
+        flow_style=flow_style)
 
-    # Register our custom representer for YAML output
-    if not __yaml_representer_registered:
-        yaml.add_representer(OrderedDict, __represent_ordereddict)
-        __yaml_representer_registered = True
 
-    return yaml.dump(
-        message_to_ordereddict(
-            msg, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str),
-        allow_unicode=True, width=sys.maxsize, default_flow_style=flow_style,
-    )
+# The YAML emitter below writes the same text as PyYAML does for a converted message, but
+# directly from the fields of the message.
+# It only supports scalars which PyYAML writes in a single line, i.e. booleans, integers, floats
+# and strings without line breaks or characters that libyaml treats differently.
+# For any other value it raises _UnsupportedYamlValue and message_to_yaml falls back to PyYAML.
+class _UnsupportedYamlValue(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _get_yaml_emitter(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    flow_style: bool = False,
+    binary_encoding: str = None
+) -> Callable[[Any], str]:
+    __check_binary_encoding(binary_encoding)
+    writer = _get_yaml_block_writer(
+        message_class, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+        flow_style=flow_style, binary_encoding=binary_encoding)
+    if writer is None:
+        return lambda msg: '{}\n'
+
+    def emitter(msg):
+        out = []
+        writer(msg, out, '', '')
+        return ''.join(out)
+    return emitter
+
+
+@functools.lru_cache(maxsize=None)
+def _get_yaml_block_writer(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    flow_style: bool = False,
+    binary_encoding: str = None
+) -> Optional[Callable]:
+    # Return a function writing a message as a block mapping, or None if it has no fields.
+    # The first key is written after first_prefix and the other ones after prefix.
+    fields = tuple(
+        (field_name, __yaml_string(field_name, flow=False), __get_yaml_block_field_writer(
+            field_type, truncate_length, no_arr, no_str, binary_encoding, flow_style))
+        for field_name, field_type in _get_message_fields(message_class))
+    if not fields:
+        return None
+    if instrumentation._enabled:
+        fields = __instrument_fields(fields, message_class, 'message_to_yaml')
+
+    def writer(msg, out, first_prefix, prefix):
+        line_prefix = first_prefix
+        for field_name, key, field_writer in fields:
+            out.append(line_prefix)
+            out.append(key)
+            field_writer(getattr(msg, field_name, None), out, prefix)
+            line_prefix = prefix
+    return writer
+
+
+@functools.lru_cache(maxsize=None)
+def _get_yaml_flow_writer(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Callable[[Any], str]:
+    # Return a function writing a message as a flow mapping
+    fields = tuple(
+        (field_name, __yaml_string(field_name, flow=True) + ': ', __get_yaml_flow_value_writer(
+            field_type, truncate_length, no_arr, no_str, binary_encoding))
+        for field_name, field_type in _get_message_fields(message_class))
+    if instrumentation._enabled:
+        fields = __instrument_fields(fields, message_class, 'message_to_yaml')
+
+    def writer(msg):
+        return '{' + ', '.join([
+            key + value_writer(getattr(msg, field_name, None))
+            for field_name, key, value_writer in fields]) + '}'
+    return writer
+
+
+def __get_yaml_block_field_writer(
+        field_type, truncate_length, no_arr, no_str, binary_encoding, flow_style):
+    options = {
+        'truncate_length': truncate_length, 'no_arr': no_arr, 'no_str': no_str,
+        'binary_encoding': binary_encoding}
+    if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+        def write_message(value, out, prefix):
+            nested_writer = _get_yaml_block_writer(type(value), flow_style=flow_style, **options)
+            if nested_writer is None:
+                out.append(': {}\n')
+            else:
+                out.append(':\n')
+                nested_writer(value, out, prefix + '  ', prefix + '  ')
+        return write_message
+
+    # Abbreviated and encoded arrays are written as scalars
+    is_sequence = isinstance(field_type, rosidl_parser.definition.AbstractNestedType) and \
+        no_arr is not True and not __is_binary_field(field_type, binary_encoding)
+    if is_sequence and flow_style is True:
+        value_writer = __get_yaml_flow_value_writer(
+            field_type, truncate_length, no_arr, no_str, binary_encoding)
+
+        def write_flow_sequence(value, out, prefix):
+            out.append(': ')
+            out.append(value_writer(value))
+            out.append('\n')
+        return write_flow_sequence
+
+    if is_sequence and isinstance(
+            field_type.value_type, rosidl_parser.definition.NamespacedType):
+        def write_message_sequence(value, out, prefix):
+            truncated = truncate_length is not None and len(value) > truncate_length
+            if truncated:
+                value = value[:truncate_length]
+            elif not len(value):
+                out.append(': []\n')
+                return
+            out.append(':\n')
+            for item in value:
+                nested_writer = _get_yaml_block_writer(
+                    type(item), flow_style=flow_style, **options)
+                if nested_writer is None:
+                    out.append(prefix + '- {}\n')
+                else:
+                    out.append(prefix + '- ')
+                    nested_writer(item, out, '', prefix + '  ')
+            if truncated:
+                out.append(prefix + "- '...'\n")
+        return write_message_sequence
+
+    handler = __get_field_handler(field_type, truncate_length, no_arr, no_str, binary_encoding)
+    if is_sequence:
+        def write_sequence(value, out, prefix):
+            value = handler(value)
+            if not value:
+                out.append(': []\n')
+                return
+            out.append(':\n')
+            item_prefix = prefix + '- '
+            for item in value:
+                out.append(item_prefix)
+                out.append(__yaml_scalar(item, flow=False))
+                out.append('\n')
+        return write_sequence
+
+    def write_scalar(value, out, prefix):
+        if handler is not None:
+            value = handler(value)
+        out.append(': ')
+        out.append(__yaml_scalar(value, flow=False))
+        out.append('\n')
+    return write_scalar
+
+
+def __get_yaml_flow_value_writer(
+        field_type, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    options = {
+        'truncate_length': truncate_length, 'no_arr': no_arr, 'no_str': no_str,
+        'binary_encoding': binary_encoding}
+    if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+        return lambda value: _get_yaml_flow_writer(type(value), **options)(value)
+
+    is_sequence = isinstance(field_type, rosidl_parser.definition.AbstractNestedType) and \
+        no_arr is not True and not __is_binary_field(field_type, binary_encoding)
+    if is_sequence and isinstance(
+            field_type.value_type, rosidl_parser.definition.NamespacedType):
+        def write_message_sequence(value):
+            truncated = truncate_length is not None and len(value) > truncate_length
+            if truncated:
+                value = value[:truncate_length]
+            items = [_get_yaml_flow_writer(type(item), **options)(item) for item in value]
+            if truncated:
+                items.append("'...'")
+            return '[' + ', '.join(items) + ']'
+        return write_message_sequence
+
+    handler = __get_field_handler(field_type, truncate_length, no_arr, no_str, binary_encoding)
+    if is_sequence:
+        def write_sequence(value):
+            return '[' + ', '.join([
+                __yaml_scalar(item, flow=True) for item in handler(value)]) + ']'
+        return write_sequence
+
+    def write_scalar(value):
+        if handler is not None:
+            value = handler(value)
+        return __yaml_scalar(value, flow=True)
+    return write_scalar
+
+
+def __yaml_scalar(value, *, flow):
+    value_type = type(value)
+    if value_type is str:
+        return __yaml_string(value, flow=flow)
+    if value_type is bool:
+        return 'true' if value else 'false'
+    if value_type is int:
+        return str(value)
+    if value_type is float:
+        return __yaml_float(value)
+    raise _UnsupportedYamlValue()
+
+
+def __yaml_float(value):
+    # Same as the float representer of PyYAML
+    if value != value:
+        return '.nan'
+    if value == math.inf:
+        return '.inf'
+    if value == -math.inf:
+        return '-.inf'
+    text = repr(value).lower()
+    if '.' not in text and 'e' in text:
+        text = text.replace('e', '.0e', 1)
+    return text
+
+
+# Characters which PyYAML and libyaml both either write as they are or escape the same way
+__YAML_UNSUPPORTED_CHARACTER = re.compile(
+    r'[^\x00-\x7f\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]')
+__YAML_SPECIAL_CHARACTER = re.compile(r'[\x00-\x09\x0b-\x1f\x7f]')
+__YAML_FLOW_INDICATOR = re.compile(r'[,?\[\]{}:]')
+__YAML_BLOCK_INDICATOR = re.compile(':(?: |$)| #')
+__YAML_ESCAPES = {
+    '\0': '0', '\x07': 'a', '\x08': 'b', '\x09': 't', '\x0a': 'n', '\x0b': 'v', '\x0c': 'f',
+    '\x0d': 'r', '\x1b': 'e', '"': '"', '\\': '\\',
+}
+__YAML_DOUBLE_QUOTED_TRANSLATION = str.maketrans({
+    chr(c): '\\' + __YAML_ESCAPES.get(chr(c), 'x%02X' % c)
+    for c in tuple(range(0x20)) + (0x22, 0x5c, 0x7f)})
+
+
+def __yaml_string(value, *, flow):
+    # Choose between the plain, single quoted and double quoted style the same way as the emitter
+    # of PyYAML
+    if not value:
+        return "''"
+    if __YAML_UNSUPPORTED_CHARACTER.search(value):
+        raise _UnsupportedYamlValue()
+    if __YAML_SPECIAL_CHARACTER.search(value):
+        return '"' + value.translate(__YAML_DOUBLE_QUOTED_TRANSLATION) + '"'
+    if '\n' in value:
+        # Quoted strings with line breaks are split over several lines
+        raise _UnsupportedYamlValue()
+    if __is_yaml_plain(value, flow=flow) and __is_yaml_implicit_string(value):
+        return value
+    return "'" + value.replace("'", "''") + "'"
+
+
+def __is_yaml_plain(value, *, flow):
+    if value[0] == ' ' or value[-1] == ' ' or value.startswith(('---', '...')):
+        return False
+    first = value[0]
+    followed_by_whitespace = len(value) == 1 or value[1] == ' '
+    if first in '#,[]{}&*!|>\'"%@`':
+        return False
+    if first in '?:' and (flow or followed_by_whitespace):
+        return False
+    if first == '-' and followed_by_whitespace:
+        return False
+    rest = value[1:]
+    if flow:
+        return __YAML_FLOW_INDICATOR.search(rest) is None and ' #' not in rest
+    return __YAML_BLOCK_INDICATOR.search(rest) is None
+
+
+def __is_yaml_implicit_string(value):
+    # Whether the resolver of PyYAML resolves the plain scalar to a string, and not e.g. to a
+    # boolean or number
+    resolvers = _MessageDumper.yaml_implicit_resolvers
+    for tag, regexp in resolvers.get(value[0], []) + resolvers.get(None, []):
+        if regexp.match(value):
+            return False
+    return True
 
 
 def message_to_csv(
@@ -101,7 +472,8 @@ def message_to_csv(
     *,
     truncate_length: int = None,
     no_arr: bool = False,
-    no_str: bool = False
+    no_str: bool = False,
+    binary_encoding: str = None
 ) -> str:
     """
     Convert a ROS message to string of comma-separated values.
@@ -111,50 +483,304 @@ def message_to_csv(
         This does not truncate the list of message fields.
     :param no_arr: Exclude array fields of the message.
     :param no_str: Exclude string fields of the message.
+    :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single value,
+        either 'base64' or 'hex'; by default each item is a separate value.
     :returns: A string of comma-separated values representing the input message.
+    :raises ValueError: If the binary encoding is not supported.
     """
-    def to_string(val, field_type=None):
-        nonlocal truncate_length, no_arr, no_str
-        r = ''
-        if any(isinstance(val, t) for t in [list, tuple, array.array, numpy.ndarray]):
-            if no_arr is True and field_type is not None:
-                r = __abbreviate_array_info(val, field_type)
-            else:
-                for i, v in enumerate(val):
-                    if r:
-                        r += ','
-                    if truncate_length is not None and i >= truncate_length:
-                        r += '...'
-                        break
-                    r += to_string(v)
-        elif any(isinstance(val, t) for t in [bool, bytes, float, int, str, numpy.number]):
-            if no_str is True and isinstance(val, str):
-                val = '<string length: <{0}>>'.format(len(val))
-            elif any(isinstance(val, t) for t in [bytes, str]):
-                if truncate_length is not None and len(val) > truncate_length:
-                    val = val[:truncate_length]
-                    if isinstance(val, bytes):
-                        val += b'...'
-                    else:
-                        val += '...'
-            r = str(val)
-        else:
-            r = message_to_csv(val, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
-        return r
-    result = ''
+    converter = _get_csv_converter(
+        type(msg), truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+        binary_encoding=binary_encoding)
+    return converter(msg)
 
-    # The get_fields_and_field_types() method returns a map of field_names to stringified versions
-    # of the field types. But here we want the "rosidl_parser.definition" types, so we zip the
-    # field names together with SLOT_TYPES. The length of these two is guaranteed to be the same
-    # length by the Python code generator.
-    for field_name, field_type in zip(msg.get_fields_and_field_types().keys(), msg.SLOT_TYPES):
-        value = getattr(msg, field_name)
 
-        if result:
-            result += ','
+class MessageCsvWriter:
+    """
+    Write ROS messages of one type to a file object as rows of comma-separated values.
 
-        result += to_string(value, field_type)
-    return result
+    The values are converted like :func:`message_to_csv` does and written with the csv module,
+    which quotes them as needed, so that each row has one cell for each name of the header.
+    Rows are buffered and written to the file object in chunks, so call :meth:`flush` (or use
+    the writer as a context manager) once done writing.
+
+    The header row holds the flattened names of the cells of a row, e.g. 'header.stamp.sec' for
+    a nested message or 'position[0]' for an item of a fixed-size array.
+    Since the number of values of a sequence depends on its length, a sequence only gets one
+    name in the header, and its comma-separated values are written to one cell, as are the
+    values of an array written with a binary encoding.
+    """
+
+    def __init__(
+        self,
+        file: Any,
+        message_type: Any,
+        *,
+        header: bool = True,
+        truncate_length: int = None,
+        no_arr: bool = False,
+        no_str: bool = False,
+        binary_encoding: str = None,
+        chunk_size: int = 1024
+    ) -> None:
+        """
+        Create a CSV writer.
+
+        :param file: The file object to write to, opened in text mode, preferably with
+            newline='' as recommended by the csv module.
+        :param message_type: The type of the ROS messages to write.
+        :param header: Whether to write a header row before the first row.
+        :param truncate_length: Truncate values for all message fields to this length.
+            This does not truncate the list of message fields.
+        :param no_arr: Exclude array fields of the message.
+        :param no_str: Exclude string fields of the message.
+        :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single value,
+            either 'base64' or 'hex'; by default each item is a separate value.
+        :param chunk_size: The number of rows to buffer before writing them to the file object.
+        """
+        self._writer = csv.writer(file, lineterminator='\n')
+        self._message_type = message_type
+        self._converter = _get_csv_cells_converter(
+            message_type, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+            binary_encoding=binary_encoding)
+        self._chunk_size = chunk_size
+        self._rows = []
+        self.fieldnames = _get_csv_header(message_type, truncate_length, no_arr, binary_encoding)
+        if header:
+            self._rows.append(self.fieldnames)
+
+    def write(self, msg: Any) -> None:
+        """
+        Write a ROS message as a row.
+
+        :param msg: The ROS message to write.
+        :raises TypeError: If the message is not of the type of the writer.
+        """
+        if type(msg) is not self._message_type:
+            raise TypeError(
+                "Expected a message of type '{}' but got '{}'".format(
+                    self._message_type.__name__, type(msg).__name__))
+        self._rows.append(self._converter(msg))
+        if len(self._rows) >= self._chunk_size:
+            self.flush()
+
+    def write_messages(self, msgs: Iterable[Any]) -> None:
+        """
+        Write ROS messages as rows and flush them to the file object.
+
+        :param msgs: The ROS messages to write.
+        :raises TypeError: If a message is not of the type of the writer.
+        """
+        for msg in msgs:
+            self.write(msg)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows to the file object."""
+        if self._rows:
+            self._writer.writerows(self._rows)
+            self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_csv_converter(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Callable[[Any], str]:
+    # Compile a converter to comma-separated values for a message class, like the ones of
+    # message_to_ordereddict
+    __check_binary_encoding(binary_encoding)
+    fields = tuple(
+        (field_name, __get_csv_field_handler(
+            field_type, truncate_length, no_arr, no_str, binary_encoding))
+        for field_name, field_type in _get_message_fields(message_class))
+    if instrumentation._enabled:
+        fields = __instrument_fields(fields, message_class, 'message_to_csv')
+
+    def converter(msg):
+        return __join_csv([handler(getattr(msg, field_name)) for field_name, handler in fields])
+    return converter
+
+
+@functools.lru_cache(maxsize=None)
+def _get_csv_cells_converter(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Callable[[Any], List[str]]:
+    # Compile a converter to the cells of a row of MessageCsvWriter, one for each name of the
+    # header returned by _get_csv_header
+    __check_binary_encoding(binary_encoding)
+    fields = tuple(
+        (field_name, __get_csv_cells_handler(
+            field_type, truncate_length, no_arr, no_str, binary_encoding))
+        for field_name, field_type in _get_message_fields(message_class))
+    if instrumentation._enabled:
+        fields = __instrument_fields(fields, message_class, 'message_to_csv')
+
+    def converter(msg):
+        cells = []
+        for field_name, handler in fields:
+            cells.extend(handler(getattr(msg, field_name)))
+        return cells
+    return converter
+
+
+def __get_csv_cells_handler(
+        field_type, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    # Return a function converting values of the given type to the list of cells named by
+    # __get_csv_field_names
+    if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+        return __get_nested_message_handler(
+            _get_csv_cells_converter, truncate_length, no_arr, no_str, binary_encoding)
+    if isinstance(field_type, rosidl_parser.definition.AbstractNestedType) and \
+            no_arr is not True and not __is_binary_field(field_type, binary_encoding):
+        item_handler = __get_csv_cells_handler(
+            field_type.value_type, truncate_length, no_arr, no_str, binary_encoding)
+        # The items of a fixed-size array have a cell each, while the values of the items of a
+        # sequence are joined into one cell
+        is_array = isinstance(field_type, rosidl_parser.definition.Array)
+
+        def handler(value):
+            truncated = truncate_length is not None and len(value) > truncate_length
+            cells = []
+            for v in (value[:truncate_length] if truncated else value):
+                cells.extend(item_handler(v))
+            if truncated:
+                cells.append('...')
+            return cells if is_array else [','.join(cells)]
+        return handler
+    field_handler = __get_csv_field_handler(
+        field_type, truncate_length, no_arr, no_str, binary_encoding)
+
+    def handler(value):
+        return [field_handler(value)]
+    return handler
+
+
+def __join_csv(values):
+    # Values are only separated by a comma once a non-empty value was written
+    for i, value in enumerate(values):
+        if value:
+            return ','.join(values[i:])
+    return ''
+
+
+def __get_csv_field_handler(
+        field_type, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+        if no_arr is True:
+            return functools.partial(__abbreviate_array_info, field_type=field_type)
+        if __is_binary_field(field_type, binary_encoding):
+            return __get_binary_handler(binary_encoding, truncate_length)
+        item_handler = __get_csv_item_handler(
+            field_type.value_type, truncate_length, no_arr, no_str, binary_encoding)
+
+        def handler(value):
+            if truncate_length is not None and len(value) > truncate_length:
+                return __join_csv([item_handler(v) for v in value[:truncate_length]] + ['...'])
+            return __join_csv([item_handler(v) for v in value])
+        return handler
+    return __get_csv_item_handler(field_type, truncate_length, no_arr, no_str, binary_encoding)
+
+
+def __get_csv_item_handler(
+        value_type, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    if isinstance(value_type, rosidl_parser.definition.BasicType):
+        if value_type.typename in _PASSTHROUGH_BASIC_TYPES:
+            return str
+        if value_type.typename == 'octet':
+            if truncate_length is None:
+                return str
+            return functools.partial(__truncate_csv_bytes, truncate_length=truncate_length)
+    elif isinstance(value_type, rosidl_parser.definition.AbstractGenericString):
+        if no_str is True:
+            return __abbreviate_string
+        if truncate_length is not None:
+            return functools.partial(__truncate_string, truncate_length=truncate_length)
+        return str
+    elif isinstance(value_type, rosidl_parser.definition.NamespacedType):
+        return __get_nested_message_handler(
+            _get_csv_converter, truncate_length, no_arr, no_str, binary_encoding)
+    return functools.partial(
+        __to_csv_string, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
+
+
+def __truncate_csv_bytes(value, *, truncate_length):
+    if len(value) > truncate_length:
+        value = value[:truncate_length] + b'...'
+    return str(value)
+
+
+def __to_csv_string(value, *, truncate_length=None, no_arr=False, no_str=False):
+    # Generic conversion of a value of any type to comma-separated values
+    if isinstance(value, (list, tuple, array.array, numpy.ndarray)):
+        truncated = truncate_length is not None and len(value) > truncate_length
+        values = [
+            __to_csv_string(v, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
+            for v in (value[:truncate_length] if truncated else value)]
+        if truncated:
+            values.append('...')
+        return __join_csv(values)
+    elif isinstance(value, (bool, bytes, float, int, str, numpy.number)):
+        if no_str is True and isinstance(value, str):
+            value = __abbreviate_string(value)
+        elif isinstance(value, (bytes, str)):
+            if truncate_length is not None and len(value) > truncate_length:
+                value = value[:truncate_length]
+                if isinstance(value, bytes):
+                    value += b'...'
+                else:
+                    value += '...'
+        return str(value)
+    return message_to_csv(value, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_csv_header(
+    message_class: Any, truncate_length: int, no_arr: bool, binary_encoding: str = None
+) -> Tuple[str, ...]:
+    names = []
+    for field_name, field_type in _get_message_fields(message_class):
+        names.extend(__get_csv_field_names(
+            field_name, field_type, truncate_length, no_arr, binary_encoding))
+    return tuple(names)
+
+
+def __get_csv_field_names(name, field_type, truncate_length, no_arr, binary_encoding) -> List[str]:
+    if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+        nested_class = import_message_from_namespaced_type(field_type)
+        return [
+            name + '.' + nested_name
+            for nested_name in _get_csv_header(
+                nested_class, truncate_length, no_arr, binary_encoding)]
+    if isinstance(field_type, rosidl_parser.definition.Array) and no_arr is not True and \
+            not __is_binary_field(field_type, binary_encoding):
+        size = field_type.size
+        truncated = truncate_length is not None and size > truncate_length
+        if truncated:
+            size = truncate_length
+        names = []
+        for i in range(size):
+            names.extend(__get_csv_field_names(
+                '{0}[{1}]'.format(name, i), field_type.value_type, truncate_length, no_arr,
+                binary_encoding))
+        if truncated:
+            names.append('{0}[...]'.format(name))
+        return names
+    return [name]
 
 
 # Convert a msg to an OrderedDict. We do this instead of implementing a generic __dict__() method
@@ -164,7 +790,8 @@ def message_to_ordereddict(
     *,
     truncate_length: int = None,
     no_arr: bool = False,
-    no_str: bool = False
+    no_str: bool = False,
+    binary_encoding: str = None
 ) -> OrderedDict:
     """
     Convert a ROS message to an OrderedDict.
@@ -174,22 +801,745 @@ def message_to_ordereddict(
         This does not truncate the list of fields (ie. the dictionary keys).
     :param no_arr: Exclude array fields of the message.
     :param no_str: Exclude string fields of the message.
+    :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single string,
+        either 'base64' or 'hex'; by default they are converted to lists.
     :returns: An OrderedDict where the keys are the ROS message fields and the values are
         set to the values of the input message.
+    :raises ValueError: If the binary encoding is not supported.
     """
-    d = OrderedDict()
+    converter = _get_message_converter(
+        type(msg), truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+        binary_encoding=binary_encoding)
+    return converter(msg)
 
+
+@functools.lru_cache(maxsize=None)
+def _get_message_fields(message_class: Any) -> Tuple[Tuple[str, Any], ...]:
     # The get_fields_and_field_types() method returns a map of field_names to stringified versions
     # of the field types. But here we want the "rosidl_parser.definition" types, so we zip the
     # field names together with SLOT_TYPES. The length of these two is guaranteed to be the same
     # length by the Python code generator.
-    for field_name, field_type in zip(msg.get_fields_and_field_types().keys(), msg.SLOT_TYPES):
-        value = getattr(msg, field_name, None)
-        value = _convert_value(
-            value, field_type=field_type,
-            truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
-        d[field_name] = value
-    return d
+    return tuple(zip(message_class.get_fields_and_field_types().keys(), message_class.SLOT_TYPES))
+
+
+# Basic types that the Python code generator maps to bool, int or float, which need no conversion.
+# When nested, the numeric ones are stored in numpy.ndarray or array.array containers.
+_PASSTHROUGH_BASIC_TYPES = frozenset(
+    ('boolean', 'float', 'double', 'long double', 'short', 'unsigned short', 'long',
+     'unsigned long', 'long long', 'unsigned long long', 'int8', 'uint8', 'int16', 'uint16',
+     'int32', 'uint32', 'int64', 'uint64'))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_message_converter(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Callable[[Any], OrderedDict]:
+    # Compile a converter for a message class, which is cached for each set of options.
+    # The handler for each field is chosen once from its type in SLOT_TYPES, so converting a
+    # message only reads the fields and applies the conversions they actually need.
+    __check_binary_encoding(binary_encoding)
+    fields = tuple(
+        (field_name, __get_field_handler(
+            field_type, truncate_length, no_arr, no_str, binary_encoding))
+        for field_name, field_type in _get_message_fields(message_class))
+    if instrumentation._enabled:
+        fields = __instrument_fields(fields, message_class, 'message_to_ordereddict')
+
+    def converter(msg):
+        d = OrderedDict()
+        for field_name, handler in fields:
+            value = getattr(msg, field_name, None)
+            d[field_name] = value if handler is None else handler(value)
+        return d
+    return converter
+
+
+def _get_field_converter(
+    field_type: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Optional[Callable]:
+    # Return the function converting values of a field like message_to_ordereddict does, or None
+    # if they are kept as they are
+    __check_binary_encoding(binary_encoding)
+    return __get_field_handler(field_type, truncate_length, no_arr, no_str, binary_encoding)
+
+
+def __instrument_fields(fields, message_class, operation):
+    # Time the handler of each field, which is the last item of its tuple.
+    # Fields kept as they are get a handler as well, so that they are counted.
+    return tuple(
+        field[:-1] + (instrumentation._instrument(
+            field[-1] or __keep_value, operation, message_class, field_type),)
+        for field, (_, field_type) in zip(fields, _get_message_fields(message_class)))
+
+
+def __keep_value(value):
+    return value
+
+
+def _clear_converters(instrumentation_enabled: bool) -> None:
+    # Drop the compiled converters, so that they are compiled again with or without
+    # instrumentation
+    for get_converter in (
+            _get_message_converter, _get_yaml_emitter, _get_yaml_block_writer,
+            _get_yaml_flow_writer, _get_csv_converter, _get_csv_cells_converter):
+        get_converter.cache_clear()
+
+
+instrumentation._add_listener(_clear_converters)
+
+
+def __get_field_handler(
+        field_type, truncate_length, no_arr, no_str, binary_encoding) -> Optional[Callable]:
+    # Return a function converting values of the given type, or None if they are kept as they are
+    if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+        if no_arr is True:
+            return functools.partial(__abbreviate_array_info, field_type=field_type)
+        if __is_binary_field(field_type, binary_encoding):
+            return __get_binary_handler(binary_encoding, truncate_length)
+        return __get_sequence_handler(
+            field_type.value_type, truncate_length, no_arr, no_str, binary_encoding)
+    return __get_item_handler(field_type, truncate_length, no_arr, no_str, binary_encoding)
+
+
+def __get_item_handler(
+        value_type, truncate_length, no_arr, no_str, binary_encoding) -> Optional[Callable]:
+    if isinstance(value_type, rosidl_parser.definition.BasicType):
+        if value_type.typename in _PASSTHROUGH_BASIC_TYPES:
+            return None
+        if value_type.typename == 'octet':
+            return functools.partial(__convert_bytes, truncate_length=truncate_length)
+    elif isinstance(value_type, rosidl_parser.definition.AbstractGenericString):
+        if no_str is True:
+            return __abbreviate_string
+        if truncate_length is not None:
+            return functools.partial(__truncate_string, truncate_length=truncate_length)
+        return None
+    elif isinstance(value_type, rosidl_parser.definition.NamespacedType):
+        return __get_nested_message_handler(
+            _get_message_converter, truncate_length, no_arr, no_str, binary_encoding)
+    # Fall back to the generic conversion for any other type (e.g. char)
+    return functools.partial(
+        _convert_value, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str)
+
+
+def __get_sequence_handler(
+        value_type, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    item_handler = __get_item_handler(
+        value_type, truncate_length, no_arr, no_str, binary_encoding)
+
+    if isinstance(value_type, rosidl_parser.definition.BasicType) and \
+            value_type.typename == 'octet':
+        def handler(value):
+            typename = tuple if isinstance(value, tuple) else list
+            if truncate_length is not None and len(value) > truncate_length:
+                value = value[:truncate_length]
+                suffix = ['...']
+            else:
+                suffix = []
+            # Decode all octets at once instead of one bytes object at a time
+            text = b''.join(value).decode('latin-1')
+            if len(text) != len(value):
+                return typename([item_handler(v) for v in value] + suffix)
+            return typename(list(text) + suffix)
+        return handler
+
+    if item_handler is None:
+        def handler(value):
+            if truncate_length is not None and len(value) > truncate_length:
+                value = value[:truncate_length]
+                suffix = ['...']
+            else:
+                suffix = []
+            typename = tuple if isinstance(value, tuple) else list
+            # numpy.ndarray and array.array turn their items into Python scalars in bulk
+            if isinstance(value, (numpy.ndarray, array.array)):
+                return value.tolist() + suffix
+            return typename(list(value) + suffix)
+        return handler
+
+    def handler(value):
+        typename = tuple if isinstance(value, tuple) else list
+        if truncate_length is not None and len(value) > truncate_length:
+            return typename([item_handler(v) for v in value[:truncate_length]] + ['...'])
+        return typename([item_handler(v) for v in value])
+    return handler
+
+
+def __get_nested_message_handler(
+        get_converter, truncate_length, no_arr, no_str, binary_encoding) -> Callable:
+    # The class of a nested message is taken from its value instead of being imported from its
+    # NamespacedType, since some types (e.g. those of actions) are not exported by name
+    converters = {}
+
+    def handler(value):
+        message_class = type(value)
+        converter = converters.get(message_class)
+        if converter is None:
+            converter = get_converter(
+                message_class, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+                binary_encoding=binary_encoding)
+            converters[message_class] = converter
+        return converter(value)
+    return handler
+
+
+def __convert_bytes(value, *, truncate_length=None):
+    # Latin-1 maps each byte to the character with the same code point, like chr() does
+    if truncate_length is not None and len(value) > truncate_length:
+        return value[:truncate_length].decode('latin-1') + '...'
+    return value.decode('latin-1')
+
+
+# Encodings of binary fields, i.e. arrays and sequences of octet, uint8 or char, as a string
+__BINARY_ENCODINGS = {
+    'base64': lambda data: base64.b64encode(data).decode('ascii'),
+    'hex': bytes.hex,
+}
+_BINARY_BASIC_TYPES = frozenset(('octet', 'uint8', 'char'))
+
+
+def __check_binary_encoding(binary_encoding):
+    if binary_encoding is not None and binary_encoding not in __BINARY_ENCODINGS:
+        raise ValueError(
+            "Unsupported binary encoding '{}', expected one of: {}".format(
+                binary_encoding, ', '.join(sorted(__BINARY_ENCODINGS))))
+
+
+def __is_binary_field(field_type, binary_encoding):
+    return binary_encoding is not None and \
+        isinstance(field_type, rosidl_parser.definition.AbstractNestedType) and \
+        isinstance(field_type.value_type, rosidl_parser.definition.BasicType) and \
+        field_type.value_type.typename in _BINARY_BASIC_TYPES
+
+
+def __get_binary_handler(binary_encoding, truncate_length) -> Callable:
+    encode = __BINARY_ENCODINGS[binary_encoding]
+
+    def handler(value):
+        if truncate_length is not None and len(value) > truncate_length:
+            return encode(__to_bytes(value[:truncate_length])) + '...'
+        return encode(__to_bytes(value))
+    return handler
+
+
+def __to_bytes(value):
+    # uint8 values are stored in numpy.ndarray or array.array containers, octet values are bytes
+    # objects of length one and char values are integers
+    if isinstance(value, (numpy.ndarray, array.array)):
+        return value.tobytes()
+    if len(value) and isinstance(value[0], bytes):
+        return b''.join(value)
+    if len(value) and isinstance(value[0], str):
+        return ''.join(value).encode('latin-1')
+    return bytes(value)
+
+
+def __abbreviate_string(value):
+    return '<string length: <{0}>>'.format(len(value))
+
+
+def __truncate_string(value, *, truncate_length):
+    if len(value) > truncate_length:
+        return value[:truncate_length] + '...'
+    return value
+
+
+class MessageView(Mapping):
+    """
+    A read-only mapping of the fields of a ROS message to their converted values.
+
+    Unlike :func:`message_to_ordereddict`, which converts all fields at once, a field is only
+    converted the first time it is accessed, after which its value is kept.
+    Nested messages are views as well, so that only the fields read from them are converted.
+    Since the values are kept, fields changed in the message once accessed are not updated.
+
+    The values are the same as the ones returned by :func:`message_to_ordereddict` with the same
+    options, and a view compares equal to them.
+    """
+
+    __slots__ = ('_msg', '_options', '_handlers', '_values')
+
+    def __init__(
+        self,
+        msg: Any,
+        *,
+        truncate_length: int = None,
+        no_arr: bool = False,
+        no_str: bool = False,
+        binary_encoding: str = None
+    ) -> None:
+        """
+        Create a view of a ROS message.
+
+        :param msg: The ROS message to view.
+        :param truncate_length: Truncate values for all message fields to this length.
+            This does not truncate the list of fields (ie. the keys of the mapping).
+        :param no_arr: Exclude array fields of the message.
+        :param no_str: Exclude string fields of the message.
+        :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single string,
+            either 'base64' or 'hex'; by default they are converted to lists.
+        :raises ValueError: If the binary encoding is not supported.
+        """
+        self._msg = msg
+        self._options = {
+            'truncate_length': truncate_length, 'no_arr': no_arr, 'no_str': no_str,
+            'binary_encoding': binary_encoding}
+        self._handlers = _get_view_handlers(type(msg), **self._options)
+        self._values = {}
+
+    def __getitem__(self, field_name: str) -> Any:
+        try:
+            return self._values[field_name]
+        except KeyError:
+            pass
+        handler = self._handlers[field_name]
+        value = getattr(self._msg, field_name, None)
+        if handler is not None:
+            value = handler(value)
+        self._values[field_name] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._handlers)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(type(self).__name__, self._msg)
+
+    @property
+    def message(self) -> Any:
+        """The ROS message of the view."""
+        return self._msg
+
+    def to_ordereddict(self) -> OrderedDict:
+        """
+        Convert all fields of the message.
+
+        :returns: The OrderedDict returned by :func:`message_to_ordereddict` for the message.
+        """
+        return message_to_ordereddict(self._msg, **self._options)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_view_handlers(
+    message_class: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> OrderedDict:
+    # Map the field names of a message class to the functions converting their values, like
+    # _get_message_converter does, except that nested messages are turned into views
+    __check_binary_encoding(binary_encoding)
+    options = {
+        'truncate_length': truncate_length, 'no_arr': no_arr, 'no_str': no_str,
+        'binary_encoding': binary_encoding}
+    handlers = OrderedDict()
+    for field_name, field_type in _get_message_fields(message_class):
+        if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+            handler = functools.partial(MessageView, **options)
+        elif isinstance(field_type, rosidl_parser.definition.AbstractNestedType) and \
+                isinstance(field_type.value_type, rosidl_parser.definition.NamespacedType) and \
+                no_arr is not True:
+            handler = functools.partial(
+                __view_message_sequence, truncate_length=truncate_length, options=options)
+        else:
+            handler = __get_field_handler(
+                field_type, truncate_length, no_arr, no_str, binary_encoding)
+        handlers[field_name] = handler
+    return handlers
+
+
+def __view_message_sequence(value, *, truncate_length, options):
+    typename = tuple if isinstance(value, tuple) else list
+    if truncate_length is not None and len(value) > truncate_length:
+        return typename(
+            [MessageView(v, **options) for v in value[:truncate_length]] + ['...'])
+    return typename([MessageView(v, **options) for v in value])
+
+
+class MessageProjection:
+    """
+    Extract and convert selected values of ROS messages of one type.
+
+    A field path is a dot-separated list of field names, each of which can be followed by an
+    index or a slice selecting items of an array or sequence, e.g. 'header.stamp',
+    'poses[0].position', 'ranges[0:10]' or 'poses[-2:].position.x'.
+    Field names following a slice are selected in each item of the slice.
+
+    The paths are checked against the message type and compiled once, so converting a message
+    only reads and converts the selected values.
+    They are converted like :func:`message_to_ordereddict`, :func:`message_to_yaml` and
+    :func:`message_to_csv` do, as if a selected slice was the whole array or sequence.
+    """
+
+    def __init__(
+        self,
+        message_type: Any,
+        paths: Iterable[str],
+        *,
+        truncate_length: int = None,
+        no_arr: bool = False,
+        no_str: bool = False,
+        binary_encoding: str = None
+    ) -> None:
+        """
+        Compile field paths for a message type.
+
+        :param message_type: The type of the ROS messages to convert.
+        :param paths: The field paths of the values to select.
+        :param truncate_length: Truncate the selected values to this length.
+        :param no_arr: Exclude the selected array fields.
+        :param no_str: Exclude the selected string fields.
+        :param binary_encoding: Encode the selected arrays of octet, uint8 or char fields as a
+            single string, either 'base64' or 'hex'.
+        :raises ValueError: If a path is not valid for the message type or the binary encoding is
+            not supported.
+        """
+        self.message_type = message_type
+        self.paths = tuple(paths)
+        self._to_ordereddict, self._to_csv = _compile_field_paths(
+            message_type, self.paths, truncate_length=truncate_length, no_arr=no_arr,
+            no_str=no_str, binary_encoding=binary_encoding)
+
+    def to_ordereddict(self, msg: Any) -> OrderedDict:
+        """
+        Convert the selected values of a ROS message to an OrderedDict.
+
+        :param msg: The ROS message to convert.
+        :returns: An OrderedDict where the keys are the field paths and the values are set to
+            the selected values of the message.
+        :raises IndexError: If an index is out of the range of an array or sequence.
+        """
+        return self._to_ordereddict(msg)
+
+    def to_yaml(self, msg: Any, *, flow_style: bool = False) -> str:
+        """
+        Convert the selected values of a ROS message to a YAML string.
+
+        :param msg: The ROS message to convert.
+        :param flow_style: Whether to use block style or flow style; defaults to block style.
+        :returns: A YAML string mapping the field paths to the selected values of the message.
+        :raises IndexError: If an index is out of the range of an array or sequence.
+        """
+        return _dump_yaml(self.to_ordereddict(msg), flow_style=flow_style)
+
+    def to_csv(self, msg: Any) -> str:
+        """
+        Convert the selected values of a ROS message to comma-separated values.
+
+        :param msg: The ROS message to convert.
+        :returns: The selected values of the message, in the order of the field paths.
+        :raises IndexError: If an index is out of the range of an array or sequence.
+        """
+        return self._to_csv(msg)
+
+
+# A step of a field path, either '.name' (or 'name' for the first one), '[index]' or
+# '[start:stop:step]'
+_FIELD_PATH_STEP = re.compile(
+    r'(?P<dot>\.)?(?P<name>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|\[\s*(?P<index>-?\d+)\s*\]'
+    r'|\[\s*(?P<start>-?\d*)\s*:\s*(?P<stop>-?\d*)\s*(?::\s*(?P<step>-?\d*)\s*)?\]')
+
+
+def _parse_field_path(path: str) -> List[Tuple[str, Any]]:
+    # Split a field path into ('field', name), ('index', index) and ('slice', slice) steps
+    steps = []
+    position = 0
+    while position < len(path):
+        match = _FIELD_PATH_STEP.match(path, position)
+        if match is None or (match.group('name') and bool(match.group('dot')) != bool(steps)):
+            raise ValueError("Invalid field path '{}' at position {}".format(path, position))
+        if match.group('name'):
+            steps.append(('field', match.group('name')))
+        elif match.group('index') is not None:
+            steps.append(('index', int(match.group('index'))))
+        else:
+            start, stop, step = (
+                int(value) if value else None
+                for value in match.group('start', 'stop', 'step'))
+            if step == 0:
+                raise ValueError("Invalid slice step of 0 in field path '{}'".format(path))
+            steps.append(('slice', slice(start, stop, step)))
+        position = match.end()
+    if not steps or steps[0][0] != 'field':
+        raise ValueError("Invalid field path '{}'".format(path))
+    return steps
+
+
+def _compile_field_paths(
+    message_class: Any,
+    paths: Tuple[str, ...],
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> Tuple[Callable[[Any], OrderedDict], Callable[[Any], str]]:
+    # Return functions extracting the values selected by field paths from a message and
+    # converting them like message_to_ordereddict and message_to_csv respectively
+    __check_binary_encoding(binary_encoding)
+    options = (truncate_length, no_arr, no_str, binary_encoding)
+    extractors = tuple(
+        (path,) + __compile_field_path_steps(
+            path, _parse_field_path(path), message_class, options)
+        for path in paths)
+
+    def to_ordereddict(msg):
+        return OrderedDict([(path, to_value(msg)) for path, to_value, _ in extractors])
+
+    def to_csv(msg):
+        return __join_csv([to_csv(msg) for _, _, to_csv in extractors])
+    return to_ordereddict, to_csv
+
+
+def __compile_field_path_steps(path, steps, field_type, options):
+    # field_type is the rosidl type of the values the steps apply to, or the message class for
+    # the first step
+    if not steps:
+        to_value = __get_field_handler(field_type, *options) or __keep_value
+        return to_value, __get_csv_field_handler(field_type, *options)
+
+    kind, selector = steps[0]
+    if kind == 'field':
+        if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+            message_class = import_message_from_namespaced_type(field_type)
+        elif isinstance(field_type, type):
+            message_class = field_type
+        else:
+            raise ValueError(
+                "Invalid field path '{}': '{}' is not a field of a message".format(
+                    path, selector))
+        field_types = dict(_get_message_fields(message_class))
+        if selector not in field_types:
+            raise ValueError(
+                "Invalid field path '{}': '{}' has no field '{}'".format(
+                    path, message_class.__name__, selector))
+        to_value, to_csv = __compile_field_path_steps(
+            path, steps[1:], field_types[selector], options)
+        get_field = operator.attrgetter(selector)
+        return (lambda msg: to_value(get_field(msg))), (lambda msg: to_csv(get_field(msg)))
+
+    if not isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+        raise ValueError(
+            "Invalid field path '{}': {} selects items of a value which is not an array or "
+            'a sequence'.format(path, '[]' if kind == 'index' else '[:]'))
+    if kind == 'index':
+        to_value, to_csv = __compile_field_path_steps(
+            path, steps[1:], field_type.value_type, options)
+        return (
+            (lambda value: to_value(__get_python_item(value, selector))),
+            (lambda value: to_csv(value[selector])))
+    if len(steps) == 1:
+        # Convert a slice like the whole array or sequence
+        to_value, to_csv = __compile_field_path_steps(path, [], field_type, options)
+        return (lambda value: to_value(value[selector])), (lambda value: to_csv(value[selector]))
+    # Apply the following steps to each item of the slice
+    to_value, to_csv = __compile_field_path_steps(
+        path, steps[1:], field_type.value_type, options)
+    return (
+        (lambda value: [to_value(item) for item in value[selector]]),
+        (lambda value: __join_csv([to_csv(item) for item in value[selector]])))
+
+
+def __get_python_item(value, index):
+    # Items of numpy.ndarray are NumPy scalars, which message_to_ordereddict turns into Python
+    # scalars as well
+    item = value[index]
+    if isinstance(item, numpy.generic):
+        return item.item()
+    return item
+
+
+def messages_to_columns(msgs: Iterable[Any]) -> OrderedDict:
+    """
+    Convert ROS messages of the same type to columns of NumPy arrays.
+
+    Fields of nested messages are flattened into dot-separated paths (e.g. 'header.stamp.sec').
+    The dtype of each column is derived from the basic type of its field, and strings are
+    stored as NumPy unicode strings.
+    Fixed-size arrays add a dimension to their columns.
+    Variable-length sequences are stored in object arrays holding, for each message, the column
+    for the elements of the sequence, or an OrderedDict of columns for sequences of messages.
+
+    :param msgs: The ROS messages to convert, which must all be of the same type.
+    :returns: An OrderedDict where the keys are flattened field paths and the values are NumPy
+        arrays whose first dimension is the number of messages.
+        The OrderedDict is empty if no messages are given.
+    :raises TypeError: If the messages are not all of the same type.
+    """
+    msgs = list(msgs)
+    columns = OrderedDict()
+    if not msgs:
+        return columns
+    message_class = type(msgs[0])
+    for msg in msgs:
+        if type(msg) is not message_class:
+            raise TypeError(
+                "Expected messages of type '{}' but got '{}'".format(
+                    message_class.__name__, type(msg).__name__))
+    __add_columns(columns, '', message_class, msgs)
+    return columns
+
+
+def __add_columns(columns, prefix, message_class, msgs):
+    count = len(msgs)
+    for field_name, field_type in _get_message_fields(message_class):
+        path = prefix + field_name
+        values = [getattr(msg, field_name) for msg in msgs]
+        if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+            __add_columns(
+                columns, path + '.', __get_message_class(field_type, values), values)
+        elif isinstance(field_type, rosidl_parser.definition.Array):
+            value_type = field_type.value_type
+            shape = (count, field_type.size)
+            if isinstance(value_type, rosidl_parser.definition.NamespacedType):
+                # Convert the items of all arrays at once and split them per message
+                items = [item for value in values for item in value]
+                nested_columns = OrderedDict()
+                __add_columns(
+                    nested_columns, '', __get_message_class(value_type, items), items)
+                for nested_path, column in nested_columns.items():
+                    columns[path + '.' + nested_path] = column.reshape(shape + column.shape[1:])
+            elif values and isinstance(values[0], numpy.ndarray):
+                columns[path] = numpy.stack(values).astype(
+                    _NUMPY_DTYPES[value_type.typename], copy=False)
+            else:
+                items = [item for value in values for item in value]
+                columns[path] = __values_to_numpy(items, value_type).reshape(shape)
+        elif isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+            value_type = field_type.value_type
+            column = numpy.empty(count, dtype=object)
+            if isinstance(value_type, rosidl_parser.definition.NamespacedType):
+                for i, value in enumerate(values):
+                    column[i] = OrderedDict()
+                    __add_columns(
+                        column[i], '', __get_message_class(value_type, value), list(value))
+            else:
+                for i, value in enumerate(values):
+                    column[i] = __values_to_numpy(value, value_type)
+            columns[path] = column
+        else:
+            columns[path] = __values_to_numpy(values, field_type)
+
+
+def get_message_dtype(message_type: Any, *, align: bool = False) -> numpy.dtype:
+    """
+    Get the NumPy structured dtype of a ROS message type whose fields all have a fixed size.
+
+    Fields of basic types map to the dtypes used by :func:`messages_to_columns`, fixed-size
+    arrays to subarrays and nested messages to nested structured dtypes.
+
+    :param message_type: The type of the ROS messages.
+    :param align: Whether to pad the fields like a C compiler would, see numpy.dtype.
+    :returns: A structured dtype with a field for each field of the message type.
+    :raises ValueError: If a field, or a field of a nested message, is a string or a sequence,
+        which have no fixed size.
+    """
+    return _get_message_dtype(message_type, align)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_message_dtype(message_class: Any, align: bool) -> numpy.dtype:
+    fields = []
+    for field_name, field_type in _get_message_fields(message_class):
+        value_type = field_type
+        if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+            value_type = field_type.value_type
+            if not isinstance(field_type, rosidl_parser.definition.Array):
+                raise ValueError(
+                    "Message type '{}' has no fixed size: field '{}' is a sequence".format(
+                        message_class.__name__, field_name))
+        if isinstance(value_type, rosidl_parser.definition.NamespacedType):
+            dtype = _get_message_dtype(import_message_from_namespaced_type(value_type), align)
+        elif isinstance(value_type, rosidl_parser.definition.BasicType):
+            # Characters of wide strings are strings of one character
+            dtype = numpy.dtype('U1' if value_type.typename == 'wchar' else
+                                _NUMPY_DTYPES[value_type.typename])
+        else:
+            raise ValueError(
+                "Message type '{}' has no fixed size: field '{}' is a string".format(
+                    message_class.__name__, field_name))
+        if isinstance(field_type, rosidl_parser.definition.Array):
+            fields.append((field_name, dtype, (field_type.size,)))
+        else:
+            fields.append((field_name, dtype))
+    return numpy.dtype(fields, align=align)
+
+
+def messages_to_structured_array(
+    msgs: Iterable[Any], message_type: Any = None, *, align: bool = False
+) -> numpy.ndarray:
+    """
+    Convert ROS messages of the same fixed-size type to a NumPy structured array.
+
+    The messages are stored in one contiguous buffer, which can be sliced, stored or handed off
+    at once and turned back into messages with :func:`rosidl_runtime_py.create_messages`.
+
+    :param msgs: The ROS messages to convert, which must all be of the same type.
+    :param message_type: The type of the ROS messages, by default the type of the first one,
+        which must be given if there are no messages.
+    :param align: Whether to pad the fields like a C compiler would, see numpy.dtype.
+    :returns: A structured array with an item for each message, whose dtype is the one returned
+        by :func:`get_message_dtype`.
+    :raises TypeError: If the messages are not all of the given type.
+    :raises ValueError: If the message type has no fixed size or no messages and no message type
+        are given.
+    """
+    msgs = list(msgs)
+    if message_type is None:
+        if not msgs:
+            raise ValueError('Expected a message type when converting no messages')
+        message_type = type(msgs[0])
+    dtype = get_message_dtype(message_type, align=align)
+    if msgs and type(msgs[0]) is not message_type:
+        raise TypeError(
+            "Expected messages of type '{}' but got '{}'".format(
+                message_type.__name__, type(msgs[0]).__name__))
+    # Zeros fill the padding, so that the bytes of equal messages are equal as well
+    result = numpy.zeros(len(msgs), dtype=dtype)
+    for path, column in messages_to_columns(msgs).items():
+        view = result
+        for field_name in path.split('.'):
+            view = view[field_name]
+        view[...] = column
+    return result
+
+
+def __get_message_class(value_type, values):
+    # Prefer the class of the values since some types (e.g. those of actions) are not exported
+    # by name, and only import it when there are no values
+    if len(values):
+        return type(values[0])
+    return import_message_from_namespaced_type(value_type)
+
+
+def __values_to_numpy(values, value_type) -> numpy.ndarray:
+    if isinstance(value_type, rosidl_parser.definition.AbstractGenericString):
+        return numpy.array(values, dtype=numpy.str_)
+    dtype = _NUMPY_DTYPES[value_type.typename]
+    if isinstance(values, (numpy.ndarray, array.array)):
+        # Copy the whole buffer at once
+        return numpy.array(values, dtype=dtype)
+    if value_type.typename == 'octet':
+        return numpy.frombuffer(bytearray().join(values), dtype=dtype)
+    if len(values) and isinstance(values[0], str):
+        return numpy.array(values, dtype=numpy.str_)
+    return numpy.fromiter(values, dtype=dtype, count=len(values))
 
 
 def _convert_value(
@@ -202,15 +1552,12 @@ def _convert_value(
 ):
 
     if isinstance(value, bytes):
-        if truncate_length is not None and len(value) > truncate_length:
-            value = ''.join([chr(c) for c in value[:truncate_length]]) + '...'
-        else:
-            value = ''.join([chr(c) for c in value])
+        value = __convert_bytes(value, truncate_length=truncate_length)
     elif isinstance(value, str):
         if no_str is True:
-            value = '<string length: <{0}>>'.format(len(value))
-        elif truncate_length is not None and len(value) > truncate_length:
-            value = value[:truncate_length] + '...'
+            value = __abbreviate_string(value)
+        elif truncate_length is not None:
+            value = __truncate_string(value, truncate_length=truncate_length)
     elif isinstance(value, (list, tuple, array.array, numpy.ndarray)):
         # Since arrays and ndarrays can't contain mixed types convert to list
         typename = tuple if isinstance(value, tuple) else list
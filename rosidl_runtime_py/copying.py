@@ -0,0 +1,113 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import copy
+import functools
+from typing import Any
+from typing import Optional
+from typing import Tuple
+
+import numpy
+
+from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py.convert import _get_message_fields
+
+# Kinds of slots, which are copied differently
+_VALUE = 'value'
+_ARRAY = 'array'
+_MESSAGE = 'message'
+_MESSAGE_SEQUENCE = 'message sequence'
+
+
+def copy_message(msg: Any, *, share_arrays: bool = False) -> Any:
+    """
+    Create a deep copy of a ROS message.
+
+    The message is copied field by field, the way its type lays them out: values of basic types
+    and strings are immutable and shared, arrays and sequences are copied at once and nested
+    messages are copied recursively.
+    The fields of the copy are set without being checked again, and the message type's
+    constructor is not called.
+    This is faster than copy.deepcopy, which goes through the generic copy protocol for each
+    object.
+
+    :param msg: The ROS message to copy.
+    :param share_arrays: Whether to share the arrays and sequences of values of basic types
+        and strings (e.g. numpy.ndarray, array.array or lists of strings) with the message
+        instead of copying them, which is only safe if neither the message nor the copy
+        changes them in place.
+        Nested messages, including those in arrays and sequences, are always copied.
+    :returns: A copy of the message.
+    """
+    message_class = type(msg)
+    plan = _get_copy_plan(message_class)
+    if plan is None:
+        return copy.deepcopy(msg)
+    msg_copy = message_class.__new__(message_class)
+    for slot, kind in plan:
+        try:
+            value = getattr(msg, slot)
+        except AttributeError:
+            continue
+        if kind is _ARRAY:
+            if not share_arrays:
+                value = _copy_array(value)
+        elif kind is _MESSAGE:
+            value = copy_message(value, share_arrays=share_arrays)
+        elif kind is _MESSAGE_SEQUENCE:
+            value = [copy_message(item, share_arrays=share_arrays) for item in value]
+        setattr(msg_copy, slot, value)
+    return msg_copy
+
+
+@functools.lru_cache(maxsize=None)
+def _get_copy_plan(message_class: Any) -> Optional[Tuple[Tuple[str, str], ...]]:
+    # The slots of a message class with how to copy them, or None if the fields aren't stored
+    # in the slots the Python code generator uses, i.e. '_' and the field name
+    slots = getattr(message_class, '__slots__', None)
+    if slots is None:
+        return None
+    plan = []
+    field_slots = set()
+    for field_name, field_type in _get_message_fields(message_class):
+        slot = '_' + field_name
+        if slot not in slots:
+            return None
+        if isinstance(field_type, NamespacedType):
+            kind = _MESSAGE
+        elif isinstance(field_type, AbstractNestedType):
+            if isinstance(field_type.value_type, NamespacedType):
+                kind = _MESSAGE_SEQUENCE
+            else:
+                kind = _ARRAY
+        else:
+            kind = _VALUE
+        plan.append((slot, kind))
+        field_slots.add(slot)
+    # Other slots (e.g. whether to check the values of fields) are shared
+    plan.extend((slot, _VALUE) for slot in slots if slot not in field_slots)
+    return tuple(plan)
+
+
+def _copy_array(value: Any) -> Any:
+    if isinstance(value, numpy.ndarray):
+        return value.copy()
+    if isinstance(value, array.array):
+        # Slicing copies the memory of the array at once
+        return value[:]
+    if isinstance(value, list):
+        return list(value)
+    return copy.copy(value)
@@ -0,0 +1,228 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+from collections import OrderedDict
+import functools
+from typing import Any
+from typing import Callable
+from typing import Tuple
+
+import numpy
+
+from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py.convert import _get_field_converter
+from rosidl_runtime_py.convert import _get_message_fields
+from rosidl_runtime_py.convert import message_to_ordereddict
+from rosidl_runtime_py.copying import copy_message
+
+# Kinds of fields, which are compared differently
+_VALUE = 'value'
+_MESSAGE = 'message'
+_MESSAGE_SEQUENCE = 'message sequence'
+
+
+def diff_messages(
+    old_msg: Any,
+    new_msg: Any,
+    *,
+    truncate_length: int = None,
+    no_arr: bool = False,
+    no_str: bool = False,
+    binary_encoding: str = None
+) -> OrderedDict:
+    """
+    Get the fields which differ between two ROS messages of the same type.
+
+    The fields of nested messages, and of the items of sequences of messages of the same length,
+    are compared one by one, while other arrays and sequences are compared as a whole.
+    NaN values are equal to each other.
+
+    :param old_msg: The ROS message to compare with.
+    :param new_msg: The ROS message to compare.
+    :param truncate_length: Truncate the values of the changed fields to this length.
+    :param no_arr: Exclude the values of the changed array fields.
+    :param no_str: Exclude the values of the changed string fields.
+    :param binary_encoding: Encode the values of the changed arrays of octet, uint8 or char
+        fields as a single string, either 'base64' or 'hex'.
+    :returns: An OrderedDict where the keys are the paths of the changed fields (e.g.
+        'header.stamp.sec' or 'poses[2].position'), in the order of the fields, and the values
+        are set to the values of the fields in the new message, converted as by
+        :func:`rosidl_runtime_py.message_to_ordereddict`.
+    :raises TypeError: If the messages are not of the same type.
+    :raises ValueError: If the binary encoding is not supported.
+    """
+    if type(old_msg) is not type(new_msg):
+        raise TypeError(
+            "Expected messages of the same type but got '{}' and '{}'".format(
+                type(old_msg).__name__, type(new_msg).__name__))
+    changes = OrderedDict()
+    _diff_fields(
+        old_msg, new_msg, '', changes,
+        (truncate_length, no_arr, no_str, binary_encoding))
+    return changes
+
+
+def messages_equal(msg_a: Any, msg_b: Any) -> bool:
+    """
+    Check if two ROS messages are of the same type and have the same values.
+
+    The fields are compared like :func:`diff_messages` does, with numeric arrays and sequences
+    compared at once, and the comparison stops at the first field which differs.
+    NaN values are equal to each other, unlike when comparing messages with ==.
+
+    :param msg_a: A ROS message.
+    :param msg_b: Another ROS message.
+    :returns: True if the messages are equal.
+    """
+    if type(msg_a) is not type(msg_b):
+        return False
+    for field_name, kind, _ in _get_diff_plan(type(msg_a), *_NO_OPTIONS):
+        value_a = getattr(msg_a, field_name)
+        value_b = getattr(msg_b, field_name)
+        if kind is _MESSAGE:
+            if not messages_equal(value_a, value_b):
+                return False
+        elif kind is _MESSAGE_SEQUENCE:
+            if len(value_a) != len(value_b) or not all(
+                    messages_equal(item_a, item_b) for item_a, item_b in zip(value_a, value_b)):
+                return False
+        elif not _values_equal(value_a, value_b):
+            return False
+    return True
+
+
+# The default conversion options, i.e. truncate_length, no_arr, no_str and binary_encoding
+_NO_OPTIONS = (None, False, False, None)
+
+
+class MessageDeltaEncoder:
+    """
+    Encode a stream of ROS messages as the changes from one message to the next.
+
+    The first message is encoded as a whole, like :func:`rosidl_runtime_py.message_to_ordereddict`
+    does, and each following message as the fields changed since the previous message, like
+    :func:`diff_messages` does.
+    Since field names are valid field paths, all encoded messages map field paths to values.
+
+    A copy of each message is kept to compare the next one with, so messages can be reused once
+    encoded.
+    """
+
+    def __init__(
+        self,
+        *,
+        keyframe_interval: int = None,
+        truncate_length: int = None,
+        no_arr: bool = False,
+        no_str: bool = False,
+        binary_encoding: str = None
+    ) -> None:
+        """
+        Create a delta encoder.
+
+        :param keyframe_interval: Encode every message with this index as a whole, e.g. every
+            tenth message if 10, so that a stream can be decoded from there; by default only the
+            first message is encoded as a whole.
+        :param truncate_length: Truncate values for all message fields to this length.
+        :param no_arr: Exclude array fields of the message.
+        :param no_str: Exclude string fields of the message.
+        :param binary_encoding: Encode arrays of octet, uint8 or char fields as a single string,
+            either 'base64' or 'hex'.
+        :raises ValueError: If the keyframe interval is not positive.
+        """
+        if keyframe_interval is not None and keyframe_interval < 1:
+            raise ValueError(
+                'Expected a positive keyframe interval but got {}'.format(keyframe_interval))
+        self._keyframe_interval = keyframe_interval
+        self._options = {
+            'truncate_length': truncate_length, 'no_arr': no_arr, 'no_str': no_str,
+            'binary_encoding': binary_encoding}
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous message, so that the next message is encoded as a whole."""
+        self._previous_msg = None
+        self._count = 0
+
+    def encode(self, msg: Any) -> OrderedDict:
+        """
+        Encode a ROS message.
+
+        A message of another type than the previous one is encoded as a whole.
+
+        :param msg: The ROS message to encode.
+        :returns: An OrderedDict mapping field paths to values, which is empty if no field
+            changed.
+        """
+        keyframe = self._previous_msg is None or type(msg) is not type(self._previous_msg) or (
+            self._keyframe_interval is not None and self._count % self._keyframe_interval == 0)
+        if keyframe:
+            delta = message_to_ordereddict(msg, **self._options)
+        else:
+            delta = diff_messages(self._previous_msg, msg, **self._options)
+        self._previous_msg = copy_message(msg)
+        self._count += 1
+        return delta
+
+
+def _diff_fields(old_msg, new_msg, prefix, changes, options):
+    for field_name, kind, convert in _get_diff_plan(type(new_msg), *options):
+        old_value = getattr(old_msg, field_name)
+        new_value = getattr(new_msg, field_name)
+        if kind is _MESSAGE and type(old_value) is type(new_value):
+            _diff_fields(old_value, new_value, prefix + field_name + '.', changes, options)
+        elif kind is _MESSAGE_SEQUENCE and len(old_value) == len(new_value):
+            for i, (old_item, new_item) in enumerate(zip(old_value, new_value)):
+                _diff_fields(
+                    old_item, new_item, '{}{}[{}].'.format(prefix, field_name, i), changes,
+                    options)
+        elif kind is _MESSAGE or kind is _MESSAGE_SEQUENCE or \
+                not _values_equal(old_value, new_value):
+            changes[prefix + field_name] = new_value if convert is None else convert(new_value)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_diff_plan(
+    message_class: Any, *options: Any
+) -> Tuple[Tuple[str, str, Callable], ...]:
+    # The kind of each field and the function converting its value, like message_to_ordereddict
+    truncate_length, no_arr, no_str, binary_encoding = options
+    plan = []
+    for field_name, field_type in _get_message_fields(message_class):
+        if isinstance(field_type, NamespacedType):
+            kind = _MESSAGE
+        elif isinstance(field_type, AbstractNestedType) and \
+                isinstance(field_type.value_type, NamespacedType):
+            kind = _MESSAGE_SEQUENCE
+        else:
+            kind = _VALUE
+        convert = _get_field_converter(
+            field_type, truncate_length=truncate_length, no_arr=no_arr, no_str=no_str,
+            binary_encoding=binary_encoding)
+        plan.append((field_name, kind, convert))
+    return tuple(plan)
+
+
+def _values_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, (numpy.ndarray, array.array)) or isinstance(b, (numpy.ndarray, array.array)):
+        # Compare all items at once, using the memory of array.array objects
+        a = numpy.asarray(a)
+        b = numpy.asarray(b)
+        if a.shape != b.shape:
+            return False
+        return bool(numpy.array_equal(a, b, equal_nan=a.dtype.kind in 'fc'))
+    # NaN values are not equal to themselves
+    return a == b or (a != a and b != b)
@@ -13,13 +13,25 @@
 # limitations under the License.
 
 import os
+import threading
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
 
-from ament_index_python import get_resource
 from ament_index_python import get_resources
+from ament_index_python import get_search_paths
 from ament_index_python import has_resource
+from ament_index_python.constants import RESOURCE_INDEX_SUBFOLDER
+
+# If set, the interfaces of all packages are cached in a file in this directory, which is reused
+# until the resource index of one of the prefix paths changes
+INTERFACE_CACHE_DIR_ENV_VAR = 'ROSIDL_RUNTIME_PY_CACHE_DIR'
+_INTERFACE_CACHE_VERSION = 1
+# Maximum number of resource files read concurrently
+_MAX_READ_WORKERS = 8
 
 
 def get_interface_packages() -> Dict[str, str]:
@@ -27,20 +39,258 @@ def get_interface_packages() -> Dict[str, str]:
     return get_resources('rosidl_interfaces')
 
 
-def _get_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
-    interfaces = {}
-    if len(package_names) == 0:
-        package_names = get_resources('rosidl_interfaces')
+class InterfaceCatalog:
+    """
+    An index of the interfaces generated by the packages in the ament index.
+
+    The interfaces of a package are read from the ament index the first time they are requested
+    and each of them is classified once as a message, service or action interface, or as a
+    hidden one if its name contains an underscore.
+    The index is kept until :meth:`refresh` is called or the prefix paths change, so long-running
+    tools should refresh it to pick up packages built in the meantime.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty catalog, which is filled when used."""
+        self._lock = threading.Lock()
+        self._prefix_paths = None
+        self._packages = set()
+        self._interface_packages = []
+        self._resource_paths = {}
+        self._interfaces = {}
+
+    def refresh(self) -> None:
+        """Drop the index, so that it is read again from the ament index when used next."""
+        with self._lock:
+            self._prefix_paths = None
+            self._interfaces = {}
+
+    def get_interfaces(self, package_names: Iterable[str] = []) -> Dict[str, List[str]]:
+        """
+        Get interfaces for one or more packages.
+
+        See :func:`rosidl_runtime_py.get_interfaces`.
+        """
+        return self._get_interfaces(package_names, None)
+
+    def get_message_interfaces(self, package_names: Iterable[str] = []) -> Dict[str, List[str]]:
+        """
+        Get message interfaces for one or more packages.
+
+        See :func:`rosidl_runtime_py.get_message_interfaces`.
+        """
+        return self._get_interfaces(package_names, 'msg')
+
+    def get_service_interfaces(self, package_names: Iterable[str] = []) -> Dict[str, List[str]]:
+        """
+        Get service interfaces for one or more packages.
+
+        See :func:`rosidl_runtime_py.get_service_interfaces`.
+        """
+        return self._get_interfaces(package_names, 'srv')
+
+    def get_action_interfaces(self, package_names: Iterable[str] = []) -> Dict[str, List[str]]:
+        """
+        Get action interfaces for one or more packages.
+
+        See :func:`rosidl_runtime_py.get_action_interfaces`.
+        """
+        return self._get_interfaces(package_names, 'action')
+
+    def _get_interfaces(
+        self, package_names: Iterable[str], kind: Optional[str]
+    ) -> Dict[str, List[str]]:
+        with self._lock:
+            prefix_paths = get_search_paths()
+            if prefix_paths != self._prefix_paths:
+                self._scan(prefix_paths)
+            if len(package_names) == 0:
+                package_names = self._interface_packages
+            for package_name in package_names:
+                if package_name not in self._packages:
+                    raise LookupError(f"Unknown package '{package_name}'")
+            # Read the resources of all requested packages which were not read yet at once
+            resource_paths = {
+                package_name: self._resource_paths[package_name]
+                for package_name in package_names
+                if package_name not in self._interfaces and package_name in self._resource_paths}
+            if resource_paths:
+                for package_name, content in _read_resources(resource_paths).items():
+                    self._interfaces[package_name] = _classify_interfaces(content.splitlines())
+            interfaces = {}
+            for package_name in package_names:
+                package_interfaces = self._interfaces.get(package_name)
+                if package_interfaces is not None and package_interfaces[kind]:
+                    interfaces[package_name] = list(package_interfaces[kind])
+            return interfaces
+
+    def _scan(self, prefix_paths: List[str]) -> None:
+        catalog = _get_cached_interface_catalog()
+        if catalog is None:
+            # The interfaces of each package are only read once requested
+            self._packages = set(_scan_resource_index(prefix_paths, 'packages'))
+            self._resource_paths = _scan_resource_index(prefix_paths, 'rosidl_interfaces')
+            self._interface_packages = list(self._resource_paths)
+            self._interfaces = {}
+        else:
+            packages, interfaces = catalog
+            self._packages = packages
+            self._resource_paths = {}
+            self._interface_packages = list(interfaces)
+            self._interfaces = {
+                package_name: _classify_interfaces(interface_names)
+                for package_name, interface_names in interfaces.items()}
+        self._prefix_paths = prefix_paths
+
+
+def _classify_interfaces(interface_names: Iterable[str]) -> Dict[Optional[str], Tuple[str, ...]]:
+    # Map each kind of interfaces to the names of the interfaces of this kind without their
+    # suffix, and None to the names of all interfaces which are not hidden
+    interfaces = {None: set(), 'msg': set(), 'srv': set(), 'action': set(), 'hidden': set()}
+    for interface_name in interface_names:
+        name = interface_name.rsplit('.', 1)[0]
+        if '_' in interface_name:
+            interfaces['hidden'].add(name)
+            continue
+        interfaces[None].add(name)
+        # identify the kind of interfaces by the namespace and suffix
+        namespace = interface_name.split('/', 1)[0]
+        suffix = interface_name[len(name) + 1:]
+        if namespace in ('msg', 'srv', 'action') and suffix in ('idl', namespace):
+            interfaces[namespace].add(name)
+    return {kind: tuple(sorted(names)) for kind, names in interfaces.items()}
+
+
+_interface_catalog = InterfaceCatalog()
+
+
+def get_interface_catalog() -> InterfaceCatalog:
+    """
+    Get the interface catalog shared by the functions listing interfaces of packages.
+
+    :return: The interface catalog, which may be refreshed to pick up changes of the ament index.
+    """
+    return _interface_catalog
+
+
+def _get_cached_interface_catalog() -> Optional[Tuple[Set[str], Dict[str, List[str]]]]:
+    # Return the names of all packages and the interfaces of all packages generating them from
+    # the cache file, after updating it if needed, or None if the cache is disabled
+    cache_dir = os.environ.get(INTERFACE_CACHE_DIR_ENV_VAR)
+    if not cache_dir:
+        return None
+    # These modules are imported here to keep importing this module fast when the cache is unused
+    import hashlib
+    import json
+    import tempfile
+
+    prefix_paths = get_search_paths()
+    fingerprint = _get_resource_index_fingerprint(prefix_paths)
+    cache_path = os.path.join(cache_dir, 'interfaces-{}.json'.format(
+        hashlib.sha1(os.pathsep.join(prefix_paths).encode('utf-8')).hexdigest()))
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as h:
+            cache = json.load(h)
+        if cache['version'] == _INTERFACE_CACHE_VERSION and \
+                cache['prefix_paths'] == prefix_paths and cache['fingerprint'] == fingerprint:
+            return set(cache['packages']), cache['interfaces']
+    except (OSError, ValueError, KeyError, TypeError):
+        # A missing, outdated or corrupted cache file is rewritten
+        pass
+
+    packages = _scan_resource_index(prefix_paths, 'packages')
+    interfaces = {
+        package_name: content.splitlines()
+        for package_name, content in _read_resources(
+            _scan_resource_index(prefix_paths, 'rosidl_interfaces')).items()}
+    cache = {
+        'version': _INTERFACE_CACHE_VERSION,
+        'prefix_paths': prefix_paths,
+        'fingerprint': fingerprint,
+        'packages': sorted(packages),
+        'interfaces': interfaces,
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Replace the cache file at once so that concurrent processes never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.interfaces-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as h:
+                json.dump(cache, h)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # The cache is only an optimization, so failing to write it is not an error
+        pass
+    return set(packages), interfaces
+
 
-    for package_name in package_names:
-        if not has_resource('packages', package_name):
-            raise LookupError(f"Unknown package '{package_name}'")
+def _scan_resource_index(prefix_paths: List[str], resource_type: str) -> Dict[str, str]:
+    # Map the names of the resources of a type to the path of their file in the first prefix path
+    # containing them, like ament_index_python.get_resources() but with a single directory listing
+    # per prefix path
+    resource_paths = {}
+    for prefix_path in prefix_paths:
         try:
-            content, _ = get_resource('rosidl_interfaces', package_name)
-        except LookupError:
+            with os.scandir(
+                    os.path.join(prefix_path, RESOURCE_INDEX_SUBFOLDER, resource_type)) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or entry.name in resource_paths:
+                        continue
+                    if entry.is_dir():
+                        continue
+                    resource_paths[entry.name] = entry.path
+        except OSError:
             continue
-        interfaces[package_name] = content.splitlines()
-    return interfaces
+    return resource_paths
+
+
+def _read_resources(resource_paths: Dict[str, str]) -> Dict[str, str]:
+    # Read the files of resources, concurrently since each read may wait on a slow (e.g. network)
+    # file system, skipping those that were removed in the meantime
+    def read(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as h:
+                return h.read()
+        except OSError:
+            return None
+
+    if len(resource_paths) > 1:
+        # Imported here since importing it takes longer than reading a few resources
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(
+                max_workers=min(_MAX_READ_WORKERS, len(resource_paths))) as executor:
+            contents = list(executor.map(read, resource_paths.values()))
+    else:
+        contents = [read(path) for path in resource_paths.values()]
+    return {
+        resource_name: content
+        for resource_name, content in zip(resource_paths, contents) if content is not None}
+
+
+def _get_resource_index_fingerprint(prefix_paths: List[str]) -> List[list]:
+    # Adding or removing a resource changes the modification time of its directory, while
+    # rewriting a resource of the rosidl_interfaces type only changes the one of its file
+    fingerprint = []
+    for prefix_path in prefix_paths:
+        resource_index_path = os.path.join(prefix_path, RESOURCE_INDEX_SUBFOLDER)
+        packages_mtime = None
+        interface_stats = []
+        try:
+            packages_mtime = os.stat(os.path.join(resource_index_path, 'packages')).st_mtime_ns
+        except OSError:
+            pass
+        try:
+            with os.scandir(os.path.join(resource_index_path, 'rosidl_interfaces')) as entries:
+                for entry in entries:
+                    stat = entry.stat()
+                    interface_stats.append([entry.name, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            pass
+        fingerprint.append([prefix_path, packages_mtime, sorted(interface_stats)])
+    return fingerprint
 
 
 def get_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
@@ -55,18 +305,7 @@ def get_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
     :return: A dictionary where keys are package names and values are lists of interface names.
     :raises LookupError: If one or more packages can not be found.
     """
-    interfaces = _get_interfaces(package_names)
-    # filter out hidden interfaces
-    filtered_interfaces = {}
-    for package_name, interface_names in interfaces.items():
-        _interfaces = list({
-            interface_name.rsplit('.', 1)[0]
-            for interface_name in interface_names
-            if '_' not in interface_name
-        })
-        if _interfaces:
-            filtered_interfaces[package_name] = _interfaces
-    return filtered_interfaces
+    return _interface_catalog.get_interfaces(package_names)
 
 
 def get_message_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
@@ -81,20 +320,7 @@ def get_message_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[
     :return: A dictionary where keys are package names and values are lists of interface names.
     :raises LookupError: If one or more packages can not be found.
     """
-    interfaces = _get_interfaces(package_names)
-    # filter out hidden interfaces and identify message interfaces by the namespace and suffix
-    filtered_interfaces = {}
-    for package_name, interface_names in interfaces.items():
-        message_interfaces = list({
-            interface_name[:-4]
-            for interface_name in interface_names
-            if '_' not in interface_name and
-            interface_name.startswith('msg/') and
-            interface_name[-4:] in ('.idl', '.msg')
-        })
-        if message_interfaces:
-            filtered_interfaces[package_name] = message_interfaces
-    return filtered_interfaces
+    return _interface_catalog.get_message_interfaces(package_names)
 
 
 def get_service_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
@@ -109,20 +335,7 @@ def get_service_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[
     :return: A dictionary where keys are package names and values are lists of interface names.
     :raises LookupError: If one or more packages can not be found.
     """
-    interfaces = _get_interfaces(package_names)
-    # filter out hidden interfaces and identify service interfaces by the namespace and suffix
-    filtered_interfaces = {}
-    for package_name, interface_names in interfaces.items():
-        service_interfaces = list({
-            interface_name[:-4]
-            for interface_name in interface_names
-            if '_' not in interface_name and
-            interface_name.startswith('srv/') and
-            interface_name[-4:] in ('.idl', '.srv')
-        })
-        if service_interfaces:
-            filtered_interfaces[package_name] = service_interfaces
-    return filtered_interfaces
+    return _interface_catalog.get_service_interfaces(package_names)
 
 
 def get_action_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[str]]:
@@ -137,20 +350,7 @@ def get_action_interfaces(package_names: Iterable[str] = []) -> Dict[str, List[s
     :return: A dictionary where keys are package names and values are lists of interface names.
     :raises LookupError: If one or more packages can not be found.
     """
-    interfaces = _get_interfaces(package_names)
-    # filter out hidden interfaces and identify action interfaces by the namespace and suffix
-    filtered_interfaces = {}
-    for package_name, interface_names in interfaces.items():
-        action_interfaces = list({
-            interface_name.rsplit('.', 1)[0]
-            for interface_name in interface_names
-            if '_' not in interface_name and
-            interface_name.startswith('action/') and
-            (interface_name[-4:] == '.idl' or interface_name[-7:] == '.action')
-        })
-        if action_interfaces:
-            filtered_interfaces[package_name] = action_interfaces
-    return filtered_interfaces
+    return _interface_catalog.get_action_interfaces(package_names)
 
 
 def get_interface_path(interface_name: str) -> str:
@@ -0,0 +1,150 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import hashlib
+import struct
+from typing import Any
+from typing import Callable
+from typing import Tuple
+
+import numpy
+
+from rosidl_parser.definition import AbstractGenericString
+from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import BasicType
+from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py.convert import _get_message_fields
+from rosidl_runtime_py.convert import _NUMPY_DTYPES
+
+_FLOAT_TYPES = frozenset(('float', 'double', 'long double'))
+_pack_length = struct.Struct('<Q').pack
+_pack_float = struct.Struct('<d').pack
+
+
+def hash_message(msg: Any, *, digest_size: int = 16) -> bytes:
+    """
+    Compute a hash of the content of a ROS message.
+
+    The hash is computed from the type of the message and the values of its fields, with the
+    items of numeric arrays and sequences read from their memory at once.
+    It is stable across processes and machines, so it can be used as a key to deduplicate
+    messages.
+    Messages equal according to :func:`rosidl_runtime_py.messages_equal` have the same hash,
+    e.g. NaN values have the same hash as well as 0.0 and -0.0.
+
+    :param msg: The ROS message to hash.
+    :param digest_size: The size of the hash in bytes, at most 64.
+    :returns: The hash of the message.
+    """
+    message_class = type(msg)
+    h = hashlib.blake2b(digest_size=digest_size)
+    h.update('{}.{}'.format(message_class.__module__, message_class.__qualname__).encode())
+    _update_message(h, msg)
+    return h.digest()
+
+
+def _update_message(h: Any, msg: Any) -> None:
+    for field_name, update in _get_hash_plan(type(msg)):
+        update(h, getattr(msg, field_name))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_hash_plan(message_class: Any) -> Tuple[Tuple[str, Callable[[Any, Any], None]], ...]:
+    # The function adding the value of each field to a hash
+    return tuple(
+        (field_name, _get_value_updater(field_type))
+        for field_name, field_type in _get_message_fields(message_class))
+
+
+def _get_value_updater(field_type: Any) -> Callable[[Any, Any], None]:
+    if isinstance(field_type, AbstractNestedType):
+        value_type = field_type.value_type
+        if isinstance(value_type, BasicType):
+            return functools.partial(
+                _update_array, dtype=numpy.dtype(_NUMPY_DTYPES[value_type.typename]))
+        item_updater = _get_value_updater(value_type)
+        return functools.partial(_update_sequence, item_updater=item_updater)
+    if isinstance(field_type, NamespacedType):
+        return _update_message
+    if isinstance(field_type, AbstractGenericString):
+        return _update_string
+    if isinstance(field_type, BasicType):
+        if field_type.typename in _FLOAT_TYPES:
+            return _update_float
+        if field_type.typename == 'octet':
+            return _update_octet
+        return _update_int
+    raise TypeError("Can't hash values of type '{}'".format(field_type))
+
+
+def _update_sequence(h, value, *, item_updater):
+    h.update(_pack_length(len(value)))
+    for item in value:
+        item_updater(h, item)
+
+
+def _update_array(h, value, *, dtype):
+    # Read the items from the memory of numpy.ndarray and array.array objects, while lists
+    # (e.g. of booleans or octets) are turned into an array first
+    if isinstance(value, (list, tuple)):
+        if len(value) and isinstance(value[0], bytes):
+            value = numpy.frombuffer(b''.join(value), dtype=numpy.uint8)
+        elif len(value) and isinstance(value[0], str):
+            value = numpy.array([ord(item) for item in value], dtype=numpy.uint32)
+        else:
+            value = numpy.array(value, dtype=dtype)
+    else:
+        value = numpy.asarray(value)
+    if value.dtype.kind == 'f':
+        value = _normalize_floats(value)
+    h.update(_pack_length(len(value)))
+    h.update(numpy.ascontiguousarray(value.astype(value.dtype.newbyteorder('<'), copy=False)))
+
+
+def _normalize_floats(value):
+    # Padding bytes of long doubles aren't stable, and equal values must have the same bytes
+    if value.dtype.itemsize > 8:
+        value = value.astype(numpy.float64)
+    # Adding 0 turns -0.0 into 0.0
+    value = value + value.dtype.type(0)
+    nan = numpy.isnan(value)
+    if nan.any():
+        value[nan] = numpy.nan
+    return value
+
+
+def _update_string(h, value):
+    data = value.encode('utf-8')
+    h.update(_pack_length(len(data)))
+    h.update(data)
+
+
+def _update_float(h, value):
+    if value != value:
+        value = float('nan')
+    elif value == 0:
+        value = 0.0
+    h.update(_pack_float(value))
+
+
+def _update_octet(h, value):
+    h.update(value)
+
+
+def _update_int(h, value):
+    # Booleans are integers as well, while chars are either integers or strings of one character
+    if isinstance(value, str):
+        value = ord(value)
+    h.update(int(value).to_bytes(9, 'little', signed=True))
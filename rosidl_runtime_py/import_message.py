@@ -12,12 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import importlib
 from typing import Any
+from typing import Optional
+from typing import Tuple
 import warnings
 
 from rosidl_parser.definition import NamespacedType
 
+# Default maximum number of message classes kept by import_message_from_namespaced_type
+DEFAULT_IMPORT_CACHE_SIZE = 1024
+
 
 def import_message_from_namespaced_type(message_type: NamespacedType) -> Any:
     if not isinstance(message_type, NamespacedType):
@@ -27,12 +33,52 @@ def import_message_from_namespaced_type(message_type: NamespacedType) -> Any:
                 'Passing objects containing a NamespacedType is deprecated, '
                 'please pass a NamespacedType object directly',
                 DeprecationWarning)
-    module = importlib.import_module(
-        '.'.join(message_type.namespaces))
+    return _import_message_cached(message_type.namespaced_name())
+
+
+def _import_message(namespaced_name: Tuple[str, ...]) -> Any:
+    *namespaces, name = namespaced_name
+    module = importlib.import_module('.'.join(namespaces))
 
     # Special case for action feedback
-    if message_type.name.endswith('_FeedbackMessage'):
-        action_name, name = message_type.name.rsplit('_', 1)
+    if name.endswith('_FeedbackMessage'):
+        action_name, name = name.rsplit('_', 1)
         return getattr(getattr(getattr(module, action_name), 'Impl'), name)
 
-    return getattr(module, message_type.name)
+    return getattr(module, name)
+
+
+# Failed imports raise and are not cached, so types of packages built later can still be imported
+_import_message_cached = functools.lru_cache(maxsize=DEFAULT_IMPORT_CACHE_SIZE)(_import_message)
+
+
+def get_import_cache_info() -> Any:
+    """
+    Get statistics of the cache of imported message classes.
+
+    :returns: A named tuple with the number of hits and misses, the maximum size and the current
+        size of the cache, as returned by the cache_info() method of functools.lru_cache.
+    """
+    return _import_message_cached.cache_info()
+
+
+def clear_import_cache() -> None:
+    """
+    Clear the cache of imported message classes and its statistics.
+
+    Tools reloading the Python modules of interface packages should call this function, so that
+    the message classes are imported again.
+    """
+    _import_message_cached.cache_clear()
+
+
+def set_import_cache_size(maxsize: Optional[int]) -> None:
+    """
+    Set the maximum number of imported message classes to cache, which clears the cache.
+
+    The least recently used message classes are evicted once the cache is full.
+
+    :param maxsize: The maximum size of the cache, None for an unbounded cache or 0 to disable it.
+    """
+    global _import_message_cached
+    _import_message_cached = functools.lru_cache(maxsize=maxsize)(_import_message)
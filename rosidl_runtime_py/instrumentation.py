@@ -0,0 +1,190 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+import rosidl_parser.definition
+
+_lock = threading.Lock()
+_enabled = False
+_callback = None
+# Call count, cumulative time and bytes, by operation, message type and field kind
+_data = {}
+# Functions called with whether instrumentation is enabled each time it is enabled or disabled
+_listeners = []
+
+# Sizes in bytes of the basic types
+_BASIC_TYPE_SIZES = {
+    'boolean': 1, 'octet': 1, 'char': 1, 'wchar': 2, 'float': 4, 'double': 8,
+    'long double': 16, 'short': 2, 'unsigned short': 2, 'long': 4, 'unsigned long': 4,
+    'long long': 8, 'unsigned long long': 8, 'int8': 1, 'uint8': 1, 'int16': 2, 'uint16': 2,
+    'int32': 4, 'uint32': 4, 'int64': 8, 'uint64': 8,
+}
+
+
+def enable_instrumentation(
+    callback: Optional[Callable[[str, str, str, float, int], None]] = None
+) -> None:
+    """
+    Start collecting statistics of the conversion and population of ROS messages.
+
+    While instrumentation is enabled, each field converted by :func:`message_to_ordereddict`,
+    :func:`message_to_yaml` or :func:`message_to_csv` and each field set by
+    :func:`set_message_fields` or from records by :func:`create_messages` is timed.
+    The statistics are collected per operation, message type and kind of field (e.g. 'string' or
+    'sequence of messages').
+    The time of a nested message field includes the time of its own fields, while its bytes are
+    only counted by its own fields.
+
+    Instrumentation has no cost while disabled, since the converters and setters are only
+    instrumented while it is enabled.
+    Enabling or disabling it drops the compiled converters, except for the ones already held by
+    :class:`MessageCsvWriter` objects.
+
+    :param callback: A function called for each timed field with the operation (e.g.
+        'message_to_yaml'), the message type (e.g. 'std_msgs/msg/Header'), the kind of field,
+        the time in seconds and the number of bytes processed.
+    """
+    _set_enabled(True, callback)
+
+
+def disable_instrumentation() -> None:
+    """Stop collecting statistics, which are kept until reset."""
+    _set_enabled(False, None)
+
+
+def is_instrumentation_enabled() -> bool:
+    """Return `True` if instrumentation is enabled."""
+    return _enabled
+
+
+def get_instrumentation_data() -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """
+    Get the statistics collected while instrumentation was enabled.
+
+    :returns: A dictionary mapping operations to dictionaries mapping message types to
+        dictionaries mapping field kinds to the statistics of their fields, a dictionary with
+        the number of 'calls', the cumulative 'time' in seconds and the number of 'bytes'
+        processed.
+    """
+    data = {}
+    with _lock:
+        for (operation, message_type, field_kind), (calls, elapsed, size) in _data.items():
+            data.setdefault(operation, {}).setdefault(message_type, {})[field_kind] = {
+                'calls': calls, 'time': elapsed, 'bytes': size}
+    return data
+
+
+def reset_instrumentation_data() -> None:
+    """Drop the statistics collected so far."""
+    with _lock:
+        _data.clear()
+
+
+def _set_enabled(enabled: bool, callback: Any) -> None:
+    global _enabled
+    global _callback
+    with _lock:
+        changed = enabled != _enabled
+        _enabled = enabled
+        _callback = callback
+        listeners = list(_listeners)
+    if changed:
+        for listener in listeners:
+            listener(enabled)
+
+
+def _add_listener(listener: Callable[[bool], None]) -> None:
+    with _lock:
+        _listeners.append(listener)
+
+
+def _instrument(
+    function: Callable, operation: str, message_class: Any, field_type: Any
+) -> Callable:
+    # Wrap a function taking the value of a field as its first argument to time it
+    message_type = _get_message_type_name(message_class)
+    field_kind = _get_field_kind(field_type)
+    get_size = _get_size_function(field_type)
+    key = (operation, message_type, field_kind)
+
+    def instrumented(value, *args):
+        start = time.perf_counter()
+        try:
+            return function(value, *args)
+        finally:
+            _record(key, time.perf_counter() - start, get_size(value))
+    return instrumented
+
+
+def _record(key: Any, elapsed: float, size: int) -> None:
+    with _lock:
+        stats = _data.get(key)
+        if stats is None:
+            _data[key] = [1, elapsed, size]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += size
+        callback = _callback
+    if callback is not None:
+        callback(*key, elapsed, size)
+
+
+def _get_message_type_name(message_class: Any) -> str:
+    # e.g. 'std_msgs/msg/Header' for the class std_msgs.msg._header.Header
+    namespaces = message_class.__module__.split('.')[:2]
+    return '/'.join(namespaces + [message_class.__name__])
+
+
+def _get_field_kind(field_type: Any) -> str:
+    if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+        container = 'array' if isinstance(field_type, rosidl_parser.definition.Array) \
+            else 'sequence'
+        return '{} of {}s'.format(container, _get_field_kind(field_type.value_type))
+    if isinstance(field_type, rosidl_parser.definition.NamespacedType):
+        return 'message'
+    if isinstance(field_type, rosidl_parser.definition.AbstractGenericString):
+        return 'string'
+    return 'scalar'
+
+
+def _get_size_function(field_type: Any) -> Callable[[Any], int]:
+    if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+        value_type = field_type.value_type
+        if isinstance(value_type, rosidl_parser.definition.BasicType):
+            item_size = _BASIC_TYPE_SIZES.get(value_type.typename, 0)
+            return lambda value: _len(value) * item_size
+        if isinstance(value_type, rosidl_parser.definition.AbstractGenericString):
+            return lambda value: sum(_len(item) for item in value) if _len(value) else 0
+        return lambda value: 0
+    if isinstance(field_type, rosidl_parser.definition.BasicType):
+        size = _BASIC_TYPE_SIZES.get(field_type.typename, 0)
+        return lambda value: size
+    if isinstance(field_type, rosidl_parser.definition.AbstractGenericString):
+        return _len
+    # The fields of nested messages are counted on their own
+    return lambda value: 0
+
+
+def _len(value: Any) -> int:
+    try:
+        return len(value)
+    except TypeError:
+        return 0
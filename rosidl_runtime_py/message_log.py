@@ -0,0 +1,580 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from collections.abc import Sequence
+import functools
+import importlib
+import math
+import os
+import struct
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import numpy
+import rosidl_parser.definition
+from rosidl_runtime_py.convert import _get_message_fields
+from rosidl_runtime_py.convert import _NUMPY_DTYPES
+from rosidl_runtime_py.convert import messages_to_columns
+from rosidl_runtime_py.import_message import import_message_from_namespaced_type
+from rosidl_runtime_py.instrumentation import _get_message_type_name
+from rosidl_runtime_py.set_message import create_messages
+import yaml
+
+# Version of the layout of the files of a message log
+_VERSION = 1
+_METADATA_FILENAME = 'metadata.yaml'
+
+# Kinds of fields, which are stored differently
+_VALUES = 'values'
+_STRINGS = 'strings'
+_SEQUENCE = 'sequence'
+
+_OFFSETS_DTYPE = numpy.dtype(numpy.int64)
+_BYTES_DTYPE = numpy.dtype(numpy.uint8)
+
+# The header of each column file is padded to a fixed size, so that it can be rewritten with
+# the new length of the column after appending to it
+_HEADER_SIZE = 128
+_pack_header_length = struct.Struct('<H').pack
+
+
+class _LogField(NamedTuple):
+    # The path of the field from the logged message type, with '[]' for the items of sequences
+    path: str
+    # The key of the column of the field as returned by messages_to_columns, which is relative
+    # to the items of the enclosing sequence, or None for the items of sequences of basic types
+    name: Optional[str]
+    kind: str
+    # The dtype of each value, or None for sequences
+    dtype: Optional[numpy.dtype]
+    # The shape of the enclosing fixed-size arrays and of the field itself if it is an array
+    shape: Tuple[int, ...]
+    # The fields of the items of a sequence
+    items: Tuple['_LogField', ...] = ()
+
+
+class MessageLogWriter:
+    """
+    Write ROS messages of one type to a columnar message log.
+
+    A message log is a directory holding a NumPy .npy file for each column of the messages, as
+    flattened by :func:`rosidl_runtime_py.messages_to_columns`, and a metadata file.
+    Columns of fields of basic types hold a row for each message, with the items of fixed-size
+    arrays in additional dimensions.
+    Strings are stored as the UTF-8 bytes of all strings in one file and the offsets of the end
+    of each string in another one, and sequences as the offsets of the end of each sequence into
+    the columns of their items, whose paths end with '[]' (e.g. 'poses[].position.x').
+
+    Messages are appended to the column files as they are written, while the metadata, and the
+    headers of the column files, are only updated on :meth:`flush`, so that a
+    :class:`MessageLogReader` sees the messages written up to the last flush.
+    """
+
+    def __init__(self, path: str, message_type: Any, *, append: bool = False) -> None:
+        """
+        Create a message log writer.
+
+        :param path: The directory of the message log, which is created if needed.
+        :param message_type: The type of the ROS messages to write.
+        :param append: Whether to append the messages to the message log in the directory, if
+            any, instead of replacing it, along with the column files of its fields.
+        :raises ValueError: If appending to a message log of another message type.
+        """
+        self._path = path
+        self._message_type = message_type
+        self._type_name = _get_message_type_name(message_type)
+        self._fields = _get_log_fields(message_type)
+        metadata = None
+        stale_filenames = ()
+        if append and os.path.exists(os.path.join(path, _METADATA_FILENAME)):
+            metadata = _read_metadata(path)
+            if metadata['message_type'] != self._type_name:
+                raise ValueError(
+                    "Can't append messages of type '{}' to a message log of type '{}'".format(
+                        self._type_name, metadata['message_type']))
+            _check_metadata(metadata, self._fields, message_type)
+        else:
+            os.makedirs(path, exist_ok=True)
+            stale_filenames = _get_column_filenames(path)
+        self._count = 0 if metadata is None else metadata['count']
+        lengths = {} if metadata is None else metadata['lengths']
+        self._files = OrderedDict()
+        for filename, dtype, shape in _get_log_files(self._fields):
+            self._files[filename] = _ColumnFile(
+                os.path.join(path, filename), dtype, shape, lengths.get(filename),
+                offsets=filename.endswith('.offsets.npy'))
+        if metadata is None:
+            self.flush()
+            # Remove the column files of a replaced message log which aren't overwritten
+            for filename in stale_filenames:
+                if filename not in self._files:
+                    os.remove(os.path.join(path, filename))
+
+    def write(self, msg: Any) -> None:
+        """
+        Append a ROS message to the message log.
+
+        :param msg: The ROS message to write.
+        :raises TypeError: If the message is not of the type of the writer.
+        """
+        self._write_messages([msg])
+
+    def write_messages(self, msgs: Iterable[Any]) -> None:
+        """
+        Append ROS messages to the message log and flush them.
+
+        The messages are converted to columns all at once, which is faster than writing them
+        one by one.
+
+        :param msgs: The ROS messages to write.
+        :raises TypeError: If a message is not of the type of the writer.
+        """
+        self._write_messages(msgs)
+        self.flush()
+
+    def _write_messages(self, msgs):
+        msgs = list(msgs)
+        for msg in msgs:
+            if type(msg) is not self._message_type:
+                raise TypeError(
+                    "Expected a message of type '{}' but got '{}'".format(
+                        self._message_type.__name__, type(msg).__name__))
+        if not msgs:
+            return
+        self._append_fields(self._fields, messages_to_columns(msgs), len(msgs))
+        self._count += len(msgs)
+
+    def flush(self) -> None:
+        """Make the messages written so far visible to readers of the message log."""
+        for column_file in self._files.values():
+            column_file.flush()
+        metadata = {
+            'version': _VERSION,
+            'message_type': self._type_name,
+            'message_class': _get_message_class_name(self._message_type),
+            'count': self._count,
+            'fields': _get_fields_metadata(self._fields),
+            'lengths': {filename: f.length for filename, f in self._files.items()},
+        }
+        # Replace the metadata at once, so that readers never see a partial file
+        filename = os.path.join(self._path, _METADATA_FILENAME)
+        with open(filename + '.tmp', 'w') as f:
+            yaml.safe_dump(metadata, f, sort_keys=False)
+        os.replace(filename + '.tmp', filename)
+
+    def close(self) -> None:
+        """Flush the messages and close the column files."""
+        if self._files:
+            self.flush()
+            for column_file in self._files.values():
+                column_file.close()
+            self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _append_fields(self, fields, columns, count):
+        for field in fields:
+            self._append_field(field, columns.get(field.name), count)
+
+    def _append_field(self, field, column, count):
+        # A column is None if there are no values, e.g. in sequences of messages which are all
+        # empty, since messages_to_columns has no columns for them
+        entries = count * math.prod(field.shape)
+        if field.kind is _VALUES:
+            if column is None:
+                column = numpy.empty((0,) + field.shape, dtype=field.dtype)
+            self._files[field.path + '.npy'].append(_to_dtype(column, field.dtype))
+            return
+        offsets_file = self._files[field.path + '.offsets.npy']
+        if field.kind is _STRINGS:
+            strings = [] if column is None else [
+                value.encode('utf-8') for value in numpy.ravel(column).tolist()]
+            lengths = [len(value) for value in strings]
+            self._files[field.path + '.npy'].append(
+                numpy.frombuffer(b''.join(strings), dtype=_BYTES_DTYPE))
+        else:
+            values = [] if column is None else numpy.ravel(column).tolist()
+            if field.items[0].name is None:
+                lengths = [len(value) for value in values]
+                values = [value for value, length in zip(values, lengths) if length]
+                self._append_field(
+                    field.items[0], numpy.concatenate(values) if values else None,
+                    sum(lengths))
+            else:
+                lengths = [_get_column_count(value) for value in values]
+                values = [value for value, length in zip(values, lengths) if length]
+                self._append_fields(
+                    field.items,
+                    {item.name: numpy.concatenate([value[item.name] for value in values])
+                     for item in field.items} if values else {},
+                    sum(lengths))
+        if len(lengths) != entries:
+            raise ValueError(
+                "Expected {} values for field '{}' but got {}".format(
+                    entries, field.path, len(lengths)))
+        offsets_file.append(offsets_file.last + numpy.cumsum(lengths, dtype=_OFFSETS_DTYPE))
+
+
+class MessageLogReader(Sequence):
+    """
+    Read ROS messages from a columnar message log written by :class:`MessageLogWriter`.
+
+    The column files are memory-mapped when first used, so that the columns can be read without
+    copying them and each message is only rebuilt from them when accessed by its index.
+    The reader holds the messages written up to the last flush before it was opened.
+    """
+
+    def __init__(self, path: str, message_type: Any = None) -> None:
+        """
+        Open a message log.
+
+        :param path: The directory of the message log.
+        :param message_type: The type of the ROS messages of the message log, by default the
+            class whose module and name are stored in the message log.
+        :raises ValueError: If the message log was written by an unsupported version or with
+            another definition of its message type, or if its message type can't be imported.
+        """
+        metadata = _read_metadata(path)
+        if message_type is None:
+            message_type = _import_message_class(metadata['message_class'])
+        self._path = path
+        self._message_type = message_type
+        self._fields = _get_log_fields(message_type)
+        _check_metadata(metadata, self._fields, message_type)
+        self._count = metadata['count']
+        self._lengths = metadata['lengths']
+        self._fields_by_path = OrderedDict(
+            (field.path, field) for field in _iter_log_fields(self._fields))
+        self._arrays = {}
+
+    @property
+    def message_type(self) -> Any:
+        """The type of the ROS messages of the message log."""
+        return self._message_type
+
+    @property
+    def paths(self) -> List[str]:
+        """The paths of the fields of the message log, including the items of sequences."""
+        return list(self._fields_by_path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._create_messages(start, max(start, stop))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('message index out of range')
+        return self._create_messages(index, index + 1)[0]
+
+    def get_column(self, path: str) -> numpy.ndarray:
+        """
+        Get the values of a field of a basic type or a string field without copying them.
+
+        :param path: The path of the field, e.g. 'header.stamp.sec' or 'poses[].position.x'.
+        :returns: A read-only memory-mapped array, with a row for each message, or for each item
+            of the enclosing sequence, and the dimensions of the enclosing fixed-size arrays.
+            For string fields, the UTF-8 bytes of all strings, see :meth:`get_offsets`.
+        :raises KeyError: If the message log has no such field.
+        :raises ValueError: If the field is a sequence, whose items have their own columns.
+        """
+        field = self._fields_by_path[path]
+        if field.kind is _SEQUENCE:
+            raise ValueError(
+                "Field '{}' is a sequence, whose items are in the columns of '{}[]'".format(
+                    path, path))
+        return self._get_array(path + '.npy')
+
+    def get_offsets(self, path: str) -> numpy.ndarray:
+        """
+        Get the offsets of the strings or sequences of a field without copying them.
+
+        The n-th string or sequence spans the bytes of the column of the field, or the rows of
+        the columns of the items of the sequence, from the n-th offset to the next one.
+
+        :param path: The path of the field, e.g. 'header.frame_id' or 'poses'.
+        :returns: A read-only memory-mapped array, with one more offset than strings or
+            sequences.
+        :raises KeyError: If the message log has no such field.
+        :raises ValueError: If the field is neither a string nor a sequence.
+        """
+        field = self._fields_by_path[path]
+        if field.kind is _VALUES:
+            raise ValueError("Field '{}' is neither a string nor a sequence".format(path))
+        return self._get_array(path + '.offsets.npy')
+
+    def read_columns(self, start: int = 0, stop: int = None) -> OrderedDict:
+        """
+        Read columns of a range of messages.
+
+        :param start: The index of the first message.
+        :param stop: The index after the last message, by default the number of messages.
+        :returns: An OrderedDict of columns like the one returned by
+            :func:`rosidl_runtime_py.messages_to_columns` for the messages, whose arrays don't
+            share memory with the message log.
+        """
+        start, stop, _ = slice(start, stop).indices(self._count)
+        return self._read_columns(self._fields, start, max(start, stop))
+
+    def close(self) -> None:
+        """Release the memory-mapped column files."""
+        self._arrays.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _create_messages(self, start, stop):
+        if not self._fields:
+            return [self._message_type() for _ in range(stop - start)]
+        return create_messages(self._message_type, self._read_columns(self._fields, start, stop))
+
+    def _get_array(self, filename):
+        array = self._arrays.get(filename)
+        if array is None:
+            # The files may hold values written after the last flush
+            array = numpy.load(os.path.join(self._path, filename), mmap_mode='r')
+            array = array[:self._lengths[filename]]
+            self._arrays[filename] = array
+        return array
+
+    def _read_columns(self, fields, start, stop):
+        return OrderedDict(
+            (field.name, self._read_field(field, start, stop)) for field in fields)
+
+    def _read_field(self, field, start, stop):
+        if field.kind is _VALUES:
+            return numpy.array(self._get_array(field.path + '.npy')[start:stop])
+        size = math.prod(field.shape)
+        offsets = self._get_array(field.path + '.offsets.npy')[start * size:stop * size + 1]
+        offsets = offsets.tolist()
+        ranges = zip(offsets[:-1], offsets[1:])
+        shape = (stop - start,) + field.shape
+        if field.kind is _STRINGS:
+            data = self._get_array(field.path + '.npy')[offsets[0]:offsets[-1]].tobytes()
+            strings = [
+                data[begin - offsets[0]:end - offsets[0]].decode('utf-8')
+                for begin, end in ranges]
+            return numpy.array(strings, dtype=numpy.str_).reshape(shape)
+        column = numpy.empty(len(offsets) - 1, dtype=object)
+        for i, (begin, end) in enumerate(ranges):
+            if field.items[0].name is None:
+                column[i] = self._read_field(field.items[0], begin, end)
+            else:
+                column[i] = self._read_columns(field.items, begin, end)
+        return column.reshape(shape)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_log_fields(message_class: Any) -> Tuple[_LogField, ...]:
+    return tuple(_add_log_fields([], '', '', message_class, ()))
+
+
+def _add_log_fields(fields, path_prefix, name_prefix, message_class, shape):
+    # Flatten the fields of nested messages like messages_to_columns does
+    for field_name, field_type in _get_message_fields(message_class):
+        path = path_prefix + field_name
+        name = name_prefix + field_name
+        value_type = field_type
+        field_shape = shape
+        if isinstance(field_type, rosidl_parser.definition.AbstractNestedType):
+            value_type = field_type.value_type
+            if isinstance(field_type, rosidl_parser.definition.Array):
+                field_shape = shape + (field_type.size,)
+            else:
+                if isinstance(value_type, rosidl_parser.definition.NamespacedType):
+                    items = _add_log_fields(
+                        [], path + '[].', '', import_message_from_namespaced_type(value_type),
+                        ())
+                else:
+                    items = [_get_value_field(path + '[]', None, value_type, ())]
+                fields.append(_LogField(path, name, _SEQUENCE, None, shape, tuple(items)))
+                continue
+        if isinstance(value_type, rosidl_parser.definition.NamespacedType):
+            _add_log_fields(
+                fields, path + '.', name + '.', import_message_from_namespaced_type(value_type),
+                field_shape)
+        else:
+            fields.append(_get_value_field(path, name, value_type, field_shape))
+    return fields
+
+
+def _get_value_field(path, name, value_type, shape):
+    if isinstance(value_type, rosidl_parser.definition.AbstractGenericString):
+        return _LogField(path, name, _STRINGS, _BYTES_DTYPE, shape)
+    # Characters of wide strings are strings of one character, like in get_message_dtype
+    dtype = numpy.dtype(
+        'U1' if value_type.typename == 'wchar' else _NUMPY_DTYPES[value_type.typename])
+    return _LogField(path, name, _VALUES, dtype, shape)
+
+
+def _iter_log_fields(fields):
+    for field in fields:
+        yield field
+        yield from _iter_log_fields(field.items)
+
+
+def _get_log_files(fields):
+    # The filename, dtype and shape of the rows of each column file
+    for field in _iter_log_fields(fields):
+        if field.kind is not _VALUES:
+            yield field.path + '.offsets.npy', _OFFSETS_DTYPE, ()
+        if field.kind is _VALUES:
+            yield field.path + '.npy', field.dtype, field.shape
+        elif field.kind is _STRINGS:
+            yield field.path + '.npy', field.dtype, ()
+
+
+def _get_fields_metadata(fields):
+    return [
+        {'path': field.path, 'kind': field.kind,
+         'dtype': None if field.dtype is None else field.dtype.str, 'shape': list(field.shape)}
+        for field in _iter_log_fields(fields)]
+
+
+def _read_metadata(path):
+    with open(os.path.join(path, _METADATA_FILENAME), 'r') as f:
+        metadata = yaml.safe_load(f)
+    if metadata.get('version') != _VERSION:
+        raise ValueError(
+            "Unsupported version of message log '{}': {}".format(path, metadata.get('version')))
+    return metadata
+
+
+def _get_column_filenames(path):
+    # The column files listed by the metadata of the message log in a directory, if any
+    try:
+        metadata = _read_metadata(path)
+    except (OSError, ValueError, yaml.YAMLError):
+        return ()
+    return [
+        filename for filename in metadata.get('lengths', {})
+        if os.path.exists(os.path.join(path, filename))]
+
+
+def _get_message_class_name(message_class):
+    # The module and the qualified name of the class, since messages of services and actions,
+    # e.g. test_msgs.action._fibonacci.Fibonacci_Goal, can't be looked up by the name of their
+    # message type
+    return '{}:{}'.format(message_class.__module__, message_class.__qualname__)
+
+
+def _import_message_class(name):
+    module_name, _, qualname = name.partition(':')
+    try:
+        return functools.reduce(
+            getattr, qualname.split('.'), importlib.import_module(module_name))
+    except (ImportError, AttributeError) as e:
+        raise ValueError(
+            "Can't import the message type '{}' of the message log: {}".format(name, e)) from e
+
+
+def _check_metadata(metadata, fields, message_type):
+    if metadata['fields'] != _get_fields_metadata(fields):
+        raise ValueError(
+            "The message log of type '{}' has other fields than the message type '{}'".format(
+                metadata['message_type'], message_type.__name__))
+
+
+def _get_column_count(columns):
+    # The number of messages in columns returned by messages_to_columns
+    for column in columns.values():
+        return len(column)
+    return 0
+
+
+def _to_dtype(column, dtype):
+    column = numpy.asarray(column)
+    if column.dtype.kind == 'U' and dtype.kind != 'U':
+        # Chars may be strings of one character
+        return numpy.array(
+            [ord(value) for value in column.ravel().tolist()], dtype=dtype).reshape(column.shape)
+    return column.astype(dtype, copy=False)
+
+
+class _ColumnFile:
+    # A .npy file which rows are appended to, whose header is rewritten on flush.
+    # The last offset of a file of offsets is kept to add the lengths of the next values to it.
+
+    def __init__(self, filename, dtype, shape, length=None, *, offsets=False):
+        self._dtype = dtype
+        self._shape = shape
+        self._row_size = dtype.itemsize * math.prod(shape)
+        self._offsets = offsets
+        self.last = 0
+        if length is None:
+            self._file = open(filename, 'w+b')
+            self.length = 0
+            self._write_header()
+            if offsets:
+                # Offsets start with the start of the first string or sequence
+                self.append(numpy.zeros(1, dtype=dtype))
+        else:
+            # Drop the rows written after the last flush
+            self._file = open(filename, 'r+b')
+            self.length = length
+            self._file.truncate(_HEADER_SIZE + length * self._row_size)
+            if offsets:
+                self._file.seek(_HEADER_SIZE + (length - 1) * self._row_size)
+                self.last = int(numpy.frombuffer(self._file.read(self._row_size), dtype)[0])
+            self._file.seek(0, os.SEEK_END)
+
+    def append(self, values):
+        values = numpy.ascontiguousarray(values, dtype=self._dtype)
+        self._file.write(values.reshape(-1).view(numpy.uint8).data)
+        self.length += len(values)
+        if self._offsets and len(values):
+            self.last = int(values[-1])
+
+    def flush(self):
+        self._file.seek(0)
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _write_header(self):
+        header = repr({
+            'descr': numpy.lib.format.dtype_to_descr(self._dtype),
+            'fortran_order': False,
+            'shape': (self.length,) + self._shape,
+        }).encode('latin1')
+        magic = numpy.lib.format.magic(1, 0)
+        padding = _HEADER_SIZE - len(magic) - 2 - len(header) - 1
+        if padding < 0:
+            raise ValueError('The header of a column file is too long: {}'.format(header))
+        self._file.write(
+            magic + _pack_header_length(_HEADER_SIZE - len(magic) - 2) + header +
+            b' ' * padding + b'\n')
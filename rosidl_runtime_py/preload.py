@@ -0,0 +1,152 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import Future
+import threading
+from typing import Any
+from typing import Iterable
+from typing import List
+from typing import Text
+
+from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py.convert import message_to_csv
+from rosidl_runtime_py.convert import message_to_ordereddict
+from rosidl_runtime_py.convert import message_to_yaml
+from rosidl_runtime_py.get_interfaces import get_interfaces
+from rosidl_runtime_py.import_message import import_message_from_namespaced_type
+from rosidl_runtime_py.set_message import _get_field_plan
+from rosidl_runtime_py.utilities import get_interface
+from rosidl_runtime_py.utilities import is_action
+from rosidl_runtime_py.utilities import is_message
+from rosidl_runtime_py.utilities import is_service
+
+# Attributes of the Impl class of actions holding the services and messages used by actions
+_ACTION_IMPL_INTERFACES = (
+    'SendGoalService', 'GetResultService', 'CancelGoalService', 'FeedbackMessage',
+    'GoalStatusMessage')
+
+
+def preload_interfaces(
+    names: Iterable[Text],
+    *,
+    background: bool = False,
+    type_support: bool = True,
+    converters: bool = True
+) -> Any:
+    """
+    Import message types and the message types they depend on ahead of their first use.
+
+    The message types of services and actions (e.g. their requests and responses) are preloaded
+    with them, as are all the message types of nested fields, recursively.
+
+    :param names: The names of packages, whose interfaces are all preloaded, or the full names
+        of interfaces (e.g. 'std_msgs/msg/String').
+    :param background: Whether to preload the message types in a background thread instead of
+        returning once they are preloaded, in which case errors are raised by the result of the
+        returned future.
+    :param type_support: Whether to import the type support of the message types as well, which
+        is otherwise imported the first time a message is published or received.
+    :param converters: Whether to build the structures used to convert messages of these types
+        with the default options and to set their fields.
+    :returns: The list of the preloaded message classes, or a concurrent.futures.Future of it if
+        background is true.
+    :raises LookupError: If a package can not be found.
+    :raises ImportError: If an interface can not be imported.
+    """
+    names = list(names)
+    if background:
+        future = Future()
+        thread = threading.Thread(
+            target=_preload_interfaces_in_background, args=(future, names),
+            kwargs={'type_support': type_support, 'converters': converters},
+            name='preload_interfaces', daemon=True)
+        thread.start()
+        return future
+
+    message_classes = _get_message_closure(_get_message_classes(names))
+    for message_class in message_classes:
+        if type_support:
+            import_type_support = getattr(message_class, '__import_type_support__', None)
+            if import_type_support is not None:
+                import_type_support()
+        if converters:
+            msg = message_class()
+            message_to_ordereddict(msg)
+            message_to_yaml(msg)
+            message_to_csv(msg)
+            for field_name in message_class.get_fields_and_field_types():
+                _get_field_plan(msg, field_name)
+    return message_classes
+
+
+def _preload_interfaces_in_background(future: Future, names: List[Text], **kwargs: Any) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        message_classes = preload_interfaces(names, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(message_classes)
+
+
+def _get_message_classes(names: List[Text]) -> List[Any]:
+    identifiers = []
+    for name in names:
+        if '/' in name:
+            identifiers.append(name)
+        else:
+            identifiers.extend(
+                name + '/' + interface_name
+                for interface_name in get_interfaces([name]).get(name, []))
+    message_classes = []
+    for identifier in identifiers:
+        message_classes.extend(_get_interface_message_classes(get_interface(identifier)))
+    return message_classes
+
+
+def _get_interface_message_classes(interface: Any) -> List[Any]:
+    if is_message(interface):
+        return [interface]
+    message_classes = []
+    if is_service(interface):
+        message_classes.extend([interface.Request, interface.Response])
+        if hasattr(interface, 'Event'):
+            message_classes.append(interface.Event)
+    elif is_action(interface):
+        message_classes.extend([interface.Goal, interface.Result, interface.Feedback])
+        impl = getattr(interface, 'Impl', None)
+        for name in _ACTION_IMPL_INTERFACES:
+            if hasattr(impl, name):
+                message_classes.extend(_get_interface_message_classes(getattr(impl, name)))
+    return message_classes
+
+
+def _get_message_closure(message_classes: List[Any]) -> List[Any]:
+    # Add the message classes of nested fields, recursively, keeping the order in which they are
+    # found
+    closure = {}
+    pending = list(message_classes)
+    while pending:
+        message_class = pending.pop(0)
+        if message_class in closure:
+            continue
+        closure[message_class] = None
+        for slot_type in message_class.SLOT_TYPES:
+            if isinstance(slot_type, AbstractNestedType):
+                slot_type = slot_type.value_type
+            if isinstance(slot_type, NamespacedType):
+                pending.append(import_message_from_namespaced_type(slot_type))
+    return list(closure)
@@ -13,16 +13,24 @@
 # limitations under the License.
 
 import array
+from functools import lru_cache
 from functools import partial
 
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Mapping
+from typing import Tuple
+from typing import Union
 
 import numpy
 
 from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import Array
+from rosidl_parser.definition import BasicType
 from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py import instrumentation
 from rosidl_runtime_py.convert import get_message_slot_types
 from rosidl_runtime_py.import_message import import_message_from_namespaced_type
 
@@ -36,6 +44,11 @@ def set_message_fields(
     :param msg: The ROS message to populate.
     :param values: The values to set in the ROS message. The keys of the dictionary represent
         fields of the message.
+        Values of array fields supporting the buffer protocol (e.g. numpy.ndarray or memoryview)
+        are set without copying them when their item type matches the field and they are
+        writable, in which case the message shares their memory and keeps them exported.
+        Resizable buffers (array.array and bytearray) are copied, so that they can still be
+        resized.
     :param expand_header_auto: If enabled and 'auto' is passed as a value to a
         'std_msgs.msg.Header' field, an empty Header will be instantiated and a setter function
         will be returned so that its 'stamp' field can be set to the current time.
@@ -50,53 +63,334 @@ def set_message_fields(
     :raises TypeError: If a message value does not match its field type.
     """
     timestamp_fields = []
+    _set_message_fields(msg, values, timestamp_fields, expand_header_auto, expand_time_now)
+    return timestamp_fields
 
-    def set_message_fields_internal(
-            msg: Any, values: Dict[str, str],
-            timestamp_fields: List[Any]) -> List[Any]:
-        try:
-            items = values.items()
-        except AttributeError:
-            raise TypeError(
-                "Value '%s' is expected to be a dictionary but is a %s" %
-                (values, type(values).__name__))
-        for field_name, field_value in items:
-            field = getattr(msg, field_name)
-            field_type = type(field)
-            qualified_class_name = '{}.{}'.format(field_type.__module__, field_type.__name__)
-            if field_type is array.array:
-                value = field_type(field.typecode, field_value)
-            elif field_type is numpy.ndarray:
-                value = numpy.array(field_value, dtype=field.dtype)
-            elif type(field_value) is field_type:
-                value = field_value
-            # We can't import these types directly, so we use the qualified class name to
-            # distinguish them from other fields
-            elif qualified_class_name == 'std_msgs.msg._header.Header' and \
-                    field_value == 'auto' and expand_header_auto:
-                timestamp_fields.append(partial(setattr, field, 'stamp'))
-                continue
-            elif qualified_class_name == 'builtin_interfaces.msg._time.Time' and \
-                    field_value == 'now' and expand_time_now:
-                timestamp_fields.append(partial(setattr, msg, field_name))
-                continue
+
+def _set_message_fields(
+        msg: Any, values: Dict[str, str], timestamp_fields: List[Any],
+        expand_header_auto: bool, expand_time_now: bool) -> None:
+    try:
+        items = values.items()
+    except AttributeError:
+        raise TypeError(
+            "Value '%s' is expected to be a dictionary but is a %s" %
+            (values, type(values).__name__))
+    plan = _get_setter_plan(type(msg))
+    for field_name, field_value in items:
+        field_plan = plan.get(field_name)
+        if field_plan is None:
+            field_plan = _make_field_plan(msg, field_name)
+            plan[field_name] = field_plan
+        field_type, factory, timestamp_kind, field_elem_type = field_plan
+        if factory is not None:
+            value = factory(field_value)
+        elif type(field_value) is field_type:
+            value = field_value
+        elif timestamp_kind is _HEADER and \
+                field_value == 'auto' and expand_header_auto:
+            timestamp_fields.append(partial(setattr, getattr(msg, field_name), 'stamp'))
+            continue
+        elif timestamp_kind is _TIME and \
+                field_value == 'now' and expand_time_now:
+            timestamp_fields.append(partial(setattr, msg, field_name))
+            continue
+        else:
+            try:
+                value = field_type(field_value)
+            except TypeError:
+                value = field_type()
+                _set_message_fields(
+                    value, field_value, timestamp_fields, expand_header_auto, expand_time_now)
+        # Check if field is an array of ROS messages
+        if field_elem_type is not None:
+            for n in range(len(value)):
+                submsg = field_elem_type()
+                _set_message_fields(
+                    submsg, value[n], timestamp_fields, expand_header_auto, expand_time_now)
+                value[n] = submsg
+        setattr(msg, field_name, value)
+
+
+# While instrumentation is enabled, _set_message_fields is replaced with a function timing each
+# field, which its recursive calls go through as well
+_set_message_fields_uninstrumented = _set_message_fields
+
+
+def _set_message_fields_instrumented(
+        msg: Any, values: Dict[str, str], timestamp_fields: List[Any],
+        expand_header_auto: bool, expand_time_now: bool) -> None:
+    try:
+        items = values.items()
+    except AttributeError:
+        raise TypeError(
+            "Value '%s' is expected to be a dictionary but is a %s" %
+            (values, type(values).__name__))
+    for field_name, field_value in items:
+        setter = _get_instrumented_setter(type(msg), field_name)
+        if setter is None:
+            # Let the uninstrumented function raise the error of an unknown field
+            _set_message_fields_uninstrumented(
+                msg, {field_name: field_value}, timestamp_fields, expand_header_auto,
+                expand_time_now)
+            continue
+        setter(field_value, msg, timestamp_fields, expand_header_auto, expand_time_now)
+
+
+@lru_cache(maxsize=None)
+def _get_instrumented_setter(message_class: Any, field_name: str) -> Any:
+    field_type = dict(zip(
+        message_class.get_fields_and_field_types(), message_class.SLOT_TYPES)).get(field_name)
+    if field_type is None:
+        return None
+
+    def setter(field_value, msg, timestamp_fields, expand_header_auto, expand_time_now):
+        _set_message_fields_uninstrumented(
+            msg, {field_name: field_value}, timestamp_fields, expand_header_auto,
+            expand_time_now)
+    return instrumentation._instrument(setter, 'set_message_fields', message_class, field_type)
+
+
+def _enable_instrumented_setters(instrumentation_enabled: bool) -> None:
+    global _set_message_fields
+    if instrumentation_enabled:
+        _set_message_fields = _set_message_fields_instrumented
+    else:
+        _set_message_fields = _set_message_fields_uninstrumented
+        _get_instrumented_setter.cache_clear()
+
+
+instrumentation._add_listener(_enable_instrumented_setters)
+_enable_instrumented_setters(instrumentation.is_instrumentation_enabled())
+
+
+def create_messages(
+        message_class: Any,
+        values: Union[Iterable[Dict[str, Any]], Mapping[str, Any]]) -> List[Any]:
+    """
+    Create ROS messages of the same type and set their fields.
+
+    The values are either records, i.e. a dictionary of values for each message as passed to
+    :func:`set_message_fields`, columns as returned by
+    :func:`rosidl_runtime_py.messages_to_columns`, or a NumPy structured array as returned by
+    :func:`rosidl_runtime_py.messages_to_structured_array`, whose fields are used as columns.
+    The keys of the columns are field paths (e.g. 'header.stamp.sec') and each column holds the
+    values of all messages, e.g. in a NumPy array whose first dimension is the number of
+    messages.
+    Array fields are set from the rows of their column, without copying them when the dtype of
+    the column matches the field and the column is writable.
+    Fields without a value keep their default value.
+
+    :param message_class: The type of the ROS messages to create.
+    :param values: Either an iterable of records, a mapping of field paths to columns or a
+        structured array.
+    :returns: A list of the created messages, in the order of the records or the rows of the
+        columns.
+    :raises AttributeError: If the message does not have a field provided in the values.
+    :raises TypeError: If a value does not match its field type.
+    :raises ValueError: If the columns do not all have the same length, if a column of the
+        items of an array of messages doesn't have a row for each message and item, or if a
+        column is given for the fields of the items of a sequence of messages, whose columns
+        must be given in a column of the sequence instead.
+    """
+    if isinstance(values, numpy.ndarray) and values.dtype.names is not None:
+        values = _get_structured_array_columns(values)
+    if isinstance(values, Mapping):
+        lengths = {len(column) for column in values.values()}
+        if len(lengths) > 1:
+            raise ValueError(
+                'Expected columns of the same length but got lengths %s' % sorted(lengths))
+        msgs = [message_class() for _ in range(lengths.pop() if lengths else 0)]
+        _set_columns(msgs, values)
+        return msgs
+    msgs = []
+    for record in values:
+        msg = message_class()
+        _set_message_fields(msg, record, [], False, False)
+        msgs.append(msg)
+    return msgs
+
+
+def _get_structured_array_columns(
+        values: numpy.ndarray, prefix: str = '', columns: Dict[str, Any] = None) -> Dict[str, Any]:
+    # Map the paths of the fields of a structured array, including nested ones, to views of
+    # their values
+    if columns is None:
+        columns = {}
+    for field_name in values.dtype.names:
+        column = values[field_name]
+        if column.dtype.names is not None:
+            _get_structured_array_columns(column, prefix + field_name + '.', columns)
+        else:
+            columns[prefix + field_name] = column
+    return columns
+
+
+def _set_columns(msgs: List[Any], columns: Mapping[str, Any]) -> None:
+    if not msgs:
+        return
+    # Columns of nested messages are grouped by their field to set them all at once
+    nested_columns = {}
+    for path, column in columns.items():
+        field_name, _, nested_path = path.partition('.')
+        if nested_path:
+            nested_columns.setdefault(field_name, {})[nested_path] = column
+        else:
+            _set_column(msgs, field_name, column)
+    for field_name, columns in nested_columns.items():
+        field_type, factory, timestamp_kind, field_elem_type = _get_field_plan(
+            msgs[0], field_name)
+        if field_elem_type is None:
+            _set_columns([getattr(msg, field_name) for msg in msgs], columns)
+            continue
+        rosidl_type = get_message_slot_types(msgs[0])[field_name]
+        if not isinstance(rosidl_type, Array):
+            # The number of items of each sequence is unknown, see messages_to_columns
+            raise ValueError(
+                "Can't set column '{}.{}' of the items of the sequence '{}', expected a column "
+                "'{}' holding the columns of the items of each message".format(
+                    field_name, next(iter(columns)), field_name, field_name))
+        # The columns of an array of messages have a dimension for its items, which are set as
+        # if they were the fields of more messages
+        for nested_path, column in columns.items():
+            if numpy.shape(column)[:2] != (len(msgs), rosidl_type.size):
+                raise ValueError(
+                    "Expected column '{}.{}' of shape {} but got {}".format(
+                        field_name, nested_path, (len(msgs), rosidl_type.size),
+                        numpy.shape(column)))
+        items = [item for msg in msgs for item in getattr(msg, field_name)]
+        _set_columns(items, {
+            nested_path: numpy.reshape(column, (len(items),) + numpy.shape(column)[2:])
+            for nested_path, column in columns.items()})
+
+
+def _set_column(msgs: List[Any], field_name: str, column: Any) -> None:
+    field_type, factory, timestamp_kind, field_elem_type = _get_field_plan(msgs[0], field_name)
+    rosidl_type = get_message_slot_types(msgs[0])[field_name]
+    if factory is not None and isinstance(column, numpy.ndarray) and column.dtype != object:
+        # Each row is a view of the column
+        rows = column
+    elif isinstance(column, numpy.ndarray):
+        # Turn the items of the column into Python objects at once
+        rows = column.tolist()
+    else:
+        rows = column
+
+    if field_elem_type is not None:
+        values = [create_messages(field_elem_type, row) for row in rows]
+    elif isinstance(rosidl_type, NamespacedType):
+        for msg, row in zip(msgs, rows):
+            if type(row) is field_type:
+                setattr(msg, field_name, row)
             else:
-                try:
-                    value = field_type(field_value)
-                except TypeError:
-                    value = field_type()
-                    set_message_fields_internal(
-                        value, field_value, timestamp_fields)
-            rosidl_type = get_message_slot_types(msg)[field_name]
-            # Check if field is an array of ROS messages
-            if isinstance(rosidl_type, AbstractNestedType):
-                if isinstance(rosidl_type.value_type, NamespacedType):
-                    field_elem_type = import_message_from_namespaced_type(rosidl_type.value_type)
-                    for n in range(len(value)):
-                        submsg = field_elem_type()
-                        set_message_fields_internal(
-                            submsg, value[n], timestamp_fields)
-                        value[n] = submsg
-            setattr(msg, field_name, value)
-    set_message_fields_internal(msg, values, timestamp_fields)
-    return timestamp_fields
+                _set_message_fields(getattr(msg, field_name), row, [], False, False)
+        return
+    elif factory is not None:
+        values = [factory(row) for row in rows]
+    elif isinstance(rosidl_type, AbstractNestedType):
+        values = [_to_list(row) for row in rows]
+        if _is_octet(rosidl_type.value_type):
+            values = [[_to_octet(item) for item in value] for value in values]
+    elif _is_octet(rosidl_type):
+        values = [_to_octet(row) for row in rows]
+    else:
+        values = rows
+    for msg, value in zip(msgs, values):
+        setattr(msg, field_name, value)
+
+
+def _to_list(value: Any) -> Any:
+    return value.tolist() if isinstance(value, numpy.ndarray) else value
+
+
+def _is_octet(rosidl_type: Any) -> bool:
+    return isinstance(rosidl_type, BasicType) and rosidl_type.typename == 'octet'
+
+
+def _to_octet(value: Any) -> bytes:
+    # Columns store octets as integers, while fields expect bytes objects of length one
+    return value if isinstance(value, bytes) else bytes((value,))
+
+
+_HEADER = 'std_msgs.msg._header.Header'
+_TIME = 'builtin_interfaces.msg._time.Time'
+
+
+@lru_cache(maxsize=None)
+def _get_setter_plan(message_class: Any) -> Dict[str, Tuple[Any, Any, Any, Any]]:
+    # The setter plan of a message class maps field names to field plans.
+    # It starts empty and each field plan is added the first time the field is set.
+    return {}
+
+
+def _get_field_plan(msg: Any, field_name: str) -> Tuple[Any, Any, Any, Any]:
+    plan = _get_setter_plan(type(msg))
+    field_plan = plan.get(field_name)
+    if field_plan is None:
+        field_plan = _make_field_plan(msg, field_name)
+        plan[field_name] = field_plan
+    return field_plan
+
+
+def _make_field_plan(msg: Any, field_name: str) -> Tuple[Any, Any, Any, Any]:
+    # A field plan holds the type of the field, a factory for array fields,
+    # whether the field is a Header or Time that may be set to the current time,
+    # and the element class for arrays of ROS messages.
+    field = getattr(msg, field_name)
+    field_type = type(field)
+    factory = None
+    if field_type is array.array:
+        factory = partial(_to_array, typecode=field.typecode)
+    elif field_type is numpy.ndarray:
+        factory = partial(_to_ndarray, dtype=field.dtype)
+    # We can't import these types directly, so we use the qualified class name to
+    # distinguish them from other fields
+    qualified_class_name = '{}.{}'.format(field_type.__module__, field_type.__name__)
+    timestamp_kind = None
+    if qualified_class_name == _HEADER:
+        timestamp_kind = _HEADER
+    elif qualified_class_name == _TIME:
+        timestamp_kind = _TIME
+    field_elem_type = None
+    rosidl_type = get_message_slot_types(msg)[field_name]
+    if isinstance(rosidl_type, AbstractNestedType):
+        if isinstance(rosidl_type.value_type, NamespacedType):
+            field_elem_type = import_message_from_namespaced_type(rosidl_type.value_type)
+    return field_type, factory, timestamp_kind, field_elem_type
+
+
+def _to_ndarray(value: Any, *, dtype: Any) -> numpy.ndarray:
+    # Arrays and other objects supporting the buffer protocol (e.g. memoryview, bytearray or
+    # array.array) are used without copying them, unless their dtype or memory layout differ or
+    # they are read-only (e.g. bytes or memory-mapped files), since fields are writable
+    if isinstance(value, (array.array, bytearray)):
+        # Resizable buffers are copied, since they couldn't be resized while the message holds
+        # a view of them
+        with memoryview(value) as view:
+            return numpy.array(view, dtype=dtype)
+    if not isinstance(value, numpy.ndarray):
+        try:
+            value = memoryview(value)
+        except TypeError:
+            return numpy.array(value, dtype=dtype)
+    value = numpy.ascontiguousarray(value, dtype=dtype)
+    if not value.flags.writeable:
+        return value.copy()
+    return value
+
+
+def _to_array(value: Any, *, typecode: str) -> array.array:
+    # An array.array can't share the memory of another object, so arrays of the same typecode
+    # are used as they are and other buffers of the same item type are copied in one step
+    if isinstance(value, array.array) and value.typecode == typecode:
+        return value
+    try:
+        view = numpy.asarray(memoryview(value))
+    except (TypeError, ValueError):
+        view = None
+    if view is None or view.ndim != 1 or view.dtype != numpy.dtype(typecode):
+        # Convert the items one at a time
+        return array.array(typecode, value)
+    result = array.array(typecode)
+    result.frombytes(memoryview(numpy.ascontiguousarray(view)).cast('B'))
+    return result
@@ -12,41 +12,113 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+from typing import Any
 from typing import Text
+from typing import Tuple
 
 from rosidl_parser.definition import NamespacedType
 from rosidl_runtime_py.import_message import import_message_from_namespaced_type
 
+# Default maximum number of identifiers whose lookup is kept by get_interface, get_message,
+# get_service and get_action
+DEFAULT_INTERFACE_CACHE_SIZE = 1024
+
 
 def get_interface(identifier: Text):
     """Get an interface from its full name."""
-    return import_message_from_namespaced_type(get_namespaced_type(identifier))
+    return _get_cached_interface(identifier, None)
 
 
 def get_message(identifier: Text):
     """Get a message from its full name."""
+    return _get_cached_interface(identifier, 'msg')
+
+
+def get_service(identifier: Text):
+    """Get a service from its full name."""
+    return _get_cached_interface(identifier, 'srv')
+
+
+def get_action(identifier: Text):
+    """Get a message from its full name."""
+    return _get_cached_interface(identifier, 'action')
+
+
+def get_interface_cache_info() -> Any:
+    """
+    Get statistics of the cache of interfaces looked up by their full name.
+
+    :returns: A named tuple with the number of hits and misses, the maximum size and the current
+        size of the cache, as returned by the cache_info() method of functools.lru_cache.
+    """
+    return _lookup_interface_cached.cache_info()
+
+
+def clear_interface_cache() -> None:
+    """
+    Clear the cache of interfaces looked up by their full name and its statistics.
+
+    Failed lookups are cached as well, so this function should be called once the Python modules
+    of interface packages are built or reloaded, along with
+    :func:`rosidl_runtime_py.clear_import_cache`.
+    """
+    _lookup_interface_cached.cache_clear()
+
+
+def _get_cached_interface(identifier: Text, kind: Any) -> Any:
+    interface, error = _lookup_interface_cached(identifier, kind)
+    if error is not None:
+        error_type, args = error
+        raise error_type(*args)
+    return interface
+
+
+def _lookup_interface(identifier: Text, kind: Any) -> Tuple[Any, Any]:
+    try:
+        return _LOOKUP_FUNCTIONS[kind](identifier), None
+    except Exception as e:
+        # Only keep the type and the arguments of the error, since the error itself would keep
+        # the frames of its traceback, and their locals, alive as long as it is cached
+        return None, (type(e), e.args)
+
+
+def _lookup_any_interface(identifier: Text):
+    return import_message_from_namespaced_type(get_namespaced_type(identifier))
+
+
+def _lookup_message(identifier: Text):
     interface = import_message_from_namespaced_type(get_message_namespaced_type(identifier))
     if not is_message(interface):
         raise ValueError("Expected the full name of a message, got '{}'".format(identifier))
     return interface
 
 
-def get_service(identifier: Text):
-    """Get a service from its full name."""
+def _lookup_service(identifier: Text):
     interface = import_message_from_namespaced_type(get_service_namespaced_type(identifier))
     if not is_service(interface):
         raise ValueError("Expected the full name of a service, got '{}'".format(identifier))
     return interface
 
 
-def get_action(identifier: Text):
-    """Get a message from its full name."""
+def _lookup_action(identifier: Text):
     interface = import_message_from_namespaced_type(get_action_namespaced_type(identifier))
     if not is_action(interface):
         raise ValueError("Expected the full name of an action, got '{}'".format(identifier))
     return interface
 
 
+_LOOKUP_FUNCTIONS = {
+    None: _lookup_any_interface,
+    'msg': _lookup_message,
+    'srv': _lookup_service,
+    'action': _lookup_action,
+}
+
+_lookup_interface_cached = functools.lru_cache(maxsize=DEFAULT_INTERFACE_CACHE_SIZE)(
+    _lookup_interface)
+
+
 def get_namespaced_type(identifier: Text):
     """Create a `NamespacedType` object from the full name of an interface."""
     return _get_namespaced_type(identifier)
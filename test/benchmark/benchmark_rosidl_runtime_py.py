@@ -0,0 +1,496 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmarks of the conversion, population and interface discovery functions.
+
+The conversion and population functions are run over the message types of test_msgs with small
+scalar messages, messages with large unbounded sequences and deeply nested messages.
+The interface discovery functions are run over a synthetic ament index.
+
+For each benchmark the number of items (messages, or interfaces for interface discovery) and
+bytes processed per second and the peak memory allocated are reported.
+The results can be stored as a baseline and compared with a baseline, in which case the
+benchmarks whose throughput dropped or whose peak memory grew past a threshold are reported as
+regressions and the exit code is 1.
+No baseline is committed, since the results depend on the machine, so regressions are only
+found against a baseline saved beforehand on the same machine.
+
+Example::
+
+    python3 test/benchmark/benchmark_rosidl_runtime_py.py --save-baseline baseline.json
+    python3 test/benchmark/benchmark_rosidl_runtime_py.py --baseline baseline.json
+"""
+
+import argparse
+from collections import OrderedDict
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from rosidl_parser.definition import AbstractGenericString
+from rosidl_parser.definition import AbstractNestedType
+from rosidl_parser.definition import BasicType
+from rosidl_parser.definition import NamespacedType
+from rosidl_runtime_py import create_messages
+from rosidl_runtime_py import get_action_interfaces
+from rosidl_runtime_py import get_interface_catalog
+from rosidl_runtime_py import get_interface_packages
+from rosidl_runtime_py import get_interfaces
+from rosidl_runtime_py import get_message_interfaces
+from rosidl_runtime_py import get_service_interfaces
+from rosidl_runtime_py import message_to_csv
+from rosidl_runtime_py import message_to_ordereddict
+from rosidl_runtime_py import message_to_yaml
+from rosidl_runtime_py import messages_to_columns
+from rosidl_runtime_py import set_message_fields
+from rosidl_runtime_py.get_interfaces import INTERFACE_CACHE_DIR_ENV_VAR
+
+from test_msgs import message_fixtures
+
+BASELINE_VERSION = 1
+
+# Default relative change of throughput or peak memory reported as a regression
+DEFAULT_THRESHOLD = 0.1
+
+# Sizes in bytes of the basic types, as they are serialized
+_BASIC_TYPE_SIZES = {
+    'boolean': 1, 'octet': 1, 'char': 1, 'wchar': 2, 'float': 4, 'double': 8,
+    'long double': 16, 'int8': 1, 'uint8': 1, 'int16': 2, 'uint16': 2, 'int32': 4,
+    'uint32': 4, 'int64': 8, 'uint64': 8,
+}
+
+
+class Benchmark(NamedTuple):
+    """A function processing a number of items of a total size each time it is called."""
+
+    name: str
+    function: Callable[[], Any]
+    items: int
+    size: int
+
+
+class Result(NamedTuple):
+    """The throughput and peak memory of a benchmark."""
+
+    name: str
+    items_per_second: float
+    bytes_per_second: float
+    peak_memory: int
+
+
+def get_payload_size(msg: Any) -> int:
+    """
+    Get the size of the data of a message.
+
+    :param msg: The ROS message.
+    :returns: The number of bytes of the values of all fields, recursively.
+    """
+    size = 0
+    for field_name, slot_type in zip(msg.get_fields_and_field_types(), msg.SLOT_TYPES):
+        size += _get_value_size(slot_type, getattr(msg, field_name))
+    return size
+
+
+def _get_value_size(slot_type: Any, value: Any) -> int:
+    if isinstance(slot_type, AbstractNestedType):
+        return sum(_get_value_size(slot_type.value_type, item) for item in value)
+    if isinstance(slot_type, NamespacedType):
+        return get_payload_size(value)
+    if isinstance(slot_type, AbstractGenericString):
+        return len(value.encode('utf-8'))
+    if isinstance(slot_type, BasicType):
+        return _BASIC_TYPE_SIZES[slot_type.typename]
+    return 0
+
+
+def get_record(msg: Any) -> Dict[str, Any]:
+    """
+    Get the values to set the fields of a message with.
+
+    Unlike :func:`rosidl_runtime_py.message_to_ordereddict`, the values are those of the fields,
+    so that octets and arrays are kept as they are.
+
+    :param msg: The ROS message.
+    :returns: A dictionary of the values of the fields, with a dictionary for each nested
+        message.
+    """
+    record = OrderedDict()
+    for field_name, slot_type in zip(msg.get_fields_and_field_types(), msg.SLOT_TYPES):
+        value = getattr(msg, field_name)
+        if isinstance(slot_type, NamespacedType):
+            value = get_record(value)
+        elif isinstance(slot_type, AbstractNestedType) and \
+                isinstance(slot_type.value_type, NamespacedType):
+            # set_message_fields replaces the items of lists with messages, so a tuple is used
+            # to set the fields again and again
+            value = tuple(get_record(item) for item in value)
+        record[field_name] = value
+    return record
+
+
+def get_payloads(length: int) -> Dict[str, List[Any]]:
+    """
+    Get the messages to benchmark the conversion and population functions with.
+
+    :param length: The length of the large sequences.
+    :returns: A dictionary of lists of messages, by kind of payload.
+    """
+    return OrderedDict([
+        ('scalars', message_fixtures.get_msg_basic_types()),
+        ('sequences', [_repeat_sequences(
+            max(message_fixtures.get_msg_unbounded_sequences(), key=get_payload_size), length)]),
+        ('nested', [_repeat_sequences(
+            max(message_fixtures.get_msg_multi_nested(), key=get_payload_size),
+            max(1, length // 1000))]),
+    ])
+
+
+def _repeat_sequences(msg: Any, length: int) -> Any:
+    # Repeat the items of the unbounded sequences to make them about as long as length
+    for field_name, field_type in msg.get_fields_and_field_types().items():
+        value = getattr(msg, field_name)
+        if field_type.startswith('sequence<') and ',' not in field_type and len(value):
+            setattr(msg, field_name, value * max(1, length // len(value)))
+    return msg
+
+
+def get_conversion_benchmarks(payloads: Dict[str, List[Any]]) -> List[Benchmark]:
+    """
+    Get the benchmarks of the conversion and population functions.
+
+    :param payloads: The messages to process, by kind of payload.
+    :returns: A list of benchmarks.
+    """
+    benchmarks = []
+    for payload_name, msgs in payloads.items():
+        size = sum(get_payload_size(msg) for msg in msgs)
+        records = [get_record(msg) for msg in msgs]
+
+        def convert_each(function, msgs=msgs):
+            return lambda: [function(msg) for msg in msgs]
+
+        def set_fields(msgs=msgs, records=records):
+            for msg, record in zip(msgs, records):
+                set_message_fields(type(msg)(), record)
+
+        benchmarks.extend(
+            Benchmark('{}/{}'.format(name, payload_name), function, len(msgs), size)
+            for name, function in (
+                ('message_to_ordereddict', convert_each(message_to_ordereddict)),
+                ('message_to_yaml', convert_each(message_to_yaml)),
+                ('message_to_csv', convert_each(message_to_csv)),
+                ('set_message_fields', set_fields),
+            ))
+
+        # The batch functions process all messages at once, so they need messages of one type
+        message_types = {type(msg) for msg in msgs}
+        if len(message_types) > 1:
+            continue
+        message_type = message_types.pop()
+        columns = messages_to_columns(msgs)
+
+        def create_from_records(message_type=message_type, records=records):
+            create_messages(message_type, records)
+
+        def create_from_columns(message_type=message_type, columns=columns):
+            create_messages(message_type, columns)
+
+        benchmarks.extend(
+            Benchmark('{}/{}'.format(name, payload_name), function, len(msgs), size)
+            for name, function in (
+                ('messages_to_columns', lambda msgs=msgs: messages_to_columns(msgs)),
+                ('create_messages', create_from_records),
+                ('create_messages_from_columns', create_from_columns),
+            ))
+    return benchmarks
+
+
+def create_ament_index(path: str, packages: int, interfaces: int) -> int:
+    """
+    Create a synthetic ament index of interface packages.
+
+    :param path: The prefix path to create the ament index in.
+    :param packages: The number of packages.
+    :param interfaces: The number of interfaces of each kind of each package.
+    :returns: The total size of the resources of the packages.
+    """
+    resource_index_path = os.path.join(path, 'share', 'ament_index', 'resource_index')
+    for resource_type in ('packages', 'rosidl_interfaces'):
+        os.makedirs(os.path.join(resource_index_path, resource_type), exist_ok=True)
+    size = 0
+    for i in range(packages):
+        package_name = 'benchmark_{}_msgs'.format(i)
+        with open(os.path.join(resource_index_path, 'packages', package_name), 'w'):
+            pass
+        content = '\n'.join(
+            '{}/Interface{}.{}'.format(kind, j, extension)
+            for kind in ('msg', 'srv', 'action')
+            for j in range(interfaces)
+            for extension in ('idl', kind))
+        with open(os.path.join(resource_index_path, 'rosidl_interfaces', package_name), 'w') as f:
+            size += f.write(content)
+    return size
+
+
+def get_discovery_benchmarks(path: str, packages: int, interfaces: int) -> List[Benchmark]:
+    """
+    Get the benchmarks of the interface discovery functions.
+
+    The returned functions read the ament index in the given path, which is created, from
+    scratch each time they are called, except for the warm benchmark.
+
+    :param path: The prefix path to create the synthetic ament index in.
+    :param packages: The number of packages.
+    :param interfaces: The number of interfaces of each kind of each package.
+    :returns: A list of benchmarks.
+    """
+    size = create_ament_index(path, packages, interfaces)
+    catalog = get_interface_catalog()
+
+    def with_prefix_path(function):
+        def run():
+            environ = {
+                name: os.environ.get(name)
+                for name in ('AMENT_PREFIX_PATH', INTERFACE_CACHE_DIR_ENV_VAR)}
+            os.environ['AMENT_PREFIX_PATH'] = path
+            os.environ.pop(INTERFACE_CACHE_DIR_ENV_VAR, None)
+            try:
+                return function()
+            finally:
+                for name, value in environ.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+        return run
+
+    def cold(function):
+        def run():
+            catalog.refresh()
+            return function()
+        return with_prefix_path(run)
+
+    benchmarks = [
+        Benchmark('get_interface_packages', with_prefix_path(get_interface_packages), packages, 0)
+    ]
+    for name, function, count in (
+        ('get_interfaces', get_interfaces, 3 * interfaces),
+        ('get_message_interfaces', get_message_interfaces, interfaces),
+        ('get_service_interfaces', get_service_interfaces, interfaces),
+        ('get_action_interfaces', get_action_interfaces, interfaces),
+    ):
+        benchmarks.append(Benchmark(name + '/cold', cold(function), packages * count, size))
+    benchmarks.append(Benchmark(
+        'get_interfaces/warm', with_prefix_path(get_interfaces), packages * 3 * interfaces, size))
+    return benchmarks
+
+
+def run_benchmark(benchmark: Benchmark, min_time: float, repeat: int = 3) -> Result:
+    """
+    Measure the throughput and peak memory of a benchmark.
+
+    :param benchmark: The benchmark to run.
+    :param min_time: The minimum time in seconds of each measurement, for which the function
+        is called as many times as needed.
+    :param repeat: The number of measurements, of which the fastest is kept.
+    :returns: The result of the benchmark.
+    """
+    # The first call fills the caches
+    benchmark.function()
+    number = 1
+    while True:
+        elapsed = _time(benchmark.function, number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+    for _ in range(repeat - 1):
+        elapsed = min(elapsed, _time(benchmark.function, number))
+    elapsed = max(elapsed, 1e-9)
+
+    tracemalloc.start()
+    try:
+        benchmark.function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Result(
+        benchmark.name, benchmark.items * number / elapsed, benchmark.size * number / elapsed,
+        peak_memory)
+
+
+def _time(function: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        function()
+    return time.perf_counter() - start
+
+
+def load_baseline(path: str) -> Dict[str, Result]:
+    """
+    Load the results stored as a baseline.
+
+    :param path: The path of the baseline file.
+    :returns: A dictionary of the results, by benchmark name.
+    :raises ValueError: If the file is not a baseline of a supported version.
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get('version') != BASELINE_VERSION:
+        raise ValueError("'{}' is not a baseline of version {}".format(path, BASELINE_VERSION))
+    return {
+        name: Result(name, **values) for name, values in data['results'].items()}
+
+
+def save_baseline(path: str, results: List[Result]) -> None:
+    """
+    Store results as a baseline.
+
+    :param path: The path of the baseline file.
+    :param results: The results to store.
+    """
+    data = {
+        'version': BASELINE_VERSION,
+        'results': OrderedDict(
+            (result.name, OrderedDict(
+                (key, value) for key, value in result._asdict().items() if key != 'name'))
+            for result in results),
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def find_regressions(
+    results: List[Result], baseline: Dict[str, Result], threshold: float = DEFAULT_THRESHOLD
+) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    :param results: The results to compare.
+    :param baseline: The results of the baseline, by benchmark name.
+    :param threshold: The relative drop of throughput or growth of peak memory to report.
+    :returns: A description of each regression, for the benchmarks found in the baseline.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        if result.items_per_second < reference.items_per_second * (1 - threshold):
+            regressions.append('{}: {:.0f} items/s instead of {:.0f} items/s'.format(
+                result.name, result.items_per_second, reference.items_per_second))
+        if result.peak_memory > reference.peak_memory * (1 + threshold):
+            regressions.append('{}: peak memory of {} bytes instead of {} bytes'.format(
+                result.name, result.peak_memory, reference.peak_memory))
+    return regressions
+
+
+def format_results(results: List[Result], baseline: Optional[Dict[str, Result]] = None) -> str:
+    """
+    Format results as a table.
+
+    :param results: The results to format.
+    :param baseline: The results of the baseline to show the relative throughput to, if any.
+    :returns: The table.
+    """
+    header = ['benchmark', 'items/s', 'MiB/s', 'peak KiB']
+    if baseline is not None:
+        header.append('vs baseline')
+    rows = [header]
+    for result in results:
+        row = [
+            result.name,
+            '{:.0f}'.format(result.items_per_second),
+            '{:.2f}'.format(result.bytes_per_second / 2 ** 20),
+            '{:.1f}'.format(result.peak_memory / 2 ** 10),
+        ]
+        if baseline is not None:
+            reference = baseline.get(result.name)
+            row.append('{:+.1%}'.format(
+                result.items_per_second / reference.items_per_second - 1)
+                if reference is not None else '')
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join(
+        '  '.join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))).rstrip()
+        for row in rows)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--filter', metavar='PATTERN',
+        help='Only run the benchmarks whose name matches this regular expression')
+    parser.add_argument(
+        '--length', type=int, default=10000,
+        help='The length of the large sequences (default: %(default)s)')
+    parser.add_argument(
+        '--packages', type=int, default=500,
+        help='The number of packages in the synthetic ament index (default: %(default)s)')
+    parser.add_argument(
+        '--interfaces', type=int, default=10,
+        help='The number of interfaces of each kind of each package (default: %(default)s)')
+    parser.add_argument(
+        '--min-time', type=float, default=0.2,
+        help='The minimum time in seconds of each measurement (default: %(default)s)')
+    parser.add_argument(
+        '--baseline', metavar='FILE', help='Compare the results with this baseline')
+    parser.add_argument(
+        '--save-baseline', metavar='FILE', help='Store the results as a baseline')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='The relative change reported as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    results = []
+    with tempfile.TemporaryDirectory() as path:
+        benchmarks = get_conversion_benchmarks(get_payloads(args.length))
+        benchmarks += get_discovery_benchmarks(path, args.packages, args.interfaces)
+        for benchmark in benchmarks:
+            if args.filter and not re.search(args.filter, benchmark.name):
+                continue
+            results.append(run_benchmark(benchmark, args.min_time))
+        # Don't keep the synthetic ament index around
+        get_interface_catalog().refresh()
+
+    print(format_results(results, baseline))
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if baseline is None:
+        return 0
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print('\nRegressions past a threshold of {:.0%}:'.format(args.threshold))
+        for regression in regressions:
+            print('  ' + regression)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+from benchmark_rosidl_runtime_py import find_regressions
+from benchmark_rosidl_runtime_py import load_baseline
+from benchmark_rosidl_runtime_py import main
+from benchmark_rosidl_runtime_py import Result
+import pytest
+
+# The benchmarks modify AMENT_PREFIX_PATH and refresh the interface catalog while they run, so
+# they are only run in their own test session when opted in
+BENCHMARK_ENV_VAR = 'ROSIDL_RUNTIME_PY_BENCHMARK'
+
+
+@pytest.mark.skipif(
+    not os.environ.get(BENCHMARK_ENV_VAR),
+    reason='set {} to run the benchmarks'.format(BENCHMARK_ENV_VAR))
+def test_benchmarks(tmp_path, capsys):
+    baseline_path = tmp_path / 'baseline.json'
+    argv = ['--length', '10', '--packages', '3', '--interfaces', '2', '--min-time', '0']
+    assert main(argv + ['--save-baseline', str(baseline_path)]) == 0
+    output = capsys.readouterr().out
+    for name in (
+        'message_to_yaml/scalars', 'set_message_fields/sequences', 'create_messages/nested',
+        'create_messages_from_columns/scalars', 'get_interfaces/cold',
+    ):
+        assert name in output
+
+    baseline = load_baseline(str(baseline_path))
+    assert 'messages_to_columns/nested' in baseline
+
+    # a baseline many times faster than any run flags all benchmarks
+    data = json.loads(baseline_path.read_text())
+    for values in data['results'].values():
+        values['items_per_second'] *= 1000
+    baseline_path.write_text(json.dumps(data))
+    assert main(argv + ['--baseline', str(baseline_path), '--filter', '/scalars$']) == 1
+    assert 'message_to_csv/scalars: ' in capsys.readouterr().out
+
+
+def test_find_regressions():
+    baseline = {
+        'a': Result('a', 100.0, 1000.0, 100),
+        'b': Result('b', 100.0, 1000.0, 100),
+    }
+    results = [
+        Result('a', 95.0, 950.0, 105),
+        Result('b', 80.0, 800.0, 200),
+        Result('c', 1.0, 1.0, 1),
+    ]
+    assert find_regressions(results, baseline) == [
+        'b: 80 items/s instead of 100 items/s',
+        'b: peak memory of 200 bytes instead of 100 bytes',
+    ]
+    assert find_regressions(results, baseline, threshold=0.01) == [
+        'a: 95 items/s instead of 100 items/s',
+        'a: peak memory of 105 bytes instead of 100 bytes',
+        'b: 80 items/s instead of 100 items/s',
+        'b: peak memory of 200 bytes instead of 100 bytes',
+    ]
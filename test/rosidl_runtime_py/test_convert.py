@@ -13,13 +13,34 @@
 # limitations under the License.
 
 from collections import OrderedDict
+import csv
+import io
 
+import numpy
+import pytest
+
+from rosidl_runtime_py import get_message_dtype
+from rosidl_runtime_py import get_message_slot_types
 from rosidl_runtime_py import message_to_csv
 from rosidl_runtime_py import message_to_ordereddict
 from rosidl_runtime_py import message_to_yaml
+from rosidl_runtime_py import MessageCsvWriter
+from rosidl_runtime_py import MessageProjection
+from rosidl_runtime_py import messages_to_columns
+from rosidl_runtime_py import messages_to_structured_array
+from rosidl_runtime_py import MessageView
 from rosidl_runtime_py.convert import _convert_value
+from rosidl_runtime_py.convert import _get_message_converter
+from rosidl_runtime_py.convert import _get_yaml_emitter
+from rosidl_runtime_py.convert import _MessageDumper
+from rosidl_runtime_py.convert import _PythonMessageDumper
+from rosidl_runtime_py.convert import _UnsupportedYamlValue
+from rosidl_runtime_py.convert import _YAML_WIDTH
 
 from test_msgs import message_fixtures
+import test_msgs.msg
+
+import yaml
 
 
 def test_primitives():
@@ -45,6 +66,426 @@ def test_primitives():
         message_to_yaml(m, truncate_length=None)
 
 
+def test_message_to_ordereddict_matches_generic_conversion():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_basic_types())
+    msgs.extend(message_fixtures.get_msg_bounded_sequences())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_strings())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    for m in msgs:
+        for kwargs in (
+            {},
+            {'truncate_length': 0},
+            {'truncate_length': 2},
+            {'no_arr': True},
+            {'no_str': True},
+        ):
+            expected = OrderedDict(
+                (field_name, _convert_value(
+                    getattr(m, field_name), field_type=field_type, **kwargs))
+                for field_name, field_type in get_message_slot_types(m).items())
+            assert expected == message_to_ordereddict(m, **kwargs)
+
+
+def test_message_converter_is_cached():
+    msg = message_fixtures.get_msg_nested()[0]
+    converter = _get_message_converter(type(msg), truncate_length=5)
+    assert converter is _get_message_converter(type(msg), truncate_length=5)
+    assert converter is not _get_message_converter(type(msg), truncate_length=None)
+    assert converter(msg) == message_to_ordereddict(msg, truncate_length=5)
+
+
+def test_message_binary_encoding():
+    msg = message_fixtures.get_msg_unbounded_sequences()[0]
+    msg.bool_values = [True]
+    msg.byte_values = [b'\x00', b'\xff', b'a']
+    msg.char_values = [65, 66]
+    msg.uint8_values = [1, 2, 255]
+    assert message_to_ordereddict(msg)['byte_values'] == ['\x00', '\xff', 'a']
+
+    d = message_to_ordereddict(msg, binary_encoding='hex')
+    assert d['byte_values'] == '00ff61'
+    assert d['char_values'] == '4142'
+    assert d['uint8_values'] == '0102ff'
+    assert d['int8_values'] == message_to_ordereddict(msg)['int8_values']
+    d = message_to_ordereddict(msg, binary_encoding='base64', truncate_length=2)
+    assert d['byte_values'] == 'AP8=...'
+    assert d['uint8_values'] == 'AQI=...'
+    d = message_to_ordereddict(msg, binary_encoding='hex', no_arr=True)
+    assert d['uint8_values'] == '<sequence type: uint8, length: 3>'
+
+    yaml_str = message_to_yaml(msg, binary_encoding='hex', flow_style=True)
+    assert 'byte_values: 00ff61\n' in yaml_str
+    assert "char_values: '4142'\n" in yaml_str
+    assert yaml.safe_load(yaml_str) == message_to_ordereddict(msg, binary_encoding='hex')
+
+    csv_str = message_to_csv(msg, binary_encoding='base64')
+    assert csv_str.startswith('True,AP9h,QUI=,')
+    writer = MessageCsvWriter(io.StringIO(), type(msg), binary_encoding='base64')
+    assert len(writer.fieldnames) == len(msg.get_fields_and_field_types())
+
+    with pytest.raises(ValueError):
+        message_to_ordereddict(msg, binary_encoding='base32')
+
+
+def test_message_view():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_nested())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    for m in msgs:
+        for kwargs in (
+            {},
+            {'truncate_length': 2},
+            {'no_arr': True},
+            {'no_str': True},
+            {'binary_encoding': 'hex'},
+        ):
+            expected = message_to_ordereddict(m, **kwargs)
+            view = MessageView(m, **kwargs)
+            assert list(view) == list(expected)
+            assert len(view) == len(expected)
+            assert view == expected
+            assert view.to_ordereddict() == expected
+
+    msg = message_fixtures.get_msg_nested()[0]
+    view = MessageView(msg)
+    assert view.message is msg
+    # fields are only converted when accessed and kept afterwards
+    assert view._values == {}
+    nested_view = view['basic_types_value']
+    assert isinstance(nested_view, MessageView)
+    assert view['basic_types_value'] is nested_view
+    assert nested_view._values == {}
+    assert nested_view['int8_value'] == msg.basic_types_value.int8_value
+    assert list(nested_view._values) == ['int8_value']
+    assert 'basic_types_value' in view
+    assert 'not_a_field' not in view
+    with pytest.raises(KeyError):
+        view['not_a_field']
+    with pytest.raises(TypeError):
+        view['basic_types_value'] = None
+
+    msg = message_fixtures.get_msg_unbounded_sequences()[-1]
+    view = MessageView(msg, truncate_length=1)
+    assert len(msg.basic_types_values) > 1
+    assert isinstance(view['basic_types_values'][0], MessageView)
+    assert view['basic_types_values'][1:] == ['...']
+
+    with pytest.raises(ValueError):
+        MessageView(msg, binary_encoding='rot13')
+
+
+def test_message_projection():
+    msg = max(
+        message_fixtures.get_msg_unbounded_sequences(), key=lambda m: len(m.basic_types_values))
+    assert len(msg.int32_values) >= 2 and len(msg.basic_types_values) >= 2
+    d = message_to_ordereddict(msg)
+    projection = MessageProjection(type(msg), [
+        'int32_values[0:2]',
+        'int32_values[-1]',
+        'float64_values[::-1]',
+        'string_values',
+        'basic_types_values[0]',
+        'basic_types_values[1:].int8_value',
+        'basic_types_values[0].uint16_value',
+    ])
+    assert projection.paths[1] == 'int32_values[-1]'
+    assert projection.to_ordereddict(msg) == OrderedDict([
+        ('int32_values[0:2]', d['int32_values'][0:2]),
+        ('int32_values[-1]', d['int32_values'][-1]),
+        ('float64_values[::-1]', d['float64_values'][::-1]),
+        ('string_values', d['string_values']),
+        ('basic_types_values[0]', d['basic_types_values'][0]),
+        ('basic_types_values[1:].int8_value', [
+            values['int8_value'] for values in d['basic_types_values'][1:]]),
+        ('basic_types_values[0].uint16_value', d['basic_types_values'][0]['uint16_value']),
+    ])
+    projection = MessageProjection(type(msg), [
+        'int32_values[0:2]', 'basic_types_values[0]', 'basic_types_values[1:].int8_value'])
+    assert projection.to_csv(msg) == ','.join(
+        [str(value) for value in msg.int32_values[0:2]] +
+        [message_to_csv(msg.basic_types_values[0])] +
+        [str(value.int8_value) for value in msg.basic_types_values[1:]])
+    assert yaml.safe_load(projection.to_yaml(msg)) == yaml.safe_load(
+        yaml.dump(projection.to_ordereddict(msg), Dumper=_MessageDumper))
+
+    # the options apply to the selected values
+    msg = message_fixtures.get_msg_arrays()[0]
+    projection = MessageProjection(
+        type(msg), ['uint8_values[0:2]', 'float32_values', 'string_values[0]'],
+        truncate_length=1, binary_encoding='hex')
+    assert projection.to_ordereddict(msg) == OrderedDict([
+        ('uint8_values[0:2]', msg.uint8_values[0:1].tobytes().hex() + '...'),
+        ('float32_values', [float(msg.float32_values[0]), '...']),
+        ('string_values[0]', msg.string_values[0][:1] + (
+            '...' if len(msg.string_values[0]) > 1 else '')),
+    ])
+    assert projection.to_csv(msg) == ','.join(
+        str(value) for value in (
+            msg.uint8_values[0:1].tobytes().hex() + '...', msg.float32_values[0], '...',
+            projection.to_ordereddict(msg)['string_values[0]']))
+
+    for path in (
+        'not_a_field', 'float32_values.x', 'float32_values[0][1]', 'float32_values[0].x',
+        'float32_values[::0]', '[0]', 'float32_values..x', 'float32_values[a]',
+    ):
+        with pytest.raises(ValueError):
+            MessageProjection(type(msg), [path])
+
+
+def test_messages_to_columns():
+    msgs = message_fixtures.get_msg_basic_types()
+    columns = messages_to_columns(iter(msgs))
+    assert list(columns.keys()) == list(msgs[0].get_fields_and_field_types().keys())
+    assert columns['int8_value'].dtype == numpy.int8
+    assert columns['uint64_value'].dtype == numpy.uint64
+    assert columns['float32_value'].dtype == numpy.float32
+    assert columns['bool_value'].dtype == numpy.bool_
+    assert columns['byte_value'].dtype == numpy.uint8
+    for field_name, column in columns.items():
+        assert column.shape == (len(msgs),)
+    assert columns['int32_value'].tolist() == [m.int32_value for m in msgs]
+    assert columns['byte_value'].tolist() == [m.byte_value[0] for m in msgs]
+
+    assert messages_to_columns([]) == OrderedDict()
+    with pytest.raises(TypeError):
+        messages_to_columns(msgs + message_fixtures.get_msg_nested())
+
+
+def test_messages_to_columns_nested():
+    msgs = message_fixtures.get_msg_nested()
+    columns = messages_to_columns(msgs)
+    assert columns['basic_types_value.int32_value'].tolist() == [
+        m.basic_types_value.int32_value for m in msgs]
+
+    msgs = message_fixtures.get_msg_arrays()
+    columns = messages_to_columns(msgs)
+    assert columns['int32_values'].shape == (len(msgs), 3)
+    assert columns['int32_values'].tolist() == [m.int32_values.tolist() for m in msgs]
+    assert columns['string_values'].tolist() == [list(m.string_values) for m in msgs]
+    assert columns['basic_types_values.int8_value'].tolist() == [
+        [b.int8_value for b in m.basic_types_values] for m in msgs]
+
+    msgs = message_fixtures.get_msg_unbounded_sequences()
+    columns = messages_to_columns(msgs)
+    assert columns['int32_values'].dtype == object
+    for m, column in zip(msgs, columns['int32_values']):
+        assert column.dtype == numpy.int32
+        assert column.tolist() == m.int32_values.tolist()
+    for m, nested_columns in zip(msgs, columns['basic_types_values']):
+        assert nested_columns['int8_value'].tolist() == [
+            b.int8_value for b in m.basic_types_values]
+
+
+def test_get_message_dtype():
+    dtype = get_message_dtype(test_msgs.msg.Nested)
+    assert dtype.names == ('basic_types_value',)
+    basic_types_dtype = dtype['basic_types_value']
+    assert basic_types_dtype == get_message_dtype(test_msgs.msg.BasicTypes)
+    assert basic_types_dtype.names == tuple(
+        test_msgs.msg.BasicTypes.get_fields_and_field_types())
+    assert basic_types_dtype['bool_value'] == numpy.bool_
+    assert basic_types_dtype['byte_value'] == numpy.uint8
+    assert basic_types_dtype['float32_value'] == numpy.float32
+    assert basic_types_dtype['uint64_value'] == numpy.uint64
+
+    dtype = get_message_dtype(test_msgs.msg.Builtins, align=True)
+    assert dtype.isalignedstruct
+    assert dtype['time_value'].names == ('sec', 'nanosec')
+
+    for message_class in (
+        test_msgs.msg.Arrays, test_msgs.msg.BoundedSequences, test_msgs.msg.MultiNested,
+        test_msgs.msg.Strings, test_msgs.msg.UnboundedSequences,
+    ):
+        with pytest.raises(ValueError):
+            get_message_dtype(message_class)
+
+
+def test_messages_to_structured_array():
+    msgs = message_fixtures.get_msg_nested()
+    values = messages_to_structured_array(msgs)
+    assert values.dtype == get_message_dtype(test_msgs.msg.Nested)
+    assert values.shape == (len(msgs),)
+    columns = messages_to_columns(msgs)
+    for path, column in columns.items():
+        field_name, nested_field_name = path.split('.')
+        numpy.testing.assert_array_equal(values[field_name][nested_field_name], column)
+
+    msgs = message_fixtures.get_msg_builtins()
+    values = messages_to_structured_array(msgs, test_msgs.msg.Builtins, align=True)
+    assert values.dtype.isalignedstruct
+    assert values['time_value']['nanosec'].tolist() == [
+        msg.time_value.nanosec for msg in msgs]
+
+    assert messages_to_structured_array([], test_msgs.msg.Nested).shape == (0,)
+    with pytest.raises(ValueError):
+        messages_to_structured_array([])
+    with pytest.raises(ValueError):
+        messages_to_structured_array(message_fixtures.get_msg_strings())
+    with pytest.raises(TypeError):
+        messages_to_structured_array(msgs, test_msgs.msg.Nested)
+    with pytest.raises(TypeError):
+        messages_to_structured_array(msgs + message_fixtures.get_msg_nested())
+
+
+def test_message_csv_writer():
+    msgs = message_fixtures.get_msg_basic_types()
+    f = io.StringIO()
+    with MessageCsvWriter(f, type(msgs[0]), chunk_size=2) as writer:
+        writer.write_messages(iter(msgs))
+        writer.write(msgs[0])
+    lines = f.getvalue().splitlines()
+    assert lines[0].split(',') == list(msgs[0].get_fields_and_field_types().keys())
+    assert lines[1:] == [message_to_csv(m) for m in msgs + msgs[:1]]
+
+    with pytest.raises(TypeError):
+        writer.write(message_fixtures.get_msg_nested()[0])
+
+
+def test_message_csv_writer_header():
+    msg = message_fixtures.get_msg_nested()[0]
+    f = io.StringIO()
+    MessageCsvWriter(f, type(msg)).flush()
+    assert f.getvalue() == ','.join(
+        'basic_types_value.' + name
+        for name in msg.basic_types_value.get_fields_and_field_types().keys()) + '\n'
+
+    msg = message_fixtures.get_msg_arrays()[0]
+    msg.string_values = ['a', 'b', 'c']
+    writer = MessageCsvWriter(io.StringIO(), type(msg), truncate_length=2)
+    assert writer.fieldnames[:3] == ('bool_values[0]', 'bool_values[1]', 'bool_values[...]')
+    assert 'basic_types_values[1].int8_value' in writer.fieldnames
+    assert 'basic_types_values[2].int8_value' not in writer.fieldnames
+    assert len(writer.fieldnames) == len(message_to_csv(msg, truncate_length=2).split(','))
+
+    writer = MessageCsvWriter(io.StringIO(), type(msg), no_arr=True)
+    assert writer.fieldnames[0] == 'bool_values'
+    assert len(writer.fieldnames) == len(msg.get_fields_and_field_types())
+
+    f = io.StringIO()
+    MessageCsvWriter(f, type(msg), header=False).write_messages([msg])
+    assert f.getvalue() == message_to_csv(msg) + '\n'
+
+
+def test_message_csv_writer_rows_match_header():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_bounded_sequences())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_strings())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    msg = test_msgs.msg.Strings(string_value='', bounded_string_value='a,b\nc')
+    msgs.append(msg)
+    msg = test_msgs.msg.UnboundedSequences(string_values=['', 'x,"y"'], int32_values=[7])
+    msgs.append(msg)
+    for options in ({}, {'truncate_length': 2}, {'no_arr': True}, {'binary_encoding': 'hex'}):
+        for message_type in {type(m) for m in msgs}:
+            f = io.StringIO(newline='')
+            with MessageCsvWriter(f, message_type, **options) as writer:
+                writer.write_messages(m for m in msgs if type(m) is message_type)
+            rows = list(csv.reader(io.StringIO(f.getvalue(), newline='')))
+            assert rows[0] == list(writer.fieldnames)
+            for row in rows[1:]:
+                assert len(row) == len(writer.fieldnames)
+
+    f = io.StringIO(newline='')
+    with MessageCsvWriter(f, test_msgs.msg.Strings) as writer:
+        writer.write(test_msgs.msg.Strings(string_value='', bounded_string_value='a,b\nc'))
+    assert list(csv.reader(io.StringIO(f.getvalue(), newline=''))) == [
+        ['string_value', 'bounded_string_value'], ['', 'a,b\nc']]
+
+    f = io.StringIO(newline='')
+    with MessageCsvWriter(f, test_msgs.msg.UnboundedSequences) as writer:
+        writer.write(msg)
+    header, row = csv.reader(io.StringIO(f.getvalue(), newline=''))
+    row = dict(zip(header, row))
+    assert row['bool_values'] == ''
+    assert row['int32_values'] == '7'
+    assert row['string_values'] == ',x,"y"'
+
+
+def test_message_to_yaml_leaves_global_representers_untouched():
+    msg = message_fixtures.get_msg_nested()[0]
+    assert message_to_yaml(msg).startswith('basic_types_value:\n  bool_value: false\n')
+    msg = message_fixtures.get_msg_arrays()[0]
+    assert message_to_yaml(msg).startswith('bool_values:\n- false\n- true\n')
+    assert message_to_yaml(msg, flow_style=True).startswith(
+        'bool_values: [false, true, false]\n')
+    # The OrderedDict representer of message_to_yaml must not be registered globally, while
+    # the Dumper of PyYAML has its own one
+    represent_ordereddict = _MessageDumper.yaml_representers[OrderedDict]
+    assert yaml.Dumper.yaml_representers.get(OrderedDict) is not represent_ordereddict
+    assert OrderedDict not in yaml.SafeDumper.yaml_representers
+
+
+def test_message_to_yaml_writes_characters_like_pyyaml():
+    # libyaml would escape these characters
+    msg = test_msgs.msg.Strings(string_value='x\U0001F600', bounded_string_value='a\x85b')
+    expected = yaml.dump(
+        OrderedDict([('string_value', 'x\U0001F600'), ('bounded_string_value', 'a\x85b')]),
+        Dumper=_PythonMessageDumper, allow_unicode=True, width=_YAML_WIDTH)
+    assert message_to_yaml(msg) == expected
+    assert message_to_yaml(msg).startswith('string_value: x\U0001F600\n')
+    assert MessageProjection(type(msg), ['string_value']).to_yaml(msg) == \
+        'string_value: x\U0001F600\n'
+    msg = test_msgs.msg.UnboundedSequences(string_values=['\U0001F600'])
+    assert '- \U0001F600\n' in message_to_yaml(msg)
+
+
+def _dump_yaml(msg, flow_style=False, **kwargs):
+    return yaml.dump(
+        message_to_ordereddict(msg, **kwargs), Dumper=_MessageDumper,
+        allow_unicode=True, width=_YAML_WIDTH, default_flow_style=flow_style)
+
+
+def test_yaml_emitter_matches_pyyaml():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_basic_types())
+    msgs.extend(message_fixtures.get_msg_bounded_sequences())
+    msgs.extend(message_fixtures.get_msg_builtins())
+    msgs.extend(message_fixtures.get_msg_empty())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_nested())
+    msgs.extend(message_fixtures.get_msg_strings())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    for m in msgs:
+        for flow_style in (False, True):
+            for kwargs in (
+                {},
+                {'truncate_length': 0},
+                {'truncate_length': 2},
+                {'no_arr': True},
+                {'no_str': True},
+            ):
+                emitter = _get_yaml_emitter(type(m), flow_style=flow_style, **kwargs)
+                assert emitter(m) == _dump_yaml(m, flow_style=flow_style, **kwargs)
+
+
+def test_yaml_emitter_strings():
+    msg = message_fixtures.get_msg_strings()[0]
+    for value in (
+        '', ' ', 'a b', ' a', 'a ', 'true', 'Yes', 'null', '~', '123', '0x1F', '1.5e3', '.inf',
+        '2001-12-14', '12:30', 'a: b', 'a:b', ':a', '? a', '- a', '-a', '---', '...', 'a...',
+        'a #b', 'a#b', '#a', "it's", '"a"', '[a]', 'a,b', '{a}', '&a', '*a', '!a', '%a', '@a',
+        '`a', '|a', '>a', '<a>', 'a\x00b', 'a\tb', '\x7f', 'a\nb\tc', 'a\\b', 'Hellö Wörld!',
+    ):
+        msg.string_value = value
+        for flow_style in (False, True):
+            emitter = _get_yaml_emitter(type(msg), flow_style=flow_style)
+            assert emitter(msg) == _dump_yaml(msg, flow_style=flow_style)
+
+    # Strings written over several lines are left to PyYAML
+    msg.string_value = 'a\nb'
+    with pytest.raises(_UnsupportedYamlValue):
+        _get_yaml_emitter(type(msg))(msg)
+    assert message_to_yaml(msg) == _dump_yaml(msg)
+
+
 def test_convert_primitives():
     assert 5 == _convert_value(5)
     assert 5 == _convert_value(5, truncate_length=0)
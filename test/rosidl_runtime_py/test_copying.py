@@ -0,0 +1,61 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+from rosidl_runtime_py import copy_message
+
+from test_msgs import message_fixtures
+import test_msgs.msg
+
+
+def test_copy_message():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_basic_types())
+    msgs.extend(message_fixtures.get_msg_bounded_sequences())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_nested())
+    msgs.extend(message_fixtures.get_msg_strings())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    for msg in msgs:
+        for share_arrays in (False, True):
+            msg_copy = copy_message(msg, share_arrays=share_arrays)
+            assert type(msg_copy) is type(msg)
+            assert msg_copy is not msg
+            assert msg_copy == msg
+            assert msg_copy == copy.deepcopy(msg)
+
+    msg = test_msgs.msg.Arrays()
+    msg_copy = copy_message(msg)
+    for field_name in ('float32_values', 'string_values', 'basic_types_values'):
+        assert getattr(msg_copy, field_name) is not getattr(msg, field_name)
+    assert msg_copy.basic_types_values[0] is not msg.basic_types_values[0]
+    msg_copy.float32_values[0] = 1.5
+    msg_copy.basic_types_values[0].int8_value = 3
+    assert msg.float32_values[0] == 0.0
+    assert msg.basic_types_values[0].int8_value == 0
+    # the copy can still be changed through the checks of the fields
+    msg_copy.int8_values = [1, 2, 3]
+    assert list(msg_copy.int8_values) == [1, 2, 3]
+
+    msg = test_msgs.msg.UnboundedSequences(
+        int32_values=[1, 2], string_values=['a'], basic_types_values=[test_msgs.msg.BasicTypes()])
+    msg_copy = copy_message(msg, share_arrays=True)
+    assert msg_copy.int32_values is msg.int32_values
+    assert msg_copy.string_values is msg.string_values
+    # nested messages are copied even when sharing arrays
+    assert msg_copy.basic_types_values is not msg.basic_types_values
+    assert msg_copy.basic_types_values[0] is not msg.basic_types_values[0]
+    assert msg_copy == msg
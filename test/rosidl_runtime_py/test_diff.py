@@ -0,0 +1,87 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import copy
+
+import pytest
+
+from rosidl_runtime_py import diff_messages
+from rosidl_runtime_py import message_to_ordereddict
+from rosidl_runtime_py import MessageDeltaEncoder
+
+from test_msgs import message_fixtures
+import test_msgs.msg
+
+
+def test_diff_messages():
+    for msg in (
+        message_fixtures.get_msg_arrays() + message_fixtures.get_msg_multi_nested() +
+        message_fixtures.get_msg_unbounded_sequences()
+    ):
+        assert diff_messages(msg, copy.deepcopy(msg)) == OrderedDict()
+
+    old_msg = test_msgs.msg.Arrays()
+    new_msg = test_msgs.msg.Arrays()
+    new_msg.float64_values[1] = 1.5
+    new_msg.basic_types_values[2].int8_value = 3
+    new_msg.string_values[0] = 'changed'
+    assert diff_messages(old_msg, new_msg) == OrderedDict([
+        ('float64_values', [0.0, 1.5, 0.0]),
+        ('string_values', ['changed', '', '']),
+        ('basic_types_values[2].int8_value', 3),
+    ])
+    assert diff_messages(old_msg, new_msg, no_arr=True)['float64_values'] == \
+        message_to_ordereddict(new_msg, no_arr=True)['float64_values']
+
+    # NaN values are equal to each other
+    old_msg.float32_values[0] = float('nan')
+    new_msg = copy.deepcopy(old_msg)
+    assert diff_messages(old_msg, new_msg) == OrderedDict()
+
+    old_msg = test_msgs.msg.UnboundedSequences(basic_types_values=[test_msgs.msg.BasicTypes()])
+    new_msg = test_msgs.msg.UnboundedSequences(
+        int32_values=[1, 2], basic_types_values=[test_msgs.msg.BasicTypes()] * 2)
+    assert diff_messages(old_msg, new_msg) == OrderedDict([
+        ('int32_values', [1, 2]),
+        ('basic_types_values', message_to_ordereddict(new_msg)['basic_types_values']),
+    ])
+
+    with pytest.raises(TypeError):
+        diff_messages(test_msgs.msg.Arrays(), test_msgs.msg.Nested())
+
+
+def test_message_delta_encoder():
+    encoder = MessageDeltaEncoder()
+    msg = test_msgs.msg.Nested()
+    assert encoder.encode(msg) == message_to_ordereddict(msg)
+    assert encoder.encode(msg) == OrderedDict()
+    # a copy of the message is kept, so changing the message changes the next delta
+    msg.basic_types_value.int32_value = 42
+    assert encoder.encode(msg) == OrderedDict([('basic_types_value.int32_value', 42)])
+    assert encoder.encode(msg) == OrderedDict()
+
+    # messages of another type are encoded as a whole
+    other_msg = test_msgs.msg.Arrays()
+    assert encoder.encode(other_msg) == message_to_ordereddict(other_msg)
+    encoder.reset()
+    assert encoder.encode(other_msg) == message_to_ordereddict(other_msg)
+
+    encoder = MessageDeltaEncoder(keyframe_interval=2, truncate_length=1)
+    deltas = [encoder.encode(other_msg) for _ in range(4)]
+    assert deltas[0] == deltas[2] == message_to_ordereddict(other_msg, truncate_length=1)
+    assert deltas[1] == deltas[3] == OrderedDict()
+
+    with pytest.raises(ValueError):
+        MessageDeltaEncoder(keyframe_interval=0)
@@ -12,16 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import importlib
 import os
 
+from ament_index_python import get_resource
+from ament_index_python import get_resources
+from ament_index_python import get_search_paths
 import pytest
 
 from rosidl_runtime_py import get_action_interfaces
+from rosidl_runtime_py import get_interface_catalog
 from rosidl_runtime_py import get_interface_packages
 from rosidl_runtime_py import get_interface_path
 from rosidl_runtime_py import get_interfaces
 from rosidl_runtime_py import get_message_interfaces
 from rosidl_runtime_py import get_service_interfaces
+from rosidl_runtime_py import InterfaceCatalog
+from rosidl_runtime_py.get_interfaces import INTERFACE_CACHE_DIR_ENV_VAR
 
 # these packages are listed as dependencies in the package.xml
 INTERFACE_PACKAGE = 'test_msgs'
@@ -29,6 +36,9 @@ MESSAGE_INTERFACE_ONLY_PACKAGE = 'std_msgs'
 SERVICE_INTERFACE_ONLY_PACKAGE = 'std_srvs'
 NON_INTERFACE_PACKAGE = 'rosidl_parser'
 
+# the module is shadowed by the function of the same name in the package
+get_interfaces_module = importlib.import_module('rosidl_runtime_py.get_interfaces')
+
 
 def test_get_interface_packages():
     packages = get_interface_packages()
@@ -217,3 +227,87 @@ def test_get_interface_path():
     interface_path = get_interface_path('test_msgs/msg/BasicTypes.idl')
     assert os.path.exists(interface_path)
     assert interface_path[-4:] == '.idl'
+
+
+def test_get_interfaces_cache(tmp_path, monkeypatch):
+    resource_index_path = tmp_path / 'prefix' / 'share' / 'ament_index' / 'resource_index'
+    (resource_index_path / 'packages').mkdir(parents=True)
+    (resource_index_path / 'rosidl_interfaces').mkdir()
+    (resource_index_path / 'packages' / 'foo_msgs').touch()
+    resource_path = resource_index_path / 'rosidl_interfaces' / 'foo_msgs'
+    resource_path.write_text('msg/Foo.idl\nmsg/Foo.msg\n')
+    monkeypatch.setenv('AMENT_PREFIX_PATH', str(tmp_path / 'prefix'))
+    monkeypatch.setenv(INTERFACE_CACHE_DIR_ENV_VAR, str(tmp_path / 'cache'))
+
+    assert get_message_interfaces() == {'foo_msgs': ['msg/Foo']}
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+    # The cache file is read instead of the resources
+    def read_resources(*args):
+        raise AssertionError('Resources read despite the cache')
+    monkeypatch.setattr(get_interfaces_module, '_read_resources', read_resources)
+    get_interface_catalog().refresh()
+    assert get_message_interfaces() == {'foo_msgs': ['msg/Foo']}
+    assert get_interfaces(['foo_msgs']) == {'foo_msgs': ['msg/Foo']}
+    with pytest.raises(LookupError):
+        get_interfaces(['bar_msgs'])
+    monkeypatch.undo()
+
+    # Rewriting a resource invalidates the cache
+    monkeypatch.setenv('AMENT_PREFIX_PATH', str(tmp_path / 'prefix'))
+    monkeypatch.setenv(INTERFACE_CACHE_DIR_ENV_VAR, str(tmp_path / 'cache'))
+    resource_path.write_text('msg/Foo.idl\nmsg/Foo.msg\nsrv/Bar.idl\nsrv/Bar.srv\n')
+    os.utime(resource_path, ns=(0, 0))
+    get_interface_catalog().refresh()
+    assert get_service_interfaces() == {'foo_msgs': ['srv/Bar']}
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+
+def test_interface_catalog(tmp_path, monkeypatch):
+    resource_index_path = tmp_path / 'share' / 'ament_index' / 'resource_index'
+    (resource_index_path / 'packages').mkdir(parents=True)
+    (resource_index_path / 'rosidl_interfaces').mkdir()
+    (resource_index_path / 'packages' / 'foo_msgs').touch()
+    (resource_index_path / 'packages' / 'bar').touch()
+    (resource_index_path / 'rosidl_interfaces' / 'foo_msgs').write_text('\n'.join([
+        'msg/Foo.idl', 'msg/Foo.msg', 'srv/Foo.idl', 'srv/Foo.srv', 'action/Foo.idl',
+        'action/Foo.action', 'action/Foo_Goal.idl', 'msg/Bar.srv', 'other/Baz.idl']))
+    monkeypatch.setenv('AMENT_PREFIX_PATH', str(tmp_path))
+
+    catalog = InterfaceCatalog()
+    assert catalog.get_interfaces() == {'foo_msgs': [
+        'action/Foo', 'msg/Bar', 'msg/Foo', 'other/Baz', 'srv/Foo']}
+    assert catalog.get_message_interfaces() == {'foo_msgs': ['msg/Foo']}
+    assert catalog.get_service_interfaces() == {'foo_msgs': ['srv/Foo']}
+    assert catalog.get_action_interfaces(['foo_msgs', 'bar']) == {'foo_msgs': ['action/Foo']}
+    with pytest.raises(LookupError):
+        catalog.get_interfaces(['baz'])
+
+    (resource_index_path / 'packages' / 'baz_msgs').touch()
+    (resource_index_path / 'rosidl_interfaces' / 'baz_msgs').write_text('msg/Baz.msg')
+    assert 'baz_msgs' not in catalog.get_message_interfaces()
+    catalog.refresh()
+    assert catalog.get_message_interfaces(['baz_msgs']) == {'baz_msgs': ['msg/Baz']}
+
+
+def test_scan_resource_index(tmp_path, monkeypatch):
+    prefix_paths = [str(tmp_path / 'a'), str(tmp_path / 'b')]
+    for prefix_path, names in zip(prefix_paths, [['foo', '.hidden'], ['foo', 'bar']]):
+        resource_path = os.path.join(prefix_path, 'share', 'ament_index', 'resource_index', 'r')
+        os.makedirs(os.path.join(resource_path, 'directory'))
+        for name in names:
+            with open(os.path.join(resource_path, name), 'w') as h:
+                h.write(prefix_path)
+    monkeypatch.setenv('AMENT_PREFIX_PATH', os.pathsep.join(prefix_paths))
+
+    resource_paths = get_interfaces_module._scan_resource_index(prefix_paths, 'r')
+    assert set(resource_paths) == set(get_resources('r'))
+    contents = get_interfaces_module._read_resources(resource_paths)
+    assert contents == {name: get_resource('r', name)[0] for name in get_resources('r')}
+    assert contents['foo'] == prefix_paths[0]
+
+    # The installed packages are found as with the ament index functions
+    monkeypatch.undo()
+    prefix_paths = get_search_paths()
+    assert get_interfaces_module._scan_resource_index(prefix_paths, 'rosidl_interfaces').keys() \
+        == get_resources('rosidl_interfaces').keys()
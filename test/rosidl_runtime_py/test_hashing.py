@@ -0,0 +1,95 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import subprocess
+import sys
+
+from rosidl_runtime_py import hash_message
+from rosidl_runtime_py import messages_equal
+
+from test_msgs import message_fixtures
+import test_msgs.msg
+
+
+def _get_fixtures():
+    msgs = []
+    msgs.extend(message_fixtures.get_msg_arrays())
+    msgs.extend(message_fixtures.get_msg_basic_types())
+    msgs.extend(message_fixtures.get_msg_bounded_sequences())
+    msgs.extend(message_fixtures.get_msg_multi_nested())
+    msgs.extend(message_fixtures.get_msg_nested())
+    msgs.extend(message_fixtures.get_msg_strings())
+    msgs.extend(message_fixtures.get_msg_unbounded_sequences())
+    return msgs
+
+
+def test_hash_message():
+    msgs = _get_fixtures()
+    hashes = [hash_message(msg) for msg in msgs]
+    for msg, msg_hash in zip(msgs, hashes):
+        assert len(msg_hash) == 16
+        assert hash_message(copy.deepcopy(msg)) == msg_hash
+        assert messages_equal(msg, copy.deepcopy(msg))
+    # messages which differ have different hashes
+    for i, msg in enumerate(msgs):
+        for j in range(i):
+            assert messages_equal(msg, msgs[j]) == (hashes[i] == hashes[j])
+    assert len(hash_message(msgs[0], digest_size=32)) == 32
+
+    # messages of different types with the same values have different hashes
+    assert hash_message(test_msgs.msg.Empty()) != hash_message(test_msgs.msg.Defaults())
+
+    msg = test_msgs.msg.UnboundedSequences(string_values=['ab', 'c'])
+    other_msg = test_msgs.msg.UnboundedSequences(string_values=['a', 'bc'])
+    assert hash_message(msg) != hash_message(other_msg)
+    assert not messages_equal(msg, other_msg)
+
+    # equal values have the same hash even if their bytes differ
+    msg = test_msgs.msg.Arrays()
+    other_msg = test_msgs.msg.Arrays()
+    msg.float32_values[0] = float('nan')
+    other_msg.float32_values[0] = -float('nan')
+    msg.float64_values[1] = -0.0
+    msg.basic_types_values[0].float64_value = -0.0
+    other_msg.basic_types_values[1].float32_value = float('nan')
+    msg.basic_types_values[1].float32_value = float('nan')
+    assert messages_equal(msg, other_msg)
+    assert msg != other_msg
+    assert hash_message(msg) == hash_message(other_msg)
+
+    # the items of numeric sequences are compared at once
+    msg = test_msgs.msg.UnboundedSequences(int32_values=list(range(1000)))
+    other_msg = test_msgs.msg.UnboundedSequences(int32_values=list(range(1000)))
+    assert messages_equal(msg, other_msg)
+    assert hash_message(msg) == hash_message(other_msg)
+    other_msg.int32_values[-1] = 0
+    assert not messages_equal(msg, other_msg)
+    assert hash_message(msg) != hash_message(other_msg)
+
+
+def test_hash_message_is_stable_across_processes():
+    code = (
+        'from rosidl_runtime_py import hash_message\n'
+        'from test_msgs import message_fixtures\n'
+        'print(hash_message(message_fixtures.get_msg_unbounded_sequences()[-1]).hex())')
+    # Hash randomization of str objects must not change the hash
+    results = {
+        subprocess.run(
+            [sys.executable, '-c', code], stdout=subprocess.PIPE, check=True,
+            universal_newlines=True, env=dict(os.environ, PYTHONHASHSEED=seed)
+        ).stdout.strip()
+        for seed in ('1', '2')}
+    assert results == {hash_message(message_fixtures.get_msg_unbounded_sequences()[-1]).hex()}
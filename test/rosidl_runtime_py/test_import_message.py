@@ -14,10 +14,16 @@
 
 import warnings
 
+import pytest
+
 from rosidl_parser.definition import AbstractNestedType
 from rosidl_parser.definition import NamespacedType
 from rosidl_parser.definition import UnboundedSequence
 
+from rosidl_runtime_py import clear_import_cache
+from rosidl_runtime_py import get_import_cache_info
+from rosidl_runtime_py import set_import_cache_size
+from rosidl_runtime_py.import_message import DEFAULT_IMPORT_CACHE_SIZE
 from rosidl_runtime_py.import_message import import_message_from_namespaced_type
 
 from test_msgs.action._fibonacci import Fibonacci_FeedbackMessage
@@ -45,3 +51,32 @@ def test_import_namespaced_type_feedback_message():
     feedback_namespaced_type = NamespacedType(['test_msgs', 'action'], 'Fibonacci_FeedbackMessage')
     imported_message = import_message_from_namespaced_type(feedback_namespaced_type)
     assert type(imported_message) is type(Fibonacci_FeedbackMessage)
+
+
+def test_import_namespaced_type_cache():
+    clear_import_cache()
+    fixture_namespaced_type = NamespacedType(['test_msgs', 'msg'], 'Empty')
+    assert import_message_from_namespaced_type(fixture_namespaced_type) is Empty
+    assert import_message_from_namespaced_type(
+        NamespacedType(['test_msgs', 'msg'], 'Empty')) is Empty
+    cache_info = get_import_cache_info()
+    assert (cache_info.hits, cache_info.misses, cache_info.currsize) == (1, 1, 1)
+
+    with pytest.raises(AttributeError):
+        import_message_from_namespaced_type(NamespacedType(['test_msgs', 'msg'], 'Unknown'))
+    assert get_import_cache_info().currsize == 1
+
+    try:
+        set_import_cache_size(1)
+        assert get_import_cache_info().maxsize == 1
+        import_message_from_namespaced_type(fixture_namespaced_type)
+        import_message_from_namespaced_type(
+            NamespacedType(['test_msgs', 'action'], 'Fibonacci_FeedbackMessage'))
+        import_message_from_namespaced_type(fixture_namespaced_type)
+        cache_info = get_import_cache_info()
+        assert (cache_info.hits, cache_info.misses, cache_info.currsize) == (0, 3, 1)
+    finally:
+        set_import_cache_size(DEFAULT_IMPORT_CACHE_SIZE)
+
+    clear_import_cache()
+    assert get_import_cache_info().currsize == 0
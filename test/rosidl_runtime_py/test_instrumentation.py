@@ -0,0 +1,100 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from rosidl_runtime_py import disable_instrumentation
+from rosidl_runtime_py import enable_instrumentation
+from rosidl_runtime_py import get_instrumentation_data
+from rosidl_runtime_py import is_instrumentation_enabled
+from rosidl_runtime_py import message_to_csv
+from rosidl_runtime_py import message_to_ordereddict
+from rosidl_runtime_py import message_to_yaml
+from rosidl_runtime_py import reset_instrumentation_data
+from rosidl_runtime_py import set_message_fields
+
+from test_msgs import message_fixtures
+
+
+@pytest.fixture
+def instrumentation():
+    reset_instrumentation_data()
+    yield
+    disable_instrumentation()
+    reset_instrumentation_data()
+
+
+def test_instrumentation_disabled(instrumentation):
+    assert not is_instrumentation_enabled()
+    msg = message_fixtures.get_msg_nested()[0]
+    message_to_ordereddict(msg)
+    set_message_fields(type(msg)(), {'basic_types_value': {'int8_value': 1}})
+    assert get_instrumentation_data() == {}
+
+
+def test_instrumentation_conversion(instrumentation):
+    msg = message_fixtures.get_msg_unbounded_sequences()[-1]
+    expected = message_to_ordereddict(msg)
+    events = []
+    enable_instrumentation(lambda *event: events.append(event))
+    assert is_instrumentation_enabled()
+    # the results don't change while instrumentation is enabled
+    assert message_to_ordereddict(msg) == expected
+    message_to_yaml(msg)
+    message_to_csv(msg)
+
+    data = get_instrumentation_data()
+    assert set(data) == {'message_to_ordereddict', 'message_to_yaml', 'message_to_csv'}
+    stats = data['message_to_ordereddict']['test_msgs/msg/UnboundedSequences']
+    assert stats['sequence of scalars']['bytes'] == \
+        len(msg.bool_values) + len(msg.byte_values) + len(msg.char_values) + \
+        4 * len(msg.float32_values) + 8 * len(msg.float64_values) + \
+        len(msg.int8_values) + len(msg.uint8_values) + \
+        2 * len(msg.int16_values) + 2 * len(msg.uint16_values) + \
+        4 * len(msg.int32_values) + 4 * len(msg.uint32_values) + \
+        8 * len(msg.int64_values) + 8 * len(msg.uint64_values)
+    assert stats['sequence of strings']['bytes'] == sum(len(s) for s in msg.string_values)
+    assert stats['sequence of strings']['calls'] == 1
+    assert stats['sequence of messages']['time'] > 0
+    # nested messages are counted with their own type
+    assert data['message_to_ordereddict']['test_msgs/msg/BasicTypes']['scalar']['calls'] == \
+        13 * len(msg.basic_types_values)
+    assert len(events) == sum(
+        field_stats['calls']
+        for message_types in data.values()
+        for kinds in message_types.values()
+        for field_stats in kinds.values())
+    assert events[0][:3] == (
+        'message_to_ordereddict', 'test_msgs/msg/UnboundedSequences', 'sequence of scalars')
+
+    disable_instrumentation()
+    message_to_ordereddict(msg)
+    assert get_instrumentation_data() == data
+    reset_instrumentation_data()
+    assert get_instrumentation_data() == {}
+
+
+def test_instrumentation_population(instrumentation):
+    enable_instrumentation()
+    msg = message_fixtures.get_msg_nested()[0]
+    set_message_fields(msg, {'basic_types_value': {'int8_value': 1, 'uint8_value': 2}})
+    assert msg.basic_types_value.int8_value == 1
+    assert msg.basic_types_value.uint8_value == 2
+    with pytest.raises(AttributeError):
+        set_message_fields(msg, {'test_invalid_field': 42})
+
+    data = get_instrumentation_data()['set_message_fields']
+    assert data['test_msgs/msg/Nested']['message']['calls'] == 1
+    assert data['test_msgs/msg/BasicTypes']['scalar'] == {
+        'calls': 2, 'time': data['test_msgs/msg/BasicTypes']['scalar']['time'], 'bytes': 2}
@@ -0,0 +1,58 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import pytest
+
+import rosidl_runtime_py
+
+
+def _get_imported_modules(code):
+    # Run the code in a new interpreter so that no module is imported yet
+    result = subprocess.run(
+        [sys.executable, '-c', code + '\nimport sys\nprint(" ".join(sys.modules))'],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True)
+    return set(result.stdout.split())
+
+
+def test_import_does_not_import_heavy_dependencies():
+    modules = _get_imported_modules('import rosidl_runtime_py')
+    assert 'rosidl_runtime_py' in modules
+    assert 'numpy' not in modules
+    assert 'yaml' not in modules
+    assert 'rosidl_parser' not in modules
+    assert 'rosidl_runtime_py.convert' not in modules
+
+    modules = _get_imported_modules(
+        'from rosidl_runtime_py import get_interface_path\n'
+        'from rosidl_runtime_py import get_message_interfaces\n'
+        'get_message_interfaces()')
+    assert 'numpy' not in modules
+    assert 'yaml' not in modules
+
+    modules = _get_imported_modules('from rosidl_runtime_py import message_to_yaml')
+    assert 'rosidl_runtime_py.convert' in modules
+    assert 'yaml' in modules
+
+
+def test_lazy_attributes():
+    for name in rosidl_runtime_py.__all__:
+        assert name in dir(rosidl_runtime_py)
+        assert callable(getattr(rosidl_runtime_py, name))
+    assert rosidl_runtime_py.message_to_yaml.__module__ == 'rosidl_runtime_py.convert'
+    assert rosidl_runtime_py.get_interfaces.__module__ == 'rosidl_runtime_py.get_interfaces'
+    with pytest.raises(AttributeError):
+        rosidl_runtime_py.unknown_attribute
@@ -0,0 +1,173 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy
+import pytest
+
+from rosidl_runtime_py import create_messages
+from rosidl_runtime_py import MessageLogReader
+from rosidl_runtime_py import MessageLogWriter
+from rosidl_runtime_py import messages_equal
+from rosidl_runtime_py import messages_to_columns
+
+from test_msgs import message_fixtures
+import test_msgs.action
+import test_msgs.msg
+
+
+def test_message_log(tmp_path):
+    for get_fixtures in (
+        message_fixtures.get_msg_arrays,
+        message_fixtures.get_msg_basic_types,
+        message_fixtures.get_msg_bounded_sequences,
+        message_fixtures.get_msg_builtins,
+        message_fixtures.get_msg_multi_nested,
+        message_fixtures.get_msg_nested,
+        message_fixtures.get_msg_strings,
+        message_fixtures.get_msg_unbounded_sequences,
+        message_fixtures.get_msg_wstrings,
+    ):
+        msgs = get_fixtures()
+        path = str(tmp_path / get_fixtures.__name__)
+        with MessageLogWriter(path, type(msgs[0])) as writer:
+            writer.write_messages(msgs[:1])
+            for msg in msgs[1:]:
+                writer.write(msg)
+        # Values of float32 fields are rounded like in columns
+        msgs = create_messages(type(msgs[0]), messages_to_columns(msgs))
+        with MessageLogReader(path) as reader:
+            assert reader.message_type is type(msgs[0])
+            assert len(reader) == len(msgs)
+            for i, msg in enumerate(msgs):
+                assert messages_equal(reader[i], msg)
+            assert messages_equal(reader[-1], msgs[-1])
+            assert all(map(messages_equal, reader[1:], msgs[1:]))
+            assert all(map(messages_equal, reader[::2], msgs[::2]))
+            assert all(map(messages_equal, reader, msgs))
+            assert reader[len(msgs):] == []
+            with pytest.raises(IndexError):
+                reader[len(msgs)]
+
+
+def test_message_log_action_message(tmp_path):
+    # Messages of actions and services aren't found by the name of their message type
+    path = str(tmp_path / 'log')
+    goal = test_msgs.action.Fibonacci.Goal(order=5)
+    with MessageLogWriter(path, test_msgs.action.Fibonacci.Goal) as writer:
+        writer.write(goal)
+    with MessageLogReader(path) as reader:
+        assert reader.message_type is test_msgs.action.Fibonacci.Goal
+        assert reader[:] == [goal]
+
+
+def test_message_log_columns(tmp_path):
+    path = str(tmp_path / 'log')
+    msgs = message_fixtures.get_msg_unbounded_sequences()
+    with MessageLogWriter(path, type(msgs[0])) as writer:
+        writer.write_messages(msgs)
+    columns = messages_to_columns(msgs)
+    with MessageLogReader(path) as reader:
+        assert 'alignment_check' in reader.paths
+        assert 'string_values[]' in reader.paths
+        assert 'basic_types_values[].int32_value' in reader.paths
+
+        column = reader.get_column('alignment_check')
+        assert isinstance(column, numpy.memmap)
+        assert not column.flags.writeable
+        numpy.testing.assert_array_equal(column, columns['alignment_check'])
+
+        offsets = reader.get_offsets('int32_values')
+        assert len(offsets) == len(msgs) + 1
+        items = reader.get_column('int32_values[]')
+        for i, msg in enumerate(msgs):
+            numpy.testing.assert_array_equal(items[offsets[i]:offsets[i + 1]], msg.int32_values)
+
+        offsets = reader.get_offsets('basic_types_values')
+        items = reader.get_column('basic_types_values[].float64_value')
+        for i, msg in enumerate(msgs):
+            assert items[offsets[i]:offsets[i + 1]].tolist() == [
+                item.float64_value for item in msg.basic_types_values]
+
+        offsets = reader.get_offsets('string_values[]')
+        data = reader.get_column('string_values[]')
+        strings = [
+            data[offsets[i]:offsets[i + 1]].tobytes().decode() for i in range(len(offsets) - 1)]
+        assert strings == [string for msg in msgs for string in msg.string_values]
+
+        read_columns = reader.read_columns(1)
+        assert list(read_columns) == list(columns)
+        numpy.testing.assert_array_equal(
+            read_columns['int32_values'][0], columns['int32_values'][1])
+
+        with pytest.raises(KeyError):
+            reader.get_column('unknown_field')
+        with pytest.raises(ValueError):
+            reader.get_column('int32_values')
+        with pytest.raises(ValueError):
+            reader.get_offsets('alignment_check')
+
+    # Columns are .npy files
+    column = numpy.load(os.path.join(path, 'basic_types_values[].int32_value.npy'))
+    assert column.tolist() == [
+        item.int32_value for msg in msgs for item in msg.basic_types_values]
+
+
+def test_message_log_append(tmp_path):
+    path = str(tmp_path / 'log')
+    msgs = message_fixtures.get_msg_strings()
+    writer = MessageLogWriter(path, test_msgs.msg.Strings)
+    assert len(MessageLogReader(path)) == 0
+    writer.write(msgs[0])
+    # Messages are only visible to readers once flushed
+    assert len(MessageLogReader(path)) == 0
+    writer.flush()
+    reader = MessageLogReader(path)
+    assert len(reader) == 1
+    writer.write(msgs[1])
+    writer.write(msgs[2])
+    assert len(reader) == 1
+    assert reader[0] == msgs[0]
+    writer.flush()
+    writer.write(msgs[3])
+    # Messages which weren't flushed are dropped when appending
+    del writer
+
+    with MessageLogWriter(path, test_msgs.msg.Strings, append=True) as writer:
+        assert len(writer) == 3
+        writer.write_messages(msgs[3:])
+    with MessageLogReader(path) as reader:
+        assert reader[:] == msgs
+
+    with MessageLogWriter(path, test_msgs.msg.Strings) as writer:
+        writer.write(msgs[-1])
+    with MessageLogReader(path) as reader:
+        assert reader[:] == msgs[-1:]
+
+    # Replacing a message log removes the column files of its other fields
+    with MessageLogWriter(path, test_msgs.msg.BasicTypes) as writer:
+        writer.write(test_msgs.msg.BasicTypes())
+    assert not os.path.exists(os.path.join(path, 'string_value.npy'))
+    assert os.path.exists(os.path.join(path, 'int32_value.npy'))
+    with MessageLogWriter(path, test_msgs.msg.Strings) as writer:
+        writer.write(msgs[-1])
+
+    with pytest.raises(ValueError):
+        MessageLogWriter(path, test_msgs.msg.Nested, append=True)
+    with pytest.raises(ValueError):
+        MessageLogReader(path, test_msgs.msg.Nested)
+    with MessageLogWriter(path, test_msgs.msg.Strings) as writer:
+        with pytest.raises(TypeError):
+            writer.write(test_msgs.msg.Nested())
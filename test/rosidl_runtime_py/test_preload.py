@@ -0,0 +1,77 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import Future
+
+import pytest
+
+from rosidl_runtime_py import preload_interfaces
+from rosidl_runtime_py.set_message import _get_setter_plan
+
+import test_msgs.action
+import test_msgs.msg
+import test_msgs.srv
+
+
+@pytest.fixture(autouse=True)
+def clear_setter_plans():
+    # Preloading fills the setter plans shared with the other tests
+    yield
+    _get_setter_plan.cache_clear()
+
+
+def test_preload_interfaces():
+    message_classes = preload_interfaces([
+        'test_msgs/msg/MultiNested', 'test_msgs/srv/BasicTypes', 'test_msgs/action/Fibonacci'])
+    assert message_classes[0] is test_msgs.msg.MultiNested
+    # nested types are preloaded once
+    for message_class in (
+        test_msgs.msg.Arrays, test_msgs.msg.BasicTypes, test_msgs.srv.BasicTypes.Request,
+        test_msgs.srv.BasicTypes.Response, test_msgs.action.Fibonacci.Goal,
+        test_msgs.action.Fibonacci.Feedback, test_msgs.action.Fibonacci.Impl.FeedbackMessage,
+    ):
+        assert message_classes.count(message_class) == 1
+    # the setter plans hold all fields
+    assert set(_get_setter_plan(test_msgs.msg.Arrays)) == set(
+        test_msgs.msg.Arrays.get_fields_and_field_types())
+
+    message_classes = preload_interfaces(['test_msgs'], converters=False)
+    assert test_msgs.msg.Empty in message_classes
+    assert test_msgs.action.Fibonacci.Result in message_classes
+
+    with pytest.raises(LookupError):
+        preload_interfaces(['not_a_package'])
+
+
+def test_preload_interfaces_type_support(monkeypatch):
+    imported = []
+    monkeypatch.setattr(
+        test_msgs.msg.Empty, '__import_type_support__', lambda: imported.append(True),
+        raising=False)
+    preload_interfaces(['test_msgs/msg/Empty'], type_support=False)
+    assert imported == []
+    preload_interfaces(['test_msgs/msg/Empty'])
+    assert imported == [True]
+
+
+def test_preload_interfaces_in_background():
+    future = preload_interfaces(['test_msgs/msg/Nested'], background=True)
+    assert isinstance(future, Future)
+    assert test_msgs.msg.Nested in future.result()
+    assert set(_get_setter_plan(test_msgs.msg.Nested)) == set(
+        test_msgs.msg.Nested.get_fields_and_field_types())
+
+    future = preload_interfaces(['not_a_package'], background=True)
+    with pytest.raises(LookupError):
+        future.result()
@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import array
 import builtins
 import copy
 
 from builtin_interfaces.msg import Time
+import numpy
 import pytest
 import rosidl_parser.definition
+from rosidl_runtime_py import create_messages
+from rosidl_runtime_py import messages_to_columns
+from rosidl_runtime_py import messages_to_structured_array
 from rosidl_runtime_py import set_message_fields
+from rosidl_runtime_py.set_message import _get_setter_plan
 from std_msgs.msg import Header
 from test_msgs import message_fixtures
 
@@ -208,6 +214,148 @@ def test_set_nested_namespaced_fields():
     assert arrays_msg.basic_types_values[2].uint8_value == 0
 
 
+def test_set_message_fields_reuses_setter_plan():
+    msg_type = type(message_fixtures.get_msg_unbounded_sequences()[0])
+    for i in range(3):
+        msg = msg_type()
+        set_message_fields(msg, {
+            'int32_values': [i, i + 1],
+            'basic_types_values': [{'int8_value': i}],
+        })
+        assert list(msg.int32_values) == [i, i + 1]
+        assert msg.basic_types_values[0].int8_value == i
+    plan = _get_setter_plan(msg_type)
+    assert set(plan.keys()) == {'int32_values', 'basic_types_values'}
+    assert plan['basic_types_values'][3] is type(msg.basic_types_values[0])
+
+    with pytest.raises(AttributeError):
+        set_message_fields(msg_type(), {'test_invalid_field': 42})
+    assert 'test_invalid_field' not in plan
+
+
+def test_set_message_fields_from_buffers():
+    arrays_msg = message_fixtures.get_msg_arrays()[0]
+    float32_values = numpy.array([1.0, 2.0, 3.0], dtype=numpy.float32)
+    uint8_values = bytearray(b'\x01\x02\x03')
+    set_message_fields(arrays_msg, {
+        'float32_values': float32_values,
+        'uint8_values': memoryview(uint8_values),
+        'int32_values': numpy.array([1, 2, 3], dtype=numpy.int64),
+    })
+    assert numpy.shares_memory(arrays_msg.float32_values, float32_values)
+    uint8_values[0] = 4
+    assert arrays_msg.uint8_values.tolist() == [4, 2, 3]
+    assert arrays_msg.int32_values.dtype == numpy.int32
+    assert arrays_msg.int32_values.tolist() == [1, 2, 3]
+
+    sequences_msg = message_fixtures.get_msg_unbounded_sequences()[0]
+    int16_values = array.array('h', [1, 2])
+    set_message_fields(sequences_msg, {
+        'int16_values': int16_values,
+        'float64_values': numpy.array([[1.0, 2.0], [3.0, 4.0]])[:, 0],
+        'uint8_values': b'\x05\x06',
+        'int32_values': numpy.array([1, 2], dtype=numpy.int64),
+    })
+    assert sequences_msg.int16_values is int16_values
+    assert sequences_msg.float64_values.tolist() == [1.0, 3.0]
+    assert sequences_msg.uint8_values.tolist() == [5, 6]
+    assert sequences_msg.int32_values.tolist() == [1, 2]
+
+    # Read-only buffers are copied, so that the fields stay writable
+    read_only_values = numpy.array([1.0, 2.0, 3.0], dtype=numpy.float32)
+    read_only_values.flags.writeable = False
+    set_message_fields(arrays_msg, {
+        'float32_values': read_only_values,
+        'uint8_values': b'\x01\x02\x03',
+        'int8_values': memoryview(bytearray(b'\x01\x02\x03')).toreadonly(),
+    })
+    assert not numpy.shares_memory(arrays_msg.float32_values, read_only_values)
+    for field_name in ('float32_values', 'uint8_values', 'int8_values'):
+        getattr(arrays_msg, field_name)[0] = 9
+        assert getattr(arrays_msg, field_name).tolist() == [9, 2, 3]
+
+    # Resizable buffers are copied, so that they can be resized while the message is alive
+    float64_values = array.array('d', [1.0, 2.0, 3.0])
+    uint8_values = bytearray(b'\x01\x02\x03')
+    set_message_fields(arrays_msg, {
+        'float64_values': float64_values,
+        'uint8_values': uint8_values,
+    })
+    float64_values.append(4.0)
+    uint8_values.extend(b'\x04')
+    assert arrays_msg.float64_values.tolist() == [1.0, 2.0, 3.0]
+    assert arrays_msg.uint8_values.tolist() == [1, 2, 3]
+
+
+def test_create_messages_from_records():
+    msg_type = type(message_fixtures.get_msg_nested()[0])
+    msgs = create_messages(msg_type, ({'basic_types_value': {'int32_value': i}} for i in range(3)))
+    assert [type(m) for m in msgs] == [msg_type] * 3
+    assert [m.basic_types_value.int32_value for m in msgs] == [0, 1, 2]
+
+    with pytest.raises(AttributeError):
+        create_messages(msg_type, [{'test_invalid_field': 42}])
+
+
+def test_create_messages_from_columns():
+    msg_type = type(message_fixtures.get_msg_arrays()[0])
+    float32_values = numpy.arange(6, dtype=numpy.float32).reshape(2, 3)
+    msgs = create_messages(msg_type, {
+        'float32_values': float32_values,
+        'byte_values': numpy.array([[1, 2, 3], [4, 5, 6]], dtype=numpy.uint8),
+        'string_values': numpy.array([['a', 'b', 'c'], ['d', 'e', 'f']]),
+        'basic_types_values.int8_value': numpy.array([[1, 2, 3], [4, 5, 6]], dtype=numpy.int8),
+        'alignment_check': numpy.array([7, 8], dtype=numpy.int32),
+    })
+    assert len(msgs) == 2
+    assert numpy.shares_memory(msgs[1].float32_values, float32_values)
+    assert msgs[1].float32_values.tolist() == [3.0, 4.0, 5.0]
+    assert msgs[0].byte_values == [b'\x01', b'\x02', b'\x03']
+    assert msgs[1].string_values == ['d', 'e', 'f']
+    assert [b.int8_value for b in msgs[1].basic_types_values] == [4, 5, 6]
+    assert msgs[1].alignment_check == 8
+    assert msgs[0].int32_values.tolist() == [0, 0, 0]
+
+    with pytest.raises(ValueError, match='basic_types_values.int8_value'):
+        create_messages(msg_type, {
+            'basic_types_values.int8_value': numpy.zeros((2, 2), dtype=numpy.int8)})
+    with pytest.raises(ValueError, match='basic_types_values.int8_value'):
+        create_messages(type(message_fixtures.get_msg_unbounded_sequences()[0]), {
+            'basic_types_values.int8_value': numpy.zeros((2, 3), dtype=numpy.int8)})
+
+    float32_values.flags.writeable = False
+    msgs = create_messages(msg_type, {'float32_values': float32_values})
+    assert not numpy.shares_memory(msgs[1].float32_values, float32_values)
+    msgs[1].float32_values[0] = 9.0
+
+    msgs = message_fixtures.get_msg_unbounded_sequences()
+    created_msgs = create_messages(type(msgs[0]), messages_to_columns(msgs))
+    for msg, created_msg in zip(msgs, created_msgs):
+        assert created_msg.int32_values == msg.int32_values
+        assert created_msg.byte_values == msg.byte_values
+        assert created_msg.string_values == msg.string_values
+        assert [b.int32_value for b in created_msg.basic_types_values] == [
+            b.int32_value for b in msg.basic_types_values]
+
+    with pytest.raises(ValueError):
+        create_messages(msg_type, {'alignment_check': [1, 2], 'float64_values': [[1.0] * 3]})
+    with pytest.raises(AttributeError):
+        create_messages(msg_type, {'test_invalid_field.int8_value': [42]})
+
+
+def test_create_messages_from_structured_array():
+    msgs = message_fixtures.get_msg_nested()
+    values = messages_to_structured_array(msgs)
+    created_msgs = create_messages(type(msgs[0]), values)
+    assert len(created_msgs) == len(msgs)
+    for created_msg, msg in zip(created_msgs, msgs):
+        assert created_msg.basic_types_value.byte_value == msg.basic_types_value.byte_value
+        assert created_msg.basic_types_value.uint64_value == msg.basic_types_value.uint64_value
+    numpy.testing.assert_array_equal(messages_to_structured_array(created_msgs), values)
+    # slices of structured arrays are structured arrays as well
+    assert create_messages(type(msgs[0]), values[1:]) == created_msgs[1:]
+
+
 def test_set_message_fields_nested_type():
     msg_basic_types = message_fixtures.get_msg_basic_types()[0]
     msg0 = message_fixtures.get_msg_nested()[0]
@@ -121,3 +121,34 @@ def test_get_interface_raises(function, identifier, interface_type):
     with pytest.raises(ValueError) as ex:
         function(identifier)
     ex.match("Expected the full name of {}, got '{}'".format(interface_type, identifier))
+
+
+def test_get_interface_cache():
+    utilities.clear_interface_cache()
+    assert utilities.get_message('test_msgs/msg/Empty') is test_msgs.msg.Empty
+    assert utilities.get_message('test_msgs/msg/Empty') is test_msgs.msg.Empty
+    # the lookups of each kind are cached separately
+    assert utilities.get_service('test_msgs/Empty') is test_msgs.srv.Empty
+    cache_info = utilities.get_interface_cache_info()
+    assert (cache_info.hits, cache_info.misses, cache_info.currsize) == (1, 2, 2)
+
+    # failed lookups are cached and raise the same error each time
+    errors = []
+    for _ in range(2):
+        with pytest.raises(ValueError) as ex:
+            utilities.get_action('test_msgs/msg/Empty')
+        errors.append(ex.value)
+    assert errors[0] is not errors[1]
+    assert errors[0].args == errors[1].args
+    for _ in range(2):
+        with pytest.raises(ModuleNotFoundError, match='not_a_package'):
+            utilities.get_message('not_a_package/msg/Empty')
+    cache_info = utilities.get_interface_cache_info()
+    assert (cache_info.hits, cache_info.misses, cache_info.currsize) == (3, 4, 4)
+    assert cache_info.maxsize == utilities.DEFAULT_INTERFACE_CACHE_SIZE
+    # the cached error doesn't hold the traceback of the failed lookup
+    _, error = utilities._lookup_interface_cached('test_msgs/msg/Empty', 'action')
+    assert error == (ValueError, errors[0].args)
+
+    utilities.clear_interface_cache()
+    assert utilities.get_interface_cache_info().currsize == 0